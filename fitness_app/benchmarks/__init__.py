@@ -0,0 +1,2 @@
+# Benchmarks for the FitnessApp backend.
+# Run from the fitness_app directory, e.g.: python -m benchmarks.bench_plan_generate
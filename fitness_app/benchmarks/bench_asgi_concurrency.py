@@ -0,0 +1,103 @@
+# benchmarks/bench_asgi_concurrency.py
+"""Public catalog throughput: threaded WSGI views vs the async views of src/asgi.py.
+
+Seeds --products products, then keeps --concurrency requests in flight for --seconds
+against /api/shop/products?page=N and /api/shop/products/<slug>: on the sync side
+from a pool of threads calling the Flask app, on the async side as concurrent ASGI
+calls on one event loop. The response cache is disabled so every request hits SQLite.
+
+Usage: python -m benchmarks.bench_asgi_concurrency [--concurrency 64] [--seconds 5] [--products 5000]
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert
+from src.extensions import db
+from src.models import Product, ProductCategory
+from src.routes.shop_routes import public_shop_bp
+from src.asgi import AsyncReadServer
+from benchmarks.common import make_bench_app
+
+def build_app(products, profile):
+    app = make_bench_app(DB_ENGINE_PROFILE=profile, RESPONSE_CACHE_MAX_ENTRIES=0)
+    app.register_blueprint(public_shop_bp)
+    with app.app_context():
+        db.session.execute(insert(ProductCategory), [{"name": f"Category {i}", "slug": f"category-{i}"} for i in range(1, 11)])
+        db.session.execute(insert(Product), [
+            {"name": f"Product {i}", "slug": f"product-{i}", "price": "19.90", "category_id": i % 10 + 1, "is_active": True}
+            for i in range(products)
+        ])
+        db.session.commit()
+    return app
+
+def request_paths(products, rng):
+    if rng.random() < 0.5:
+        return "/api/shop/products", f"page={rng.randint(1, 50)}&per_page=12".encode()
+    return f"/api/shop/products/product-{rng.randrange(products)}", b""
+
+def run_sync(app, products, concurrency, seconds):
+    deadline = time.monotonic() + seconds
+    counts = []
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        done = 0
+        while time.monotonic() < deadline:
+            path, query = request_paths(products, rng)
+            client.get(path, query_string=query.decode())
+            done += 1
+        with lock:
+            counts.append(done)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(concurrency):
+            pool.submit(worker, i)
+    return sum(counts)
+
+async def run_async(app, products, concurrency, seconds):
+    server = AsyncReadServer(app)
+    deadline = time.monotonic() + seconds
+
+    async def call(path, query):
+        scope = {"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []}
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+        async def send(message):
+            pass
+        await server(scope, receive, send)
+
+    async def worker(seed):
+        rng = random.Random(seed)
+        done = 0
+        while time.monotonic() < deadline:
+            await call(*request_paths(products, rng))
+            done += 1
+        return done
+
+    try:
+        return sum(await asyncio.gather(*(worker(i) for i in range(concurrency))))
+    finally:
+        await server.engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--profile", default="production", help="DB_ENGINE_PROFILE of the benchmark database")
+    args = parser.parse_args()
+
+    app = build_app(args.products, args.profile)
+    sync_done = run_sync(app, args.products, args.concurrency, args.seconds)
+    async_done = asyncio.run(run_async(app, args.products, args.concurrency, args.seconds))
+    print(f"{'mode':>6} {'requests/s':>11}   ({args.concurrency} in flight, {args.products} products)")
+    print(f"{'wsgi':>6} {sync_done / args.seconds:>11.0f}")
+    print(f"{'asgi':>6} {async_done / args.seconds:>11.0f}")
+
+if __name__ == "__main__":
+    main()
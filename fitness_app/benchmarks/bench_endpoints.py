@@ -0,0 +1,333 @@
+# benchmarks/bench_endpoints.py
+"""Latency, queries per request and memory of every API route on a seeded dataset.
+
+Seeds a SQLite database at --scale (see benchmarks/datasets.py; the file is kept in
+--db-dir and reused by later runs, named after the seeder version, seed and reference
+date so a dataset from another seeder is never picked up), builds the full app with create_app() and drives
+each route of auth, profile, plan, preferences, admin, advertisements and shop through
+the Flask test client: --requests timed requests per route after a short warm-up, as an
+anonymous client, a regular user or an admin. Reports p50/p95/p99 latency, SQL statements
+per request (from the /api/admin/metrics counters) and the peak RSS of the process.
+The run fails when the user or admin cannot log in, or when a route answers with a status
+it should not (e.g. 401/403 from a broken login); failed routes are left out of the results.
+
+--write-baseline stores the results as JSON; a run with --baseline compares against it
+and exits with status 1 when a route's p95 is more than --threshold slower, a route runs
+at least half a statement more per request, or the peak RSS grew by more than --threshold.
+
+Usage: python -m benchmarks.bench_endpoints [--scale 1k|100k|1m] [--requests 200] [--db-dir DIR] [--reference-date YYYY-MM-DD]
+           [--only PREFIX] [--write-baseline FILE | --baseline FILE [--threshold 0.2]]
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from sqlalchemy import func, insert, select
+from src.extensions import db
+from src.models import Advertisement, Product, ProductCategory, User
+from benchmarks.datasets import (ADMIN_USERNAME, BENCH_PASSWORD, CATEGORY_COUNT, PLACEMENTS, REFERENCE_DATE, SCALES, USER_USERNAME,
+                                 dataset_file_name, seed_dataset)
+
+DEFAULT_DB_DIR = os.path.join(tempfile.gettempdir(), "fitness_bench_datasets")
+WARMUP_REQUESTS = 5
+SEARCH_WORDS = ("whey", "creatina", "vegan", "yoga", "omega", "barra", "pre")
+QUERY_TOLERANCE = 0.5 # Statements per request vary a little with the request mix (404s, cache hits)
+
+class Route:
+    """One benchmarked route: how to build a request for it and which client sends it.
+
+    `path` and `body` are callables of (ctx, rng) or constants; `setup(ctx, rng)` runs
+    untimed before each request (e.g. inserting the row a DELETE removes) and its
+    result is available to `path`/`body` as ctx["setup"]. A response whose status is not in
+    `expected` (default: any 2xx), or for which `check(response)` returns an error message,
+    fails the route.
+    """
+
+    def __init__(self, endpoint, method, path, role="anonymous", body=None, setup=None, max_requests=None,
+                 expected=None, check=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.role = role
+        self.body = body
+        self.setup = setup
+        self.max_requests = max_requests
+        self.expected = expected
+        self.check = check
+
+    def error(self, response):
+        """Why `response` does not count as a successful request, or None."""
+        if self.expected is not None and response.status_code not in self.expected:
+            return f"status {response.status_code}"
+        if self.expected is None and not 200 <= response.status_code < 300:
+            return f"status {response.status_code}"
+        return self.check(response) if self.check else None
+
+    def build(self, ctx, rng):
+        ctx["setup"] = self.setup(ctx, rng) if self.setup else None
+        path = self.path(ctx, rng) if callable(self.path) else self.path
+        body = self.body(ctx, rng) if callable(self.body) else self.body
+        return path, body
+
+# --- Preparação (fora do tempo medido) ---
+
+def _insert_row(ctx, model, values):
+    with ctx["app"].app_context():
+        row_id = db.session.execute(insert(model).values(**values).returning(model.id)).scalar_one()
+        db.session.commit()
+    return row_id
+
+def _new_user(ctx, rng):
+    n = next(ctx["counter"])
+    return _insert_row(ctx, User, {"username": f"bench_tmp_{ctx['run']}_{n}", "email": f"tmp_{ctx['run']}_{n}@example.com", "password_hash": "x"})
+
+def _new_category(ctx, rng):
+    n = next(ctx["counter"])
+    return _insert_row(ctx, ProductCategory, {"name": f"Tmp {ctx['run']} {n}", "slug": f"tmp-{ctx['run']}-{n}"})
+
+def _new_product(ctx, rng):
+    n = next(ctx["counter"])
+    return _insert_row(ctx, Product, {"name": f"Tmp {ctx['run']} {n}", "slug": f"tmp-{ctx['run']}-{n}", "price": "9.99", "category_id": 1})
+
+def _new_ad(ctx, rng):
+    return _insert_row(ctx, Advertisement, {"title": "Tmp ad", "placement_area": "sidebar", "created_by_id": 1})
+
+def _login_scratch_client(ctx, rng):
+    ctx["clients"]["scratch"].post("/api/auth/login", json={"username": USER_USERNAME, "password": BENCH_PASSWORD})
+
+def _has_ads(response):
+    return None if response.get_json() else "no live ads (move benchmarks/datasets.py REFERENCE_DATE forward)"
+
+def _unique_name(prefix):
+    return lambda ctx, rng: f"{prefix}_{ctx['run']}_{next(ctx['counter'])}"
+
+def _register_body(ctx, rng):
+    name = _unique_name("reg")(ctx, rng)
+    return {"username": name, "email": f"{name}@example.com", "password": BENCH_PASSWORD}
+
+def routes() -> list[Route]:
+    user_id = lambda ctx, rng: rng.randint(2, ctx["users"])
+    product_id = lambda ctx, rng: rng.randint(1, ctx["products"])
+    ad_id = lambda ctx, rng: rng.randint(1, ctx["ads"])
+    return [
+        # auth_bp
+        Route("auth.register", "POST", "/api/auth/register", body=_register_body),
+        Route("auth.login", "POST", "/api/auth/login", role="scratch", body={"username": USER_USERNAME, "password": BENCH_PASSWORD}),
+        Route("auth.logout", "POST", "/api/auth/logout", role="scratch", setup=_login_scratch_client),
+        Route("auth.status", "GET", "/api/auth/status", role="user"),
+        # profile_bp
+        Route("profile.get_profile", "GET", "/api/profile/", role="user"),
+        Route("profile.create_or_update_profile", "POST", "/api/profile/", role="user",
+              body=lambda ctx, rng: {"weight_kg": float(rng.randint(60, 90))}),
+        # plan_bp
+        Route("plan.generate_plan", "POST", "/api/plan/generate", role="user"),
+        Route("plan.get_current_diet_plan", "GET", "/api/plan/diet/current", role="user"),
+        Route("plan.get_current_workout_plan", "GET", "/api/plan/workout/current", role="user"),
+        # preferences_bp
+        Route("preferences.get_preferences", "GET", "/api/preferences/", role="user"),
+        Route("preferences.create_or_update_preferences", "POST", "/api/preferences/", role="user",
+              body=lambda ctx, rng: {"workout_frequency_preference": rng.randint(2, 6)}),
+        Route("preferences.get_food_suggestions", "GET", "/api/preferences/suggestions/food", role="user"),
+        Route("preferences.get_workout_suggestions", "GET", "/api/preferences/suggestions/workout", role="user"),
+        # admin_bp
+        Route("admin.list_users", "GET", lambda ctx, rng: f"/api/admin/users?page={rng.randint(1, 50)}&per_page=20", role="admin"),
+        Route("admin.get_user_details_by_admin", "GET", lambda ctx, rng: f"/api/admin/users/{user_id(ctx, rng)}/details", role="admin"),
+        Route("admin.toggle_admin_status", "POST", lambda ctx, rng: f"/api/admin/users/{ctx['setup']}/toggle_admin",
+              role="admin", setup=_new_user),
+        Route("admin.delete_user_by_admin", "DELETE", lambda ctx, rng: f"/api/admin/users/{ctx['setup']}", role="admin", setup=_new_user),
+        Route("admin.get_admin_stats", "GET", "/api/admin/stats", role="admin"),
+        Route("admin.get_metrics", "GET", "/api/admin/metrics", role="admin"),
+        Route("admin.recompute_plan_targets", "POST", "/api/admin/plans/recompute_targets", role="admin", max_requests=5),
+        # Advertisements (admin and public)
+        Route("advertisements.list_advertisements", "GET", lambda ctx, rng: f"/api/admin/advertisements/?page={rng.randint(1, 50)}",
+              role="admin"),
+        Route("advertisements.get_advertisement", "GET", lambda ctx, rng: f"/api/admin/advertisements/{ad_id(ctx, rng)}", role="admin"),
+        Route("advertisements.create_advertisement", "POST", "/api/admin/advertisements/", role="admin",
+              body={"title": "Bench ad", "content": "Benchmark", "placement_area": "sidebar", "target_url": "https://example.com"}),
+        Route("advertisements.update_advertisement", "PUT", lambda ctx, rng: f"/api/admin/advertisements/{ad_id(ctx, rng)}", role="admin",
+              body=lambda ctx, rng: {"content": f"Updated {rng.random()}"}),
+        Route("advertisements.delete_advertisement", "DELETE", lambda ctx, rng: f"/api/admin/advertisements/{ctx['setup']}", role="admin",
+              setup=_new_ad),
+        Route("advertisements.get_ad_counter_stats", "GET", "/api/admin/advertisements/counters", role="admin"),
+        Route("public_advertisements.get_active_ads_by_placement", "GET", lambda ctx, rng: f"/api/advertisements/{rng.choice(PLACEMENTS)}",
+              check=_has_ads),
+        Route("public_advertisements.track_ad_click", "POST", lambda ctx, rng: f"/api/advertisements/{ad_id(ctx, rng)}/click"),
+        # Shop (admin and public)
+        Route("admin_shop.list_product_categories_admin", "GET", "/api/admin/shop/categories", role="admin"),
+        Route("admin_shop.create_product_category", "POST", "/api/admin/shop/categories", role="admin",
+              body=lambda ctx, rng: {"name": _unique_name("Bench category")(ctx, rng)}),
+        Route("admin_shop.update_product_category", "PUT", lambda ctx, rng: f"/api/admin/shop/categories/{rng.randint(1, CATEGORY_COUNT)}",
+              role="admin", body=lambda ctx, rng: {"description": f"Updated {rng.random()}"}),
+        Route("admin_shop.delete_product_category", "DELETE", lambda ctx, rng: f"/api/admin/shop/categories/{ctx['setup']}", role="admin",
+              setup=_new_category),
+        Route("admin_shop.list_products_admin", "GET", lambda ctx, rng: f"/api/admin/shop/products?page={rng.randint(1, 50)}", role="admin"),
+        Route("admin_shop.create_product", "POST", "/api/admin/shop/products", role="admin",
+              body=lambda ctx, rng: {"name": _unique_name("Bench product")(ctx, rng), "price": "9.99", "category_id": 1}),
+        Route("admin_shop.update_product", "PUT", lambda ctx, rng: f"/api/admin/shop/products/{product_id(ctx, rng)}", role="admin",
+              body=lambda ctx, rng: {"stock_quantity": rng.randint(0, 200)}),
+        Route("admin_shop.delete_product", "DELETE", lambda ctx, rng: f"/api/admin/shop/products/{ctx['setup']}", role="admin",
+              setup=_new_product),
+        Route("admin_shop.get_catalog_cache_stats", "GET", "/api/admin/shop/cache", role="admin"),
+        Route("public_shop.list_public_product_categories", "GET", "/api/shop/categories"),
+        Route("public_shop.list_public_products", "GET", lambda ctx, rng: (
+            f"/api/shop/products?page={rng.randint(1, 50)}&category=category-{rng.randint(1, CATEGORY_COUNT)}")),
+        Route("public_shop.get_public_product_by_slug", "GET", lambda ctx, rng: f"/api/shop/products/product-{rng.randint(1, ctx['products'])}",
+              expected=(200, 404)), # 5% of the seeded products are inactive
+        Route("public_shop.search_public_products", "GET", lambda ctx, rng: f"/api/shop/search?q={rng.choice(SEARCH_WORDS)}"),
+    ]
+
+# --- Medição ---
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # ru_maxrss is in KiB on Linux
+
+def open_database(scale, db_dir, reference_date=REFERENCE_DATE):
+    """create_app() on the dataset file of `scale`, seeding it on first use. Returns (app, row counts, path)."""
+    from src.main import create_app # After the arguments are parsed: create_app touches the instance folder
+    os.makedirs(db_dir, exist_ok=True)
+    path = os.path.join(db_dir, dataset_file_name(scale, reference_date=reference_date))
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + path,
+        "DB_ENGINE_PROFILE": "production",
+        "AD_COUNTER_FLUSH_SECONDS": 0, # No background flush thread; pending ad counts are written at exit
+        "METRICS_ENABLED": True,
+    })
+    with app.app_context():
+        if db.session.execute(select(func.count()).select_from(User)).scalar() == 0:
+            start = time.perf_counter()
+            counts = seed_dataset(scale, reference_date=reference_date)
+            print(f"seeded {path}: {counts} in {time.perf_counter() - start:.1f}s")
+        users = db.session.execute(select(func.max(User.id))).scalar()
+        products = db.session.execute(select(func.max(Product.id))).scalar()
+        ads = db.session.execute(select(func.max(Advertisement.id))).scalar()
+    return app, {"users": users, "products": products, "ads": ads}, path
+
+def log_in(client, username, path):
+    """Logs `client` in as `username`; stops the run if the dataset has no such user."""
+    response = client.post("/api/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+    if response.status_code != 200:
+        raise SystemExit(f"cannot log in as {username} on {path} (status {response.status_code}); "
+                         f"delete the file to seed it again")
+
+def run_route(ctx, route, requests, rng):
+    client = ctx["clients"][route.role]
+    registry = ctx["app"].extensions["metrics"]
+    count = min(requests, route.max_requests) if route.max_requests else requests
+    for _ in range(min(WARMUP_REQUESTS, count)):
+        path, body = route.build(ctx, rng)
+        client.open(path, method=route.method, json=body, buffered=True)
+
+    before = registry.snapshot()[0].get(route.endpoint, [0, 0.0, 0])
+    timings, statuses, errors = [], {}, {}
+    for _ in range(count):
+        path, body = route.build(ctx, rng)
+        start = time.perf_counter()
+        response = client.open(path, method=route.method, json=body, buffered=True) # Buffered: reads and closes the body, as a server does
+        timings.append((time.perf_counter() - start) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        error = route.error(response)
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    after = registry.snapshot()[0].get(route.endpoint, [0, 0.0, 0])
+
+    timings.sort()
+    handled = after[0] - before[0]
+    return {
+        "requests": count,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "queries_per_request": round((after[2] - before[2]) / handled, 2) if handled else None,
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "errors": errors,
+    }
+
+def compare(results, baseline, threshold):
+    """Regression messages of `results` against `baseline`."""
+    regressions = []
+    for name, result in results["routes"].items():
+        base = baseline["routes"].get(name)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if (result["queries_per_request"] or 0) >= (base["queries_per_request"] or 0) + QUERY_TOLERANCE:
+            regressions.append(f"{name}: queries/request {base['queries_per_request']} -> {result['queries_per_request']}")
+    if results["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + threshold):
+        regressions.append(f"peak RSS {baseline['peak_rss_mb']:.0f} -> {results['peak_rss_mb']:.0f} MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per route")
+    parser.add_argument("--db-dir", default=DEFAULT_DB_DIR, help="Where seeded datasets are kept between runs")
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=REFERENCE_DATE,
+                        help=f"Date the dataset's plan and ad dates are relative to (default {REFERENCE_DATE})")
+    parser.add_argument("--only", help="Only routes whose endpoint starts with this prefix")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed of the request mix")
+    parser.add_argument("--write-baseline", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    app, counts, path = open_database(args.scale, args.db_dir, args.reference_date)
+    ctx = {**counts, "app": app, "run": datetime.now().strftime("%Y%m%d%H%M%S"), "counter": itertools.count()}
+    ctx["clients"] = {role: app.test_client() for role in ("anonymous", "user", "admin", "scratch")}
+    log_in(ctx["clients"]["user"], USER_USERNAME, path)
+    log_in(ctx["clients"]["admin"], ADMIN_USERNAME, path)
+    rng = random.Random(args.seed)
+
+    results = {"scale": args.scale, "dataset": os.path.basename(path), "requests": args.requests, "routes": {}}
+    failures = []
+    print(f"{'route':<50} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6} {'RSS MB':>7}  statuses")
+    for route in routes():
+        if args.only and not route.endpoint.startswith(args.only):
+            continue
+        result = run_route(ctx, route, args.requests, rng)
+        errors = result.pop("errors")
+        if errors:
+            failures.append(f"{route.endpoint}: " + ", ".join(f"{error} x{n}" for error, n in errors.items()))
+        else:
+            results["routes"][route.endpoint] = result
+        statuses = ",".join(f"{status}x{n}" for status, n in result["statuses"].items())
+        print(f"{route.endpoint:<50} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+              f"{result['queries_per_request'] if result['queries_per_request'] is not None else '-':>6} {peak_rss_mb():>7.0f}  {statuses}")
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    print(f"peak RSS: {results['peak_rss_mb']:.0f} MB")
+    if failures:
+        for message in failures:
+            print(f"FAILED {message}")
+        sys.exit(1) # No baseline or comparison from a run with broken routes
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.write_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("dataset") != results["dataset"]:
+            print(f"warning: baseline was recorded on {baseline.get('dataset')}, this run is on {results['dataset']}")
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_json_compression.py
+"""Encode time and bytes on the wire of the heaviest JSON payloads.
+
+Builds the product, advertisement and user listing payloads (--rows items) plus a diet
+plan's meals_by_day, then reports the encode time with Flask's stdlib provider and
+with FastJSONProvider, and the body size before and after the gzip compression stage.
+
+Usage: python -m benchmarks.bench_json_compression [--rows 1000] [--repeat 20]
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import insert
+from src.extensions import db
+from src.models import Advertisement, Product, ProductCategory, User
+from src.json_provider import FastJSONProvider, orjson
+from src.compression import DEFAULT_LEVEL
+from src.serializers import ADVERTISEMENT_LIST, PRODUCT_LIST, USER_LIST
+from src.services import plan_service
+from benchmarks.common import make_bench_app
+
+def build_payloads(rows):
+    db.session.execute(insert(User), [{"username": f"user{i}", "email": f"user{i}@example.com", "password_hash": "x"} for i in range(rows)])
+    db.session.execute(insert(ProductCategory), [{"name": f"Category {i}", "slug": f"category-{i}"} for i in range(1, 11)])
+    db.session.execute(insert(Product), [
+        {"name": f"Product {i}", "slug": f"product-{i}", "description": "Whey protein isolate, 2kg. " * 4, "price": "39.90",
+         "stock_quantity": i % 40, "sku": f"SKU-{i}", "category_id": i % 10 + 1, "is_active": True}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(Advertisement), [
+        {"title": f"Ad {i}", "content": "Spring sale on supplements", "placement_area": "sidebar", "created_by_id": 1} for i in range(rows)
+    ])
+    db.session.commit()
+    meals = plan_service.generate_sample_daily_meals(2400, {"protein_g": 180, "carbs_g": 240, "fat_g": 80, "target_calories": 2400})
+    meals_by_day = {day: meals for day in range(1, 8)} # int keys, as diet_meals_by_day returns them
+    return {
+        "products": {"products": PRODUCT_LIST.dump_all(PRODUCT_LIST.query().limit(rows).all()), "total_products": rows},
+        "advertisements": {"advertisements": ADVERTISEMENT_LIST.dump_all(ADVERTISEMENT_LIST.query().limit(rows).all())},
+        "users": {"users": USER_LIST.dump_all(USER_LIST.query().limit(rows).all()), "total_users": rows},
+        "meals_by_day": {"meals_by_day": meals_by_day, "target_calories": 2400},
+    }
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_bench_app()
+    stdlib, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+    with app.app_context():
+        payloads = build_payloads(args.rows)
+        print(f"encoder: {'orjson' if orjson else 'stdlib (orjson not installed)'}; gzip level {DEFAULT_LEVEL}")
+        print(f"{'payload':>14} {'stdlib ms':>10} {'fast ms':>8} {'bytes':>9} {'gzip bytes':>11} {'gzip ms':>8}")
+        for name, payload in payloads.items():
+            with app.test_request_context():
+                stdlib_ms = timed(lambda: stdlib.response(payload), args.repeat)
+                fast_ms = timed(lambda: fast.response(payload), args.repeat)
+                body = fast.response(payload).get_data()
+            assert json.loads(body) == json.loads(stdlib.response(payload).get_data())
+            gzip_ms = timed(lambda: gzip.compress(body, compresslevel=DEFAULT_LEVEL), args.repeat)
+            compressed = gzip.compress(body, compresslevel=DEFAULT_LEVEL)
+            print(f"{name:>14} {stdlib_ms:>10.2f} {fast_ms:>8.2f} {len(body):>9} {len(compressed):>11} {gzip_ms:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_keyset_pagination.py
+"""Page latency at increasing depth: OFFSET paginate() vs. keyset cursors on the product listing.
+
+Usage: python -m benchmarks.bench_keyset_pagination [--rows 1000000] [--per-page 20]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+from src.extensions import db
+from src.models import Product, ProductCategory
+from src.services.pagination import encode_cursor, keyset_paginate
+from benchmarks.common import make_bench_app
+
+def seed_products(rows, chunk=50000):
+    db.session.add(ProductCategory(name="Bench", slug="bench"))
+    db.session.flush()
+    base = datetime(2020, 1, 1)
+    for offset in range(0, rows, chunk):
+        db.session.execute(insert(Product), [{
+            "name": f"Produto {i}", "slug": f"produto-{i}", "price": 9.99, "stock_quantity": 10,
+            "sku": f"SKU-{i}", "is_active": True, "is_featured": False, "category_id": 1,
+            "created_at": base + timedelta(seconds=i // 3) # Ties on created_at are resolved by id
+        } for i in range(offset, min(offset + chunk, rows))])
+    # Listing index on the sort key (the schema migrations create the equivalent index)
+    db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_bench_products_created_at_id ON products (created_at, id)"))
+    db.session.commit()
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--per-page", type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_bench_app()
+    with app.app_context():
+        started = time.perf_counter()
+        seed_products(args.rows)
+        print(f"seeded {args.rows} products in {time.perf_counter() - started:.1f}s")
+
+        query = Product.query.filter_by(is_active=True)
+        last_page = max(-(-args.rows // args.per_page), 1)
+        print(f"{'page':>10} {'offset ms':>12} {'keyset ms':>12}")
+        for page in sorted({min(page, last_page) for page in (1, 10, 1000, last_page // 2 or 1, last_page)}):
+            # The cursor of a deep page is the row right before it in (created_at DESC, id DESC) order
+            skip = (page - 1) * args.per_page
+            cursor = None
+            if skip:
+                row = db.session.execute(text(
+                    "SELECT created_at, id FROM products ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET :skip"
+                ), {"skip": skip - 1}).one()
+                cursor = encode_cursor("n", row.created_at, row.id)
+            offset_ms = timed(lambda: query.order_by(Product.created_at.desc()).paginate(page=page, per_page=args.per_page, error_out=False).items)
+            keyset_ms = timed(lambda: keyset_paginate(query, Product, args.per_page, cursor))
+            print(f"{page:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+if __name__ == "__main__":
+    main()
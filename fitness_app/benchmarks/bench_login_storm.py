@@ -0,0 +1,86 @@
+# benchmarks/bench_login_storm.py
+"""Login storm: password verification inline vs in the hashing process pool.
+
+--threads clients log in continuously while one probe thread calls a cheap endpoint;
+reports logins/s, 503s from the bounded queue and the probe's latency percentiles,
+i.e. how much hashing starves the rest of the request workers.
+
+Usage: python -m benchmarks.bench_login_storm [--threads 16] [--seconds 5] [--workers 0,2,4]
+"""
+import argparse
+import statistics
+import threading
+import time
+from flask import jsonify
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+from src.extensions import db
+from src.models import User
+from src.routes.auth import auth_bp
+from benchmarks.common import make_bench_app
+
+PASSWORD = "storm-password"
+
+def run(workers, threads, seconds):
+    app = make_bench_app(PASSWORD_HASH_WORKERS=workers, SECRET_KEY="bench")
+    app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.add_url_rule("/ping", "ping", lambda: jsonify({"ok": True}))
+    with app.app_context():
+        pwhash = generate_password_hash(PASSWORD)
+        db.session.execute(insert(User), [
+            {"username": f"u{i}", "email": f"u{i}@example.com", "password_hash": pwhash} for i in range(threads)
+        ])
+        db.session.commit()
+
+    counts = {"ok": 0, "busy": 0}
+    probe_latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(i):
+        http = app.test_client()
+        ok = busy = 0
+        while time.monotonic() < deadline:
+            status = http.post("/api/auth/login", json={"username": f"u{i}", "password": PASSWORD}).status_code
+            if status == 200:
+                ok += 1
+            elif status == 503:
+                busy += 1
+        with lock:
+            counts["ok"] += ok
+            counts["busy"] += busy
+
+    def probe():
+        http = app.test_client()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            http.get("/ping")
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    pool = [threading.Thread(target=client, args=(i,)) for i in range(threads)] + [threading.Thread(target=probe)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    hasher = app.extensions.get("password_hasher")
+    if hasher is not None:
+        hasher.shutdown()
+    return counts, probe_latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--workers", default="0,2,4", help="Comma-separated PASSWORD_HASH_WORKERS values (0 = inline)")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'logins/s':>9} {'503s':>6} {'probe p50 ms':>13} {'probe p95 ms':>13}")
+    for workers in (int(w) for w in args.workers.split(",")):
+        counts, latencies = run(workers, args.threads, args.seconds)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else float("nan")
+        print(f"{workers:>8} {counts['ok'] / args.seconds:>9.1f} {counts['busy']:>6} "
+              f"{statistics.median(latencies):>13.2f} {p95:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/bench_metrics_overhead.py
+"""Request overhead of the metrics instrumentation (src/metrics.py).
+
+Seeds --products products into three identical apps, one with METRICS_ENABLED and two
+without, then sends the same --requests catalog requests (product pages, product by slug,
+categories) to all of them, interleaved request by request (rotating which app goes first),
+so drift on the machine affects every side alike; the median of --rounds rounds is
+reported. The response cache is disabled so every request runs its SQL. The second app
+without metrics is a control: its difference from the first is the noise of the machine,
+which the end-to-end figure cannot resolve below.
+
+The instrumentation's own cost is then measured directly: the same WSGI request with and
+without RequestTimer, and the same statement with and without the SQL hooks (best of
+many runs), scaled by the statements per request of the catalog mix and compared with its
+median request time. Target: overhead under 2%.
+
+Usage: python -m benchmarks.bench_metrics_overhead [--requests 2000] [--rounds 7] [--products 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+import timeit
+from sqlalchemy import insert, text
+from werkzeug.test import EnvironBuilder
+from src.extensions import db
+from src.metrics import MetricsRegistry, RequestTimer, init_metrics
+from src.models import Product, ProductCategory
+from src.routes.shop_routes import public_shop_bp
+from benchmarks.common import make_bench_app
+
+def build_app(products, metrics):
+    app = make_bench_app(RESPONSE_CACHE_MAX_ENTRIES=0, METRICS_ENABLED=metrics)
+    init_metrics(app)
+    app.register_blueprint(public_shop_bp)
+    with app.app_context():
+        db.session.execute(insert(ProductCategory), [{"name": f"Category {i}", "slug": f"category-{i}"} for i in range(1, 11)])
+        db.session.execute(insert(Product), [
+            {"name": f"Product {i}", "slug": f"product-{i}", "price": "19.90", "category_id": i % 10 + 1, "is_active": True}
+            for i in range(products)
+        ])
+        db.session.commit()
+    return app
+
+def request_paths(products, count, seed=0):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.45:
+            paths.append(f"/api/shop/products?page={rng.randint(1, 50)}&per_page=12")
+        elif roll < 0.9:
+            paths.append(f"/api/shop/products/product-{rng.randrange(products)}")
+        else:
+            paths.append("/api/shop/categories")
+    return paths
+
+def run_round(clients, paths):
+    """Total seconds per app for `paths`, each path sent to every app back to back."""
+    totals = {name: 0.0 for name in clients}
+    order = list(clients)
+    for path in paths:
+        order.append(order.pop(0))
+        for name in order:
+            start = time.perf_counter()
+            clients[name].get(path, buffered=True) # Closes the body: the request is recorded on close
+            totals[name] += time.perf_counter() - start
+    return totals
+
+def best_difference_us(baseline, instrumented, number=300, rounds=50):
+    """Best-of-`rounds` us per call of `instrumented` minus that of `baseline`, timed alternately."""
+    baseline(), instrumented() # Warm-up
+    best = [float("inf"), float("inf")]
+    for _ in range(rounds):
+        for i, fn in enumerate((baseline, instrumented)):
+            best[i] = min(best[i], timeit.timeit(fn, number=number) / number * 1e6)
+    return best[1] - best[0]
+
+def request_cost_us(app):
+    """Extra us per request of RequestTimer around the app's WSGI callable, body read and closed.
+    Its work does not depend on the route, so a cheap unmatched path keeps the difference sharp."""
+    environ = EnvironBuilder(path="/metrics-overhead-probe").get_environ()
+    def call(wsgi_app):
+        body = wsgi_app(dict(environ), lambda status, headers, exc_info=None: None)
+        b"".join(body)
+        body.close()
+    plain, timed = app.wsgi_app, RequestTimer(MetricsRegistry(), app.wsgi_app)
+    return best_difference_us(lambda: call(plain), lambda: call(timed))
+
+def statement_cost_us(off_app, on_app):
+    """Extra us per statement of the SQL hooks: the same SELECT on an engine without and with them."""
+    connections = []
+    for app in (off_app, on_app):
+        with app.app_context():
+            connections.append(db.engine.connect())
+    statement = text("SELECT 1")
+    try:
+        return best_difference_us(*(lambda c=c: c.execute(statement).scalar() for c in connections), number=2000)
+    finally:
+        for connection in connections:
+            connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--products", type=int, default=2000)
+    args = parser.parse_args()
+
+    apps = {"off": build_app(args.products, False), "on": build_app(args.products, True),
+            "control": build_app(args.products, False)}
+    clients = {name: app.test_client() for name, app in apps.items()}
+    paths = request_paths(args.products, args.requests)
+    run_round(clients, paths[:200]) # Warm-up: connections, statement caches
+
+    timings = {name: [] for name in apps}
+    for _ in range(args.rounds):
+        for name, total in run_round(clients, paths).items():
+            timings[name].append(total)
+
+    off, on, control = (statistics.median(timings[name]) for name in ("off", "on", "control"))
+    print(f"{'metrics':>8} {'median s':>9} {'req/s':>9} {'us/req':>8}")
+    for name, value in (("off", off), ("on", on), ("control", control)):
+        print(f"{name:>8} {value:>9.3f} {args.requests / value:>9.0f} {value / args.requests * 1e6:>8.1f}")
+    print(f"end to end: {(on - off) / off * 100:+.2f}% ({(on - off) / args.requests * 1e6:+.1f} us/request); "
+          f"noise (control vs off): {(control - off) / off * 100:+.2f}%")
+
+    registry = apps["on"].extensions["metrics"]
+    endpoints = registry.snapshot()[0]
+    statements = sum(series[2] for series in endpoints.values()) / sum(series[0] for series in endpoints.values())
+    per_request, per_statement = request_cost_us(apps["off"]), statement_cost_us(apps["off"], apps["on"])
+    cost = per_request + statements * per_statement
+    print(f"instrumentation: {per_request:.1f} us/request + {statements:.1f} statements x {per_statement:.2f} us "
+          f"= {cost:.1f} us, {cost / (off / args.requests * 1e6) * 100:.2f}% of a request")
+
+    start = time.perf_counter()
+    text = registry.render_prometheus()
+    print(f"scrape: {len(text.splitlines())} lines, {(time.perf_counter() - start) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_plan_generate.py
+"""Compares plans generated per second: per-row ORM writes vs. the template-backed persistence pipeline.
+
+Usage: python -m benchmarks.bench_plan_generate [--plans 300]
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from src.extensions import db
+from src.models import User, DietPlan, DietPlanMeal, WorkoutPlan, WorkoutPlanDay, WorkoutExercise
+from src.services import plan_service, plan_templates
+from src.services.plan_persistence import persist_generated_plans
+from benchmarks.common import make_bench_app
+
+def _plan_inputs():
+    tdee = plan_service.calculate_tdee(plan_service.calculate_bmr("masculino", 80, 180, 30), 1.55)
+    macros = plan_service.calculate_macronutrients(plan_service.adjust_calories_for_goal(tdee, "manter"), "manter")
+    meals = plan_service.generate_sample_daily_meals(macros["target_calories"], macros)
+    workout_days = plan_service.generate_sample_workout_plan("moderado", "manter", 4)
+    return macros, meals, workout_days
+
+def legacy_persist(user_id, macros, meals, workout_days):
+    """The previous write path: one ORM object per row and a flush per plan day."""
+    DietPlan.query.filter_by(user_id=user_id, is_active=True).update({"is_active": False})
+    WorkoutPlan.query.filter_by(user_id=user_id, is_active=True).update({"is_active": False})
+    diet_plan = DietPlan(user_id=user_id, start_date=date.today(), end_date=date.today() + timedelta(days=30),
+                         daily_calories=macros["target_calories"], daily_protein_g=macros["protein_g"],
+                         daily_carbs_g=macros["carbs_g"], daily_fat_g=macros["fat_g"], is_active=True)
+    db.session.add(diet_plan)
+    db.session.flush()
+    for day_num in range(1, 8):
+        for meal_data in meals:
+            db.session.add(DietPlanMeal(diet_plan_id=diet_plan.id, day_of_week=day_num, **meal_data))
+    workout_plan = WorkoutPlan(user_id=user_id, start_date=date.today(), end_date=date.today() + timedelta(days=30),
+                               days_per_week=4, description="bench", is_active=True)
+    db.session.add(workout_plan)
+    db.session.flush()
+    for day_data in workout_days:
+        wp_day = WorkoutPlanDay(workout_plan_id=workout_plan.id, day_of_week=day_data["day_of_week"], focus=day_data["focus"])
+        db.session.add(wp_day)
+        db.session.flush()
+        for exercise_data in day_data["exercises"]:
+            db.session.add(WorkoutExercise(workout_plan_day_id=wp_day.id, **exercise_data))
+
+def template_persist(user_id, macros, meals, workout_days):
+    diet_template_id = plan_templates.get_diet_template_id(macros)
+    workout_template_id = plan_templates.get_workout_template_id("moderado", "manter", 4)
+    persist_generated_plans(user_id, macros, diet_template_id, workout_template_id, 4, "bench")
+
+def run(persist, plans):
+    app = make_bench_app()
+    macros, meals, workout_days = _plan_inputs()
+    with app.app_context():
+        user = User(username="bench", email="bench@example.com", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+        started = time.perf_counter()
+        for _ in range(plans):
+            persist(user.id, macros, meals, workout_days)
+            db.session.commit()
+        elapsed = time.perf_counter() - started
+    return plans / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--plans", type=int, default=300)
+    args = parser.parse_args()
+
+    legacy = run(legacy_persist, args.plans)
+    templated = run(template_persist, args.plans)
+    print(f"legacy ORM path  : {legacy:8.1f} plans/s")
+    print(f"template pipeline: {templated:8.1f} plans/s ({templated / legacy:.2f}x)")
+
+if __name__ == "__main__":
+    main()
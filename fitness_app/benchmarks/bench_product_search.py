@@ -0,0 +1,128 @@
+# benchmarks/bench_product_search.py
+"""Latency of GET /api/shop/search (FTS5, BM25 ranking, snippets, keyset paging) on a large catalog.
+
+Seeds --products products with the `flask seed` generator (the file is kept in --db-dir and
+reused by later runs; the FTS triggers index the rows as they are inserted) and times
+--requests requests per query class through the Flask test client, with the response
+cache off: a product number (rare), an exact SKU, a common word, a 3-letter
+prefix, two words, and the 10th page of a common word (following cursors). For the
+common word and the rare query the old alternative, a LIKE '%word%' scan of name and
+description, is timed too.
+
+Usage: python -m benchmarks.bench_product_search [--products 1000000] [--requests 100] [--db-dir DIR]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from urllib.parse import urlencode
+from sqlalchemy import func, or_, select
+from src.extensions import db
+from src.migrations import upgrade_schema
+from src.models import Product
+from src.serializers import PRODUCT_LIST
+from src.services.seeding import PRODUCT_ADJECTIVES, PRODUCT_NOUNS, seed_database
+from benchmarks.bench_endpoints import percentile
+from benchmarks.common import make_bench_app
+
+DEFAULT_DB_DIR = os.path.join(tempfile.gettempdir(), "fitness_bench_datasets")
+PER_PAGE = 12
+DEEP_PAGE = 10
+LIKE_REQUESTS = 5 # Full scans: a few are enough
+
+def open_database(products, db_dir):
+    from src.routes.shop_routes import public_shop_bp
+    os.makedirs(db_dir, exist_ok=True)
+    path = os.path.join(db_dir, f"bench_search_{products}.db")
+    app = make_bench_app(path, DB_ENGINE_PROFILE="production", RESPONSE_CACHE_MAX_ENTRIES=0)
+    app.register_blueprint(public_shop_bp)
+    with app.app_context():
+        upgrade_schema() # The FTS index and its triggers (migration 3)
+        existing = db.session.execute(select(func.count()).select_from(Product)).scalar()
+        if existing < products:
+            result = seed_database(products=products - existing, categories=0 if existing else 20)
+            print(f"seeded {path}: {result['rows']} in {result['seconds']:.1f}s ({result['rows_per_second']:.0f} rows/s)")
+    return app
+
+def query_classes(products):
+    """name -> function(rng) returning the search text."""
+    words = lambda phrase: phrase.lower().split()
+    return {
+        "rare (product number)": lambda rng: str(rng.randint(1, products)),
+        "exact sku": lambda rng: f"SKU-{rng.randint(1, products):08d}",
+        "common word": lambda rng: words(rng.choice(PRODUCT_NOUNS))[0],
+        "3-letter prefix": lambda rng: words(rng.choice(PRODUCT_NOUNS))[0][:3],
+        "two words": lambda rng: f"{rng.choice(PRODUCT_ADJECTIVES).lower()} {words(rng.choice(PRODUCT_NOUNS))[0]}",
+    }
+
+def search(client, text, cursor=None):
+    args = {"q": text, "per_page": PER_PAGE}
+    if cursor:
+        args["cursor"] = cursor
+    response = client.get("/api/shop/search?" + urlencode(args))
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+def count_matches(client, text):
+    return client.get("/api/shop/search?" + urlencode({"q": text, "include_total": 1})).get_json()["total_products"]
+
+def like_scan(text):
+    pattern = f"%{text}%"
+    return PRODUCT_LIST.query().filter(Product.is_active == True, or_(Product.name.ilike(pattern), Product.description.ilike(pattern))) \
+        .order_by(Product.created_at.desc()).limit(PER_PAGE).all()
+
+def summarize(name, samples, hits):
+    samples.sort()
+    hits = f"{sum(hits) / len(hits):.0f}" if hits else "-"
+    print(f"{name:<28} {percentile(samples, 50):>8.2f} {percentile(samples, 95):>8.2f} {percentile(samples, 99):>8.2f} {hits:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=100, help="Timed requests per query class")
+    parser.add_argument("--db-dir", default=DEFAULT_DB_DIR, help="Where the seeded catalog is kept between runs")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed of the queries")
+    args = parser.parse_args()
+
+    app = open_database(args.products, args.db_dir)
+    client = app.test_client()
+    rng = random.Random(args.seed)
+    classes = query_classes(args.products)
+    for make_text in classes.values(): # Warm-up: page cache and prepared statements
+        search(client, make_text(rng))
+
+    print(f"{'query':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'matches':>9}")
+    for name, make_text in classes.items():
+        samples, hits = [], []
+        for _ in range(args.requests):
+            text = make_text(rng)
+            started = time.perf_counter()
+            search(client, text)
+            samples.append((time.perf_counter() - started) * 1000)
+            if len(hits) < 5: # Match counts cost a COUNT: only for the first few queries
+                hits.append(count_matches(client, text))
+        summarize(name, samples, hits)
+
+    samples = []
+    for _ in range(args.requests):
+        text, cursor = classes["common word"](rng), None
+        for _ in range(DEEP_PAGE - 1):
+            cursor = search(client, text, cursor)["next_cursor"]
+        started = time.perf_counter()
+        search(client, text, cursor)
+        samples.append((time.perf_counter() - started) * 1000)
+    summarize(f"common word, page {DEEP_PAGE}", samples, [])
+
+    with app.app_context():
+        for name in ("common word", "rare (product number)"):
+            samples = []
+            for _ in range(LIKE_REQUESTS):
+                text = classes[name](rng)
+                started = time.perf_counter()
+                like_scan(text)
+                samples.append((time.perf_counter() - started) * 1000)
+            summarize(f"LIKE scan: {name}", samples, [])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_serializers.py
+"""ORM to_dict() vs column-projected serializers (src/serializers.py) for one big listing page.
+
+Seeds --rows products and advertisements (half of the ads with a creator) and serializes
+a page of --rows items both ways, reporting the median latency over --repeat runs and
+the peak Python memory of one run (tracemalloc).
+
+Usage: python -m benchmarks.bench_serializers [--rows 10000] [--repeat 5]
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from sqlalchemy import insert
+from src.extensions import db
+from src.models import Advertisement, Product, ProductCategory, User
+from src.routes.shop_routes import products_with_category
+from src.serializers import ADVERTISEMENT_LIST, PRODUCT_LIST
+from benchmarks.common import make_bench_app
+
+def seed(rows):
+    db.session.execute(insert(User), [{"username": f"admin{i}", "email": f"admin{i}@example.com", "password_hash": "x", "is_admin": True} for i in range(1, 11)])
+    db.session.execute(insert(ProductCategory), [{"name": f"Category {i}", "slug": f"category-{i}"} for i in range(1, 21)])
+    db.session.execute(insert(Product), [
+        {"name": f"Product {i}", "slug": f"product-{i}", "description": "Lorem ipsum " * 10, "price": "24.90",
+         "stock_quantity": i % 50, "sku": f"SKU-{i}", "category_id": i % 20 + 1, "is_active": True}
+        for i in range(rows)
+    ])
+    db.session.execute(insert(Advertisement), [
+        {"title": f"Ad {i}", "content": "Promo", "placement_area": "sidebar", "is_active": True,
+         "clicks": 0, "views": 0, "created_by_id": (i % 10 + 1) if i % 2 else None}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all() # A fresh request: nothing in the identity map
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+        db.session.rollback()
+    db.session.expunge_all()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.rollback()
+    return statistics.median(timings), peak / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = make_bench_app()
+    with app.app_context():
+        seed(args.rows)
+        cases = [
+            ("products to_dict", lambda: [p.to_dict() for p in products_with_category().order_by(Product.created_at.desc()).limit(args.rows).all()]),
+            ("products projected", lambda: PRODUCT_LIST.dump_all(PRODUCT_LIST.query().order_by(Product.created_at.desc()).limit(args.rows).all())),
+            ("ads to_dict", lambda: [ad.to_dict() for ad in Advertisement.query.order_by(Advertisement.created_at.desc()).limit(args.rows).all()]),
+            ("ads projected", lambda: ADVERTISEMENT_LIST.dump_all(ADVERTISEMENT_LIST.query().order_by(Advertisement.created_at.desc()).limit(args.rows).all())),
+        ]
+        print(f"{'case':>20} {'median ms':>10} {'peak MiB':>9}   ({args.rows} rows per page)")
+        for name, fn in cases:
+            latency, peak = measure(fn, args.repeat)
+            print(f"{name:>20} {latency:>10.1f} {peak:>9.1f}")
+
+if __name__ == "__main__":
+    main()
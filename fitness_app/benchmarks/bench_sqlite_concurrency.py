@@ -0,0 +1,81 @@
+# benchmarks/bench_sqlite_concurrency.py
+"""Mixed read/write throughput of the SQLite engine profiles under concurrent threads.
+
+Each worker thread loops for --seconds: with probability --write-ratio it inserts a
+user profile row and commits, otherwise it reads a random profile by user_id.
+
+Usage: python -m benchmarks.bench_sqlite_concurrency [--threads 16] [--seconds 5] [--write-ratio 0.2]
+"""
+import argparse
+import random
+import threading
+import time
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from src.extensions import db
+from src.models import User, UserProfile
+from benchmarks.common import make_bench_app
+
+SEED_USERS = 10000
+
+def run_profile(profile, threads, seconds, write_ratio):
+    app = make_bench_app(DB_ENGINE_PROFILE=profile)
+    with app.app_context():
+        db.session.execute(insert(User), [
+            {"username": f"u{i}", "email": f"u{i}@example.com", "password_hash": "x"} for i in range(1, SEED_USERS + 1)
+        ])
+        db.session.commit()
+
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+    next_user = iter(range(1, SEED_USERS + 1))
+
+    def worker(seed):
+        rng = random.Random(seed)
+        reads = writes = locked = 0
+        with app.app_context():
+            while time.monotonic() < deadline:
+                try:
+                    if rng.random() < write_ratio:
+                        with lock:
+                            user_id = next(next_user, None)
+                        if user_id is None:
+                            break
+                        db.session.execute(insert(UserProfile).values(user_id=user_id, age=30, weight_kg=70.0))
+                        db.session.commit()
+                        writes += 1
+                    else:
+                        db.session.execute(select(UserProfile).where(UserProfile.user_id == rng.randint(1, SEED_USERS))).first()
+                        db.session.rollback() # End the read transaction, as a request teardown would
+                        reads += 1
+                except OperationalError: # "database is locked"
+                    db.session.rollback()
+                    locked += 1
+            db.session.remove()
+        with lock:
+            counts["reads"] += reads
+            counts["writes"] += writes
+            counts["locked"] += locked
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{'profile':>12} {'reads/s':>10} {'writes/s':>10} {'locked errors':>14}")
+    for profile in ("default", "production"):
+        counts = run_profile(profile, args.threads, args.seconds, args.write_ratio)
+        print(f"{profile:>12} {counts['reads'] / args.seconds:>10.0f} {counts['writes'] / args.seconds:>10.0f} {counts['locked']:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_startup.py
+"""Cold-start cost of a worker: import-time breakdown and time to first request.
+
+Each mode runs in fresh interpreters (--runs times, median reported):
+  eager  - the defaults: every route module imported, create_all + migrations in create_app
+  fast   - LAZY_BLUEPRINTS=1 and DB_AUTO_CREATE=0 (schema prepared beforehand by `flask init-db`)
+and reports import of src.main, create_app() and the first /api/health and /api/shop/categories
+requests. The slowest modules come from `python -X importtime`. Use --json to keep results
+for comparison across releases.
+
+Most of the import of src.main is Flask, Flask-SQLAlchemy and SQLAlchemy, which both modes pay.
+fast mainly shortens create_app (no create_all or migrations) and moves the route modules, numpy
+and the models to the first request, so its total is only somewhat lower than eager's.
+
+Usage: python -m benchmarks.bench_startup [--runs 5] [--top 15] [--json startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+FITNESS_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter; prints one JSON line of timings in ms
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import src.main as main
+t1 = time.perf_counter()
+main.INSTANCE_FOLDER_PATH = sys.argv[1]
+app = main.create_app(json.loads(sys.argv[2]))
+t2 = time.perf_counter()
+client = app.test_client()
+assert client.get("/api/health").status_code == 200
+t3 = time.perf_counter()
+assert client.get("/api/shop/categories").status_code == 200
+t4 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "create_app_ms": (t2 - t1) * 1000,
+                  "first_request_ms": (t3 - t2) * 1000, "first_db_request_ms": (t4 - t3) * 1000,
+                  "total_ms": (t4 - t0) * 1000}))
+"""
+
+MODES = {
+    "eager": {},
+    "fast": {"LAZY_BLUEPRINTS": True, "DB_AUTO_CREATE": False},
+}
+
+def prepare_database(workdir):
+    db_path = os.path.join(workdir, "startup.db")
+    config = {"SQLALCHEMY_DATABASE_URI": "sqlite:///" + db_path, "AD_COUNTER_FLUSH_SECONDS": 0}
+    # One eager start creates and migrates the schema, as `flask init-db` would
+    subprocess.run([sys.executable, "-c", PROBE, workdir, json.dumps(config)], cwd=FITNESS_APP_DIR, check=True, capture_output=True)
+    return config
+
+def run_probe(workdir, config):
+    result = subprocess.run([sys.executable, "-c", PROBE, workdir, json.dumps(config)],
+                            cwd=FITNESS_APP_DIR, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def import_breakdown(top):
+    """Slowest modules (cumulative µs) when importing src.main, from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"],
+                            cwd=FITNESS_APP_DIR, check=True, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="fitness_startup_")
+    base_config = prepare_database(workdir)
+    results = {}
+    print(f"{'mode':>6} {'import':>8} {'create_app':>11} {'1st req':>8} {'1st DB req':>11} {'total ms':>9}")
+    for mode, overrides in MODES.items():
+        runs = [run_probe(workdir, {**base_config, **overrides}) for _ in range(args.runs)]
+        results[mode] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        r = results[mode]
+        print(f"{mode:>6} {r['import_ms']:>8.1f} {r['create_app_ms']:>11.1f} {r['first_request_ms']:>8.1f} "
+              f"{r['first_db_request_ms']:>11.1f} {r['total_ms']:>9.1f}")
+
+    print("\nSlowest imports of src.main (cumulative):")
+    breakdown = import_breakdown(args.top)
+    for name, self_us, cumulative_us in breakdown:
+        print(f"{cumulative_us / 1000:>9.1f} ms  {name}")
+    results["imports"] = [{"module": name, "self_us": self_us, "cumulative_us": cumulative_us} for name, self_us, cumulative_us in breakdown]
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# benchmarks/common.py
+import os
+import tempfile
+from flask import Flask
+from src.extensions import db
+from src.database import configure_database, install_engine_hooks
+import src.models # Registers all models on db.metadata
+
+def make_bench_app(db_path=None, **config):
+    """Creates a minimal Flask app bound to a throwaway SQLite file with the full schema.
+
+    Extra keyword arguments go to app.config (e.g. DB_ENGINE_PROFILE="production").
+    """
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="fitness_bench_"), "bench.db")
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + db_path
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config.update(config)
+    configure_database(app, app.config["SQLALCHEMY_DATABASE_URI"])
+    db.init_app(app)
+    install_engine_hooks(app)
+    with app.app_context():
+        db.create_all()
+    return app
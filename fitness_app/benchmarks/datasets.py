@@ -0,0 +1,26 @@
+# benchmarks/datasets.py
+"""Seeded benchmark datasets at a few fixed scales, generated by src/services/seeding.py
+(the `flask seed` command). Same seeder version, seed and reference date, same rows."""
+from datetime import date
+from src.services.seeding import PLACEMENTS, SEEDER_VERSION, seed_database
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000} # Users and products; ads are a tenth
+BENCH_PASSWORD = "bench-password"
+ADMIN_USERNAME = "admin1" # The seeder names administrators admin<id> and everyone else user<id>
+USER_USERNAME = "user2" # Regular user with a profile and active plans
+CATEGORY_COUNT = 20
+# Plan and ad dates are relative to it. Seeded ads stay live for up to 60 days after it: once the
+# ad routes serve no ads, move it forward (a new date is a new dataset file)
+REFERENCE_DATE = date(2026, 10, 1)
+
+def dataset_file_name(scale: str, seed: int = 0, reference_date: date = REFERENCE_DATE) -> str:
+    """File name of a dataset, keyed by everything that decides its rows."""
+    return f"bench_{scale}_seeder{SEEDER_VERSION}_seed{seed}_{reference_date:%Y%m%d}.db"
+
+def seed_dataset(scale: str, seed: int = 0, reference_date: date = REFERENCE_DATE) -> dict:
+    """Fills the (empty) database of the current app context; returns the row counts."""
+    users = SCALES[scale]
+    ads = max(users // 10, 10)
+    seed_database(users=users, products=users, advertisements=ads, categories=CATEGORY_COUNT, admins=1, seed=seed,
+                  password=BENCH_PASSWORD, reference_date=reference_date)
+    return {"users": users, "products": users, "advertisements": ads}
@@ -0,0 +1,82 @@
+# conftest.py
+# Shared pytest fixtures. Run from fitness_app/: python -m pytest
+import os
+import tempfile
+from datetime import date, timedelta
+import pytest
+
+@pytest.fixture
+def app():
+    """App from create_app() on a throwaway SQLite database, with the background ad counter flush
+    and the password hashing pool off."""
+    import src.main as main # Imported here so collecting tests does not load the app
+    instance_dir = tempfile.mkdtemp(prefix="fitness_test_")
+    app = main.create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(instance_dir, "test.db"),
+        "AD_COUNTER_FLUSH_SECONDS": 0,
+        "PASSWORD_HASH_WORKERS": 0,
+    })
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def query_budget(app):
+    """Asserts statement budgets for the requests made inside `with query_budget(...)`.
+
+        with query_budget(max_repeats=1, budgets={"public_shop.list_public_products": 2}):
+            client.get("/api/shop/products")
+
+    Fails when a request runs one normalized statement more than max_repeats times (an N+1)
+    or more statements than its endpoint's budget. See src/query_profiler.py.
+    """
+    from src.query_profiler import QueryBudget
+
+    def make_budget(max_repeats=1, budgets=None):
+        return QueryBudget(app, max_repeats=max_repeats, budgets=budgets)
+    return make_budget
+
+@pytest.fixture
+def make_user(app):
+    """make_user(username, is_admin=False) -> id of a new user (no usable password)."""
+    from src.extensions import db
+    from src.models import User
+
+    def create(username, is_admin=False):
+        with app.app_context():
+            user = User(username=username, email=f"{username}@example.com", password_hash="!", is_admin=is_admin)
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return create
+
+@pytest.fixture
+def login(client):
+    """login(user_id) puts the user in the test client's session, as POST /api/auth/login does."""
+    def log_in(user_id):
+        with client.session_transaction() as session:
+            session["user_id"] = user_id
+    return log_in
+
+@pytest.fixture
+def make_workout_plan(app):
+    """make_workout_plan(user_id, days, exercises_per_day=3) -> id of a new active workout plan
+    with its own day and exercise rows (no shared template)."""
+    from src.extensions import db
+    from src.models import WorkoutExercise, WorkoutPlan, WorkoutPlanDay
+
+    def create(user_id, days, exercises_per_day=3):
+        with app.app_context():
+            plan = WorkoutPlan(user_id=user_id, start_date=date.today(), end_date=date.today() + timedelta(days=28),
+                               days_per_week=days, description="Plano de teste", is_active=True)
+            for day in range(1, days + 1):
+                plan.days.append(WorkoutPlanDay(day_of_week=day, focus=f"Foco {day}", exercises=[
+                    WorkoutExercise(exercise_name=f"Exercício {day}.{n}", sets=3, reps="10") for n in range(exercises_per_day)
+                ]))
+            db.session.add(plan)
+            db.session.commit()
+            return plan.id
+    return create
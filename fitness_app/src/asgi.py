@@ -0,0 +1,225 @@
+# src/asgi.py
+# ASGI entry point. Public shop and ad reads run as async views over an aiosqlite engine;
+# every other request is handed to the regular Flask (WSGI) app in a worker thread.
+#
+# Run from fitness_app/ with any ASGI server, e.g.:
+#     uvicorn --factory src.asgi:create_asgi_app --workers 4
+import asyncio
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy import event, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import joinedload
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_accept_header
+from werkzeug.routing import RequestRedirect
+from urllib.parse import parse_qsl
+
+from src.compression import compress_response
+from src.database import _pragma_listener
+from src.lazy_blueprints import ensure_blueprints_loaded
+from src.models import Advertisement, Product
+from src.routes.shop_routes import CATALOG_CACHE, categories_with_counts_statement, public_products_listing
+from src.services.ad_counters import get_ad_counters
+from src.services.ad_index import get_ad_index
+from src.services.response_cache import get_response_cache
+
+def create_async_engine_for(app):
+    """Async engine on the app's primary SQLite database, or None for other backends.
+
+    The primary (not the replica) is used so that responses stored in the shared
+    catalog cache are never older than the last catalog version bump.
+    """
+    url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    engine = create_async_engine(url.set(drivername="sqlite+aiosqlite"), **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    if pragmas:
+        event.listen(engine.sync_engine, "connect", _pragma_listener(pragmas))
+    return engine
+
+def _json_response(app, data, status=200):
+    response = app.json.response(data) # Same bytes as jsonify() in the sync views
+    response.status_code = status
+    return response
+
+# --- Views assíncronas (mesmos payloads que public_shop_bp e public_ads_bp) ---
+
+async def list_public_product_categories(server, session, args, view_args):
+    rows = (await session.execute(categories_with_counts_statement())).all()
+    return [category.to_dict(product_count=product_count) for category, product_count in rows], 200
+
+async def run_statements(session, builder):
+    """Async counterpart of shop_routes.run_statements(): runs the builder's statements on `session`."""
+    try:
+        statement = next(builder)
+        while True:
+            statement = builder.send(await session.execute(statement))
+    except StopIteration as done:
+        return done.value
+
+async def list_public_products(server, session, args, view_args):
+    if "cursor" in args or args.get("pagination") == "cursor":
+        return None # Keyset pages are served by the sync view
+    return await run_statements(session, public_products_listing(args))
+
+async def get_public_product_by_slug(server, session, args, view_args):
+    product = (await session.execute(
+        select(Product).options(joinedload(Product.category)).where(Product.slug == view_args["slug"], Product.is_active == True).limit(1)
+    )).unique().scalar()
+    if not product:
+        return {"error": "Produto não encontrado ou indisponível."}, 404
+    return product.to_dict(), 200
+
+async def get_active_ads_by_placement(server, session, args, view_args):
+    # In-memory index and write-behind counters: no DB round trip on the request path. Only a
+    # (re)load of the index queries the DB, synchronously: that one goes to a worker thread.
+    def sample():
+        with server.app.app_context():
+            ads_data = get_ad_index().sample(view_args["placement_area"])
+            get_ad_counters().add_views([ad["id"] for ad in ads_data])
+        return ads_data
+
+    with server.app.app_context():
+        fresh = get_ad_index().is_fresh()
+    ads_data = sample() if fresh else await asyncio.get_running_loop().run_in_executor(None, sample)
+    return ads_data, 200
+
+async def track_ad_click(server, session, args, view_args):
+    ad_id = view_args["ad_id"]
+    target_url = (await session.execute(select(Advertisement.target_url).where(Advertisement.id == ad_id))).first()
+    if target_url is None:
+        return {"error": "Anúncio não encontrado."}, 404
+    with server.app.app_context():
+        get_ad_counters().add_click(ad_id)
+    server.app.logger.info(f"Ad {ad_id} clicked. Target: {target_url[0]}")
+    return {"message": "Click registado.", "target_url": target_url[0]}, 200
+
+# endpoint -> (async view, response cache name or None, error message for the 500 response)
+ASYNC_VIEWS = {
+    "public_shop.list_public_product_categories": (list_public_product_categories, CATALOG_CACHE, "Ocorreu um erro ao carregar as categorias."),
+    "public_shop.list_public_products": (list_public_products, CATALOG_CACHE, "Ocorreu um erro ao carregar os produtos."),
+    "public_shop.get_public_product_by_slug": (get_public_product_by_slug, CATALOG_CACHE, "Ocorreu um erro ao carregar o produto."),
+    "public_advertisements.get_active_ads_by_placement": (get_active_ads_by_placement, None, "Ocorreu um erro ao carregar anúncios."),
+    "public_advertisements.track_ad_click": (track_ad_click, None, "Ocorreu um erro ao registar o click."),
+}
+
+# --- Servidor ASGI ---
+
+class AsyncReadServer:
+    """ASGI app: the endpoints in ASYNC_VIEWS run on the event loop, the rest goes to the WSGI app.
+
+    URLs are matched with the Flask app's own url_map, so both modes expose the same routes.
+    Catalog responses share the sync views' response cache (entries, ETags and version bumps).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.engine = create_async_engine_for(app)
+        self.url_adapter = app.url_map.bind("localhost")
+        if self.engine is None:
+            app.logger.info("ASGI: async views need a SQLite file database; serving every route through WSGI.")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        view = self._match(scope) if scope["type"] == "http" and self.engine is not None else None
+        if view is None:
+            # Each request gets its own thread; asgiref would otherwise run all WSGI calls in one shared thread
+            async with ThreadSensitiveContext():
+                return await self.wsgi(scope, receive, send)
+        endpoint, view_args = view
+        args = MultiDict(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+        headers = Headers([(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope.get("headers", [])])
+        # Just what make_conditional() and get_app_iter() look at
+        environ = {"REQUEST_METHOD": scope["method"]}
+        if "If-None-Match" in headers:
+            environ["HTTP_IF_NONE_MATCH"] = headers["If-None-Match"]
+        response = await self._dispatch(endpoint, view_args, args, environ)
+        if response is None:
+            async with ThreadSensitiveContext():
+                return await self.wsgi(scope, receive, send)
+        if self.app.config.get("COMPRESS_ENABLED", True):
+            compress_response(response, parse_accept_header(headers.get("Accept-Encoding")), self.app.config)
+        await self._send(send, response, environ, headers.get("Origin"))
+
+    def _match(self, scope):
+        if scope["method"] not in ("GET", "POST"):
+            return None
+        try:
+            endpoint, view_args = self.url_adapter.match(scope["path"], method=scope["method"])
+        except (HTTPException, RequestRedirect):
+            return None
+        return (endpoint, view_args) if endpoint in ASYNC_VIEWS else None
+
+    async def _dispatch(self, endpoint, view_args, args, environ):
+        view, cache_name, error_message = ASYNC_VIEWS[endpoint]
+        cache = key = None
+        if cache_name:
+            with self.app.app_context():
+                cache = get_response_cache(cache_name)
+            # Same key as the cached_response decorator, so sync and async requests share entries
+            key = (cache.version, endpoint, tuple(sorted(view_args.items())), tuple(sorted(args.items(multi=True))))
+            entry = cache.get(key)
+            if entry is not None:
+                return self._from_cache_entry(cache, entry, environ)
+        try:
+            async with AsyncSession(self.engine) as session:
+                result = await view(self, session, args, view_args)
+        except Exception as e:
+            self.app.logger.error(f"Error in async view {endpoint}: {str(e)}", exc_info=True)
+            return _json_response(self.app, {"error": error_message}, 500)
+        if result is None:
+            return None
+        data, status = result
+        response = _json_response(self.app, data, status)
+        if cache is None or status != 200:
+            return response
+        entry = cache.put(key, response.get_data(), status, response.mimetype)
+        return self._from_cache_entry(cache, entry, environ) if entry is not None else response
+
+    def _from_cache_entry(self, cache, entry, environ):
+        body, status, mimetype, etag, _ = entry
+        response = self.app.response_class(body, status=status, mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        response.make_conditional(environ)
+        if response.status_code == 304:
+            cache.record_not_modified()
+        return response
+
+    async def _send(self, send, response, environ, origin):
+        if origin:
+            # Mirrors CORS(app, supports_credentials=True) in create_app
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.vary.add("Origin")
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()],
+        })
+        await send({"type": "http.response.body", "body": b"".join(response.get_app_iter(environ))}) # Empty for 304
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.engine is not None:
+                    await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+def create_asgi_app(app=None):
+    """Builds the ASGI application around a Flask app (create_app() by default)."""
+    if app is None:
+        from src.main import create_app
+        app = create_app()
+    ensure_blueprints_loaded(app) # Routes are matched against the app's url_map
+    return AsyncReadServer(app)
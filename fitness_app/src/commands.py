@@ -0,0 +1,88 @@
+# src/commands.py
+# Flask CLI commands, registered on the app in create_app (run with: flask --app src.main <command>)
+# Services are imported inside each command so that loading this module stays cheap at app startup.
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+@click.command("recompute-targets")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=None, help="Plans processed per batch [default: DEFAULT_CHUNK_SIZE, 5000].")
+@with_appcontext
+def recompute_targets_command(chunk_size):
+    """Recompute calories and macros of every active diet plan from the user profiles."""
+    from src.services.target_recompute import recompute_active_diet_targets, DEFAULT_CHUNK_SIZE
+    stats = recompute_active_diet_targets(chunk_size=chunk_size or DEFAULT_CHUNK_SIZE)
+    click.echo(f"Processed {stats['processed']} active plans: {stats['updated']} updated, "
+               f"{stats['skipped_invalid']} skipped (incomplete or invalid profile).")
+
+@click.command("db-upgrade")
+@with_appcontext
+def db_upgrade_command():
+    """Apply pending schema migrations (new columns and indexes) to the database."""
+    from src.migrations import upgrade_schema
+    applied = upgrade_schema()
+    click.echo(f"Applied migrations: {applied}" if applied else "Schema is up to date.")
+
+@click.command("check-query-plans")
+@with_appcontext
+def check_query_plans_command():
+    """Fail if EXPLAIN QUERY PLAN shows a full table scan in any route's hot queries."""
+    from src.query_plans import find_full_scans
+    problems = find_full_scans()
+    for name, detail in problems:
+        click.echo(f"FULL SCAN in {name}: {detail}", err=True)
+    if problems:
+        raise SystemExit(1)
+    click.echo("No full table scans in the hot queries.")
+
+@click.command("sync-replica")
+@with_appcontext
+def sync_replica_command():
+    """Copy the primary SQLite database onto the local replica (REPLICA_DATABASE_URL)."""
+    from src.db_routing import sync_replica
+    if sync_replica(current_app._get_current_object()):
+        click.echo("Replica synced from the primary.")
+    else:
+        click.echo("No replica configured (set REPLICA_DATABASE_URL).")
+
+@click.command("init-db")
+@with_appcontext
+def init_db_command():
+    """Create missing tables, apply pending migrations and sync the replica (needed when DB_AUTO_CREATE is off)."""
+    import src.models # Every model, so create_all sees all the tables
+    from src.extensions import db
+    from src.migrations import upgrade_schema
+    from src.db_routing import sync_replica
+    db.create_all()
+    applied = upgrade_schema()
+    click.echo(f"Schema created; applied migrations: {applied}" if applied else "Schema created and up to date.")
+    if sync_replica(current_app._get_current_object()):
+        click.echo("Replica synced from the primary.")
+
+@click.command("seed")
+@click.option("--users", type=int, default=1000, show_default=True, help="Users, each with profile, preferences and active plans.")
+@click.option("--products", type=int, default=1000, show_default=True)
+@click.option("--ads", type=int, default=100, show_default=True, help="Advertisements.")
+@click.option("--categories", type=int, default=10, show_default=True, help="New product categories (0 reuses the existing ones).")
+@click.option("--admins", type=int, default=1, show_default=True, help="How many of the new users are administrators.")
+@click.option("--legacy-plan-ratio", type=click.FloatRange(0, 1), default=0.1, show_default=True,
+              help="Share of plans with their own meal/day/exercise rows instead of a shared template.")
+@click.option("--seed", type=int, default=0, show_default=True,
+              help="RNG seed: with the same --reference-date, on an empty database, the same seed gives the same data.")
+@click.option("--reference-date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Date the plan and ad dates are relative to [default: today].")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=None, help="Rows per INSERT executemany and transaction [default: 20000].")
+@click.option("--password", default=None, help="Password of every seeded user [default: DEFAULT_PASSWORD, fitness-seed].")
+@with_appcontext
+def seed_command(users, products, ads, categories, admins, legacy_plan_ratio, seed, reference_date, chunk_size, password):
+    """Add synthetic users, plans, products and ads (appends to existing data; ids continue after the existing rows)."""
+    from src.services.seeding import seed_database, DEFAULT_CHUNK_SIZE, DEFAULT_PASSWORD
+    result = seed_database(
+        users=users, products=products, advertisements=ads, categories=categories, admins=admins,
+        legacy_plan_ratio=legacy_plan_ratio, seed=seed, chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+        password=password or DEFAULT_PASSWORD, reference_date=reference_date.date() if reference_date else None,
+    )
+    for table, rows in result["rows"].items():
+        click.echo(f"{table:>20}: {rows}")
+    click.echo(f"Inserted {sum(result['rows'].values())} rows in {result['seconds']:.1f}s "
+               f"({result['rows_per_second']:.0f} rows/s).")
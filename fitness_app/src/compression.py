@@ -0,0 +1,65 @@
+# src/compression.py
+# gzip compression of dynamic responses: small bodies are left alone, big ones are compressed as a stream.
+import gzip
+import zlib
+from flask import request
+
+DEFAULT_MIN_SIZE = 1024 # Below this the gzip header and CPU cost outweigh the savings
+DEFAULT_STREAM_MIN_SIZE = 256 * 1024 # From here on the body is compressed chunk by chunk
+DEFAULT_LEVEL = 6
+STREAM_CHUNK_SIZE = 64 * 1024
+COMPRESSIBLE_MIMETYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _chunked(body):
+    for start in range(0, len(body), STREAM_CHUNK_SIZE):
+        yield body[start:start + STREAM_CHUNK_SIZE]
+
+def compress_response(response, accept_encodings, config):
+    """gzips `response` in place when the client accepts it and it is worth it; returns the response."""
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in config.get("COMPRESS_MIMETYPES", COMPRESSIBLE_MIMETYPES)):
+        return response
+    response.vary.add("Accept-Encoding")
+    if accept_encodings.quality("gzip") <= 0:
+        return response
+    level = config.get("COMPRESS_LEVEL", DEFAULT_LEVEL)
+
+    if response.is_streamed or response.direct_passthrough:
+        # Generators and files: compress on the fly, the length is unknown anyway
+        response.direct_passthrough = False
+        response.response = _gzip_stream(response.iter_encoded(), level)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < config.get("COMPRESS_MIN_SIZE", DEFAULT_MIN_SIZE):
+            return response
+        if len(body) >= config.get("COMPRESS_STREAM_MIN_SIZE", DEFAULT_STREAM_MIN_SIZE):
+            response.response = _gzip_stream(_chunked(body), level) # First bytes go out before the whole body is compressed
+            response.headers.pop("Content-Length", None)
+        else:
+            response.set_data(gzip.compress(body, compresslevel=level, mtime=0))
+    response.headers["Content-Encoding"] = "gzip"
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # Same weakening as nginx: the bytes differ from the identity encoding, the content does not,
+        # so If-None-Match (weak comparison) still matches the ETag seen by other clients
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_compression(app):
+    """Registers the compression stage as an after_request hook (COMPRESS_ENABLED=False turns it off)."""
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, request.accept_encodings, app.config)
@@ -0,0 +1,74 @@
+# src/database.py
+# Database engine configuration: URI, SQLite pragmas applied on every new connection and pool sizing.
+import os
+from sqlalchemy import event
+from src.extensions import db
+
+# Pragmas per engine profile. "default" keeps SQLite's own settings (rollback journal, full fsync),
+# which is the safe choice on network filesystems where WAL's shared memory does not work.
+SQLITE_PROFILES = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL", # Readers no longer block the writer and vice versa
+        "synchronous": "NORMAL", # Durable at checkpoints; safe with WAL
+        "mmap_size": 268435456, # 256 MiB memory-mapped reads
+        "cache_size": -65536, # 64 MiB page cache per connection (negative = KiB)
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000, # ms to wait for the write lock instead of failing with "database is locked"
+    },
+}
+
+POOL_PROFILES = {
+    "default": {},
+    "production": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 10, "pool_pre_ping": False},
+}
+
+def configure_database(app, default_uri: str):
+    """Fills in the database config from the environment before db.init_app(app).
+
+    DATABASE_URL overrides the URI, REPLICA_DATABASE_URL adds a read replica bind and
+    DB_ENGINE_PROFILE ("default" or "production") picks the pragmas and pool settings. Values already in app.config win, and
+    individual pragmas can be overridden with the SQLITE_PRAGMAS dict.
+    """
+    app.config.setdefault("SQLALCHEMY_DATABASE_URI", os.environ.get("DATABASE_URL", default_uri))
+    replica_uri = app.config.setdefault("REPLICA_DATABASE_URL", os.environ.get("REPLICA_DATABASE_URL"))
+    if replica_uri:
+        # Read-only routes are served from this bind (see src/db_routing.py)
+        app.config.setdefault("SQLALCHEMY_BINDS", {}).setdefault("replica", replica_uri)
+    if os.environ.get("REPLICA_SYNC_SECONDS"):
+        app.config.setdefault("REPLICA_SYNC_SECONDS", float(os.environ["REPLICA_SYNC_SECONDS"]))
+    profile = app.config.setdefault("DB_ENGINE_PROFILE", os.environ.get("DB_ENGINE_PROFILE", "default"))
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE: {profile}. Choose from {list(SQLITE_PROFILES.keys())}")
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(app.config.get("SQLITE_PRAGMAS", {}))
+    app.config["SQLITE_PRAGMAS"] = pragmas
+
+    engine_options = app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite") and ":memory:" not in app.config["SQLALCHEMY_DATABASE_URI"]:
+        for option, value in POOL_PROFILES[profile].items():
+            engine_options.setdefault(option, value)
+        if "busy_timeout" in pragmas:
+            # The driver's own lock timeout, so BEGIN waits for the lock as well
+            engine_options.setdefault("connect_args", {}).setdefault("timeout", pragmas["busy_timeout"] / 1000)
+
+def _pragma_listener(pragmas: dict):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return set_sqlite_pragmas
+
+def install_engine_hooks(app):
+    """Applies SQLITE_PRAGMAS to every new connection of the app's SQLite engines (after db.init_app)."""
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", _pragma_listener(pragmas))
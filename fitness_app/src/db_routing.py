@@ -0,0 +1,102 @@
+# src/db_routing.py
+# Read/write routing: read-only routes query the "replica" bind, everything else the primary.
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+
+REPLICA_BIND = "replica"
+DEFAULT_READ_YOUR_WRITES_SECONDS = 10
+
+def _replica_allowed() -> bool:
+    if not has_request_context() or not g.get("db_read_only") or g.get("db_use_primary"):
+        return False
+    # Read-your-writes: a client that committed recently keeps reading from the primary
+    return session.get("db_primary_until", 0) <= time.time()
+
+class RoutingSession(FlaskSession):
+    """Session that sends reads of read-only routes to the replica engine.
+
+    Flushes and DML always go to the primary, as does everything when no replica
+    bind is configured.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, "is_dml", False) and _replica_allowed():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+# --- Marcação das rotas ---
+
+def mark_read_only():
+    """before_request hook for blueprints whose routes only read."""
+    g.db_read_only = True
+
+def read_only(f):
+    """Marks a single view as read-only, so it may be served from the replica."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        mark_read_only()
+        return f(*args, **kwargs)
+    return decorated_function
+
+def use_primary():
+    """Forces the rest of the current request to read from the primary."""
+    g.db_use_primary = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _note_commit(db_session):
+    if has_request_context() and not g.get("db_read_only"):
+        g.db_committed = True
+
+def _pin_after_commit(response):
+    if g.get("db_committed"):
+        window = current_app.config.get("REPLICA_READ_YOUR_WRITES_SECONDS", DEFAULT_READ_YOUR_WRITES_SECONDS)
+        session["db_primary_until"] = time.time() + window
+    return response
+
+# --- Réplica SQLite local, mantida em sincronia pela API de backup online ---
+
+def sync_replica(app):
+    """Copies the primary SQLite database onto the replica file with the online backup API."""
+    db = app.extensions["sqlalchemy"]
+    with app.app_context():
+        replica_engine = db.engines.get(REPLICA_BIND)
+        if replica_engine is None:
+            return False
+        primary = db.engine.raw_connection()
+        replica = replica_engine.raw_connection()
+        try:
+            source, target = primary.driver_connection, replica.driver_connection
+            if not isinstance(source, sqlite3.Connection) or not isinstance(target, sqlite3.Connection):
+                raise RuntimeError("sync_replica only supports SQLite primary and replica databases.")
+            source.backup(target)
+        finally:
+            replica.close()
+            primary.close()
+    return True
+
+def _sync_loop(app, interval, stop):
+    while not stop.wait(interval):
+        try:
+            sync_replica(app)
+        except Exception:
+            app.logger.error("Error syncing the SQLite replica", exc_info=True)
+
+def init_db_routing(app):
+    """Enables read-your-writes pinning and, when REPLICA_SYNC_SECONDS > 0, a local replica sync thread."""
+    app.after_request(_pin_after_commit)
+
+    with app.app_context():
+        has_replica = REPLICA_BIND in app.extensions["sqlalchemy"].engines
+    interval = app.config.get("REPLICA_SYNC_SECONDS", 0)
+    if has_replica and interval > 0:
+        stop = threading.Event()
+        thread = threading.Thread(target=_sync_loop, args=(app, interval, stop), name="replica-sync", daemon=True)
+        thread.start()
+        app.extensions["replica_sync_stop"] = stop
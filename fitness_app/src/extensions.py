@@ -1,4 +1,4 @@
 from flask_sqlalchemy import SQLAlchemy
+from src.db_routing import RoutingSession
 
-db = SQLAlchemy()
-
+db = SQLAlchemy(session_options={"class_": RoutingSession}) # Routes read-only requests to the replica bind, if any
@@ -0,0 +1,58 @@
+# src/json_provider.py
+# JSON provider for the Flask app: orjson when installed, Flask's stdlib provider otherwise.
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson # Optional: several times faster than json.dumps on large payloads
+except ImportError:
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider that encodes with orjson, keeping Flask's conversions.
+
+    Dates still go through default() (HTTP dates, as with the stdlib provider), Decimals
+    become strings and non-str keys such as the day numbers of meals_by_day are
+    stringified. Arguments orjson has no equivalent for, and values it rejects
+    (e.g. ints beyond 64 bits), fall back to the stdlib encoder.
+    """
+
+    def _orjson_options(self, kwargs):
+        if orjson is None:
+            return None
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.pop("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        indent = kwargs.pop("indent", None)
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent is not None:
+            return None
+        if kwargs.pop("separators", (",", ":")) != (",", ":"):
+            return None
+        kwargs.pop("ensure_ascii", None) # orjson always writes UTF-8
+        return None if kwargs else option
+
+    def dumps_bytes(self, obj, **kwargs) -> bytes:
+        option = self._orjson_options(dict(kwargs))
+        if option is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs).encode("utf-8")
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self.dumps_bytes(obj, **kwargs).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args = {}
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args["indent"] = 2
+        # Bytes straight into the response, without the str round trip
+        return self._app.response_class(self.dumps_bytes(obj, **dump_args) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,36 @@
+# src/lazy_blueprints.py
+# Deferred blueprint registration: route modules and what they import (numpy, the models) are loaded on
+# the first request instead of at process start. That moves roughly 150 ms to the first request; Flask and
+# SQLAlchemy, most of `import src.main`, are loaded either way (see benchmarks/bench_startup.py).
+import threading
+
+class LazyBlueprints:
+    """WSGI middleware around app.wsgi_app that runs register(app) once, before the first request."""
+
+    def __init__(self, app, register):
+        self.app = app
+        self.register = register
+        self.wsgi_app = app.wsgi_app
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self.loaded:
+            return
+        with self._lock: # Concurrent first requests wait for a single registration
+            if not self.loaded:
+                self.register(self.app)
+                self.loaded = True
+
+    def __call__(self, environ, start_response):
+        self.load()
+        return self.wsgi_app(environ, start_response)
+
+def init_lazy_blueprints(app, register):
+    app.wsgi_app = app.extensions["lazy_blueprints"] = LazyBlueprints(app, register)
+
+def ensure_blueprints_loaded(app):
+    """Registers deferred blueprints now (for code that needs the full url_map before any request)."""
+    loader = app.extensions.get("lazy_blueprints")
+    if loader is not None:
+        loader.load()
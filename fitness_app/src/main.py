@@ -3,79 +3,124 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
 from src.extensions import db # Import db from extensions
+from src.database import configure_database, install_engine_hooks
+from src.db_routing import init_db_routing, sync_replica
 
-# Import blueprints
-from src.routes.auth import auth_bp
-from src.routes.profile import profile_bp
-from src.routes.plan import plan_bp 
-from src.routes.preferences import preferences_bp
-from src.routes.admin import admin_bp
-from src.routes.advertisement_routes import ads_bp as admin_ads_bp
-from src.routes.advertisement_routes import public_ads_bp
-from src.routes.shop_routes import admin_shop_bp, public_shop_bp # Import shop blueprints
-
-# Import all models by importing the models package
-import src.models # This will execute src/models/__init__.py
+# The models package is not imported here: the route modules import it when their blueprints are
+# registered, and create_all below imports it itself, so with LAZY_BLUEPRINTS it loads on the first request
+from src.commands import recompute_targets_command, db_upgrade_command, check_query_plans_command, sync_replica_command, init_db_command, seed_command
+from src.services.ad_counters import init_ad_counters
+from src.json_provider import FastJSONProvider
+from src.compression import init_compression
+from src.static_assets import init_static_assets, static_or_index
+from src.lazy_blueprints import init_lazy_blueprints
+from src.metrics import init_metrics
+from src.query_profiler import init_query_profiler
 
 # Define the base directory of the Flask app project
 BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 INSTANCE_FOLDER_PATH = os.path.join(BASE_DIR, 'instance')
 
-def create_app():
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ('1', 'true', 'yes')
+
+def register_blueprints(app):
+    """Imports the route modules and registers their blueprints."""
+    # Import blueprints (here rather than at module level, so LAZY_BLUEPRINTS can defer them)
+    from src.routes.auth import auth_bp
+    from src.routes.profile import profile_bp
+    from src.routes.plan import plan_bp
+    from src.routes.preferences import preferences_bp
+    from src.routes.admin import admin_bp
+    from src.routes.advertisement_routes import ads_bp as admin_ads_bp
+    from src.routes.advertisement_routes import public_ads_bp
+    from src.routes.shop_routes import admin_shop_bp, public_shop_bp # Import shop blueprints
+
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(profile_bp, url_prefix='/api/profile')
+    app.register_blueprint(plan_bp, url_prefix='/api/plan')
+    app.register_blueprint(preferences_bp, url_prefix='/api/preferences')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(admin_ads_bp) # Registered under /api/admin/advertisements (prefix in blueprint)
+    app.register_blueprint(public_ads_bp) # Registered under /api/advertisements (prefix in blueprint)
+    app.register_blueprint(admin_shop_bp) # Registered under /api/admin/shop (prefix in blueprint)
+    app.register_blueprint(public_shop_bp) # Registered under /api/shop (prefix in blueprint)
+
+def create_app(config=None):
     app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'), instance_path=INSTANCE_FOLDER_PATH)
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your_default_secret_key_for_dev_sqlite_v11') # Changed key for clarity
+    if config:
+        app.config.update(config) # e.g. SQLALCHEMY_DATABASE_URI or DB_ENGINE_PROFILE for tests and benchmarks
+    # Shorter create_app for production workers: DB_AUTO_CREATE=0 (schema via `flask init-db`) and LAZY_BLUEPRINTS=1
+    # (routes and models load on the first request); importing Flask and SQLAlchemy remains the bulk of a cold start
+    app.config.setdefault('DB_AUTO_CREATE', _env_flag('DB_AUTO_CREATE', True))
+    app.config.setdefault('LAZY_BLUEPRINTS', _env_flag('LAZY_BLUEPRINTS', False))
 
     # Ensure the instance folder exists
     if not os.path.exists(INSTANCE_FOLDER_PATH):
         os.makedirs(INSTANCE_FOLDER_PATH)
 
+    app.json = FastJSONProvider(app) # orjson when installed, stdlib json otherwise
+
     # Enable CORS
     CORS(app, supports_credentials=True)
 
-    # Database Configuration - SQLite
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(INSTANCE_FOLDER_PATH, 'fitness_app.db')
+    # Database Configuration - SQLite by default; DATABASE_URL and DB_ENGINE_PROFILE override (see src/database.py)
+    configure_database(app, 'sqlite:///' + os.path.join(INSTANCE_FOLDER_PATH, 'fitness_app.db'))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     # Initialize extensions
     db.init_app(app)
+    install_engine_hooks(app) # Pragmas of the engine profile on every new connection
+    init_metrics(app) # Per-endpoint latency and SQL counters, scraped at /api/admin/metrics
+    init_query_profiler(app) # Development: QUERY_PROFILER=log|raise reports N+1 statements
+    init_db_routing(app) # Read-only routes may read from the replica bind
+    init_ad_counters(app) # Write-behind buffer for ad view/click counters
+    init_compression(app) # gzip for JSON/HTML responses above COMPRESS_MIN_SIZE
 
     # Register Blueprints
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(profile_bp, url_prefix='/api/profile')
-    app.register_blueprint(plan_bp, url_prefix='/api/plan')
-    app.register_blueprint(preferences_bp, url_prefix='/api/preferences')
-    app.register_blueprint(admin_bp, url_prefix='/api/admin')
-    app.register_blueprint(admin_ads_bp) # Registered under /api/admin/advertisements (prefix in blueprint)
-    app.register_blueprint(public_ads_bp) # Registered under /api/advertisements (prefix in blueprint)
-    app.register_blueprint(admin_shop_bp) # Registered under /api/admin/shop (prefix in blueprint)
-    app.register_blueprint(public_shop_bp) # Registered under /api/shop (prefix in blueprint)
+    if app.config['LAZY_BLUEPRINTS']:
+        init_lazy_blueprints(app, register_blueprints) # Route modules load on the first request
+    else:
+        register_blueprints(app)
+
+    # Register CLI commands
+    app.cli.add_command(recompute_targets_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(sync_replica_command)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
 
     # Add a simple health check route
     @app.route('/api/health', methods=['GET'])
     def health_check():
         return jsonify({'status': 'healthy'}), 200
 
-    with app.app_context():
-        db.create_all()
+    if app.config['DB_AUTO_CREATE']:
+        import src.models # Every model, so create_all sees all the tables
+        from src.migrations import upgrade_schema
+        with app.app_context():
+            db.create_all()
+            upgrade_schema(app.logger) # Brings databases created by older versions up to date
+    sync_replica(app) # Local SQLite replica starts as a copy of the primary (no-op without a replica)
+
+    init_static_assets(app) # Manifest of the static folder, with index.html and compressed variants in memory
 
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
+        if app.static_folder is None:
             return jsonify({"error": "Static folder not configured"}), 404
 
-        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
-                return jsonify({"message": "Welcome to the Fitness App API. Frontend not found or not served from root. Please access API endpoints under /api."}), 200
+        response = static_or_index(path) # Asset, or index.html for SPA routes
+        if response is not None:
+            return response
+        return jsonify({"message": "Welcome to the Fitness App API. Frontend not found or not served from root. Please access API endpoints under /api."}), 200
     return app
 
 if __name__ == '__main__':
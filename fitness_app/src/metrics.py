@@ -0,0 +1,256 @@
+# src/metrics.py
+# Per-endpoint request latency and SQL metrics, exported in the Prometheus text format.
+#
+# Each thread writes to its own buffer (no locks on the request path); a scrape sums the
+# buffers of the live threads and the totals folded in from threads that have exited.
+# Counters are cumulative per process.
+import bisect
+import threading
+import time
+import weakref
+from sqlalchemy import event
+from src.extensions import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0) # Seconds
+BACKGROUND_ENDPOINT = "<background>" # SQL run outside a request (flush threads, CLI commands)
+UNMATCHED_ENDPOINT = "<unmatched>" # 404s and other requests without a route, kept as one series
+
+class _ThreadBuffer:
+    """Metrics written by one thread only; read (summed) by the scrape."""
+
+    def __init__(self):
+        self.endpoints = {} # endpoint -> [count, seconds, sql_statements, sql_seconds, bucket counts...]
+        self.statuses = {} # (endpoint, method, status) -> count
+
+    def merge_into(self, endpoints, statuses):
+        for endpoint, series in list(self.endpoints.items()):
+            total = endpoints.setdefault(endpoint, [0] * len(series))
+            for i, value in enumerate(series):
+                total[i] += value
+        for key, count in list(self.statuses.items()):
+            statuses[key] = statuses.get(key, 0) + count
+
+class _ThreadToken:
+    """Lives in the thread-local next to the buffer; freed when the thread exits."""
+
+class MetricsRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._local = threading.local()
+        self._buffers = set()
+        self._retired = _ThreadBuffer() # Totals of the threads that have exited
+        self._buffers_lock = threading.Lock() # Taken when a thread starts or stops recording, and by scrapes
+
+    def buffer(self) -> _ThreadBuffer:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = _ThreadBuffer()
+            # Servers that start a thread per request (the threaded dev server) would otherwise
+            # leave one buffer per request behind: the thread-local is dropped when the thread
+            # exits, and with it the token, whose finalizer folds the buffer into the totals.
+            token = self._local.token = _ThreadToken()
+            weakref.finalize(token, self._retire, buffer).atexit = False
+            with self._buffers_lock:
+                self._buffers.add(buffer)
+        return buffer
+
+    def _retire(self, buffer):
+        with self._buffers_lock:
+            self._buffers.discard(buffer)
+            buffer.merge_into(self._retired.endpoints, self._retired.statuses)
+
+    def _series(self, buffer, endpoint):
+        series = buffer.endpoints.get(endpoint)
+        if series is None:
+            series = buffer.endpoints[endpoint] = [0, 0.0, 0, 0.0] + [0] * (len(self.buckets) + 1)
+        return series
+
+    # --- Gravação (thread do pedido) ---
+
+    # The SQL of the request in progress goes to [statements, seconds] on the thread-local itself:
+    # the per-statement path is one attribute read and two additions.
+
+    def start_request(self):
+        self._local.request_sql = [0, 0.0]
+
+    def record_sql(self, seconds):
+        request_sql = getattr(self._local, "request_sql", None)
+        if request_sql is not None:
+            request_sql[0] += 1
+            request_sql[1] += seconds
+        else:
+            series = self._series(self.buffer(), BACKGROUND_ENDPOINT)
+            series[2] += 1
+            series[3] += seconds
+
+    def finish_request(self, endpoint, method, status, seconds):
+        sql = getattr(self._local, "request_sql", None) or (0, 0.0)
+        self._local.request_sql = None
+        buffer = self.buffer()
+        series = self._series(buffer, endpoint)
+        series[0] += 1
+        series[1] += seconds
+        series[2] += sql[0]
+        series[3] += sql[1]
+        series[4 + bisect.bisect_left(self.buckets, seconds)] += 1
+        key = (endpoint, method, status)
+        buffer.statuses[key] = buffer.statuses.get(key, 0) + 1
+
+    # --- Leitura (scrape) ---
+
+    def snapshot(self):
+        """Sums every thread buffer: ({endpoint: series}, {(endpoint, method, status): count})."""
+        endpoints, statuses = {}, {}
+        with self._buffers_lock:
+            self._retired.merge_into(endpoints, statuses)
+            buffers = list(self._buffers)
+        for buffer in buffers:
+            buffer.merge_into(endpoints, statuses)
+        return endpoints, statuses
+
+    def render_prometheus(self) -> str:
+        endpoints, statuses = self.snapshot()
+        lines = [
+            "# HELP fitness_http_requests_total Requests served, by endpoint, method and status.",
+            "# TYPE fitness_http_requests_total counter",
+        ]
+        for (endpoint, method, status), count in sorted(statuses.items()):
+            lines.append(f'fitness_http_requests_total{{endpoint="{_escape(endpoint)}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP fitness_http_request_duration_seconds Request latency, by endpoint.",
+            "# TYPE fitness_http_request_duration_seconds histogram",
+        ]
+        for endpoint, series in sorted(endpoints.items()):
+            if endpoint == BACKGROUND_ENDPOINT:
+                continue
+            label = _escape(endpoint)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[4:]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'fitness_http_request_duration_seconds_bucket{{endpoint="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'fitness_http_request_duration_seconds_sum{{endpoint="{label}"}} {series[1]:.6f}')
+            lines.append(f'fitness_http_request_duration_seconds_count{{endpoint="{label}"}} {series[0]}')
+
+        lines += [
+            "# HELP fitness_sql_statements_total SQL statements executed, by endpoint.",
+            "# TYPE fitness_sql_statements_total counter",
+        ]
+        lines += [f'fitness_sql_statements_total{{endpoint="{_escape(e)}"}} {s[2]}' for e, s in sorted(endpoints.items())]
+        lines += [
+            "# HELP fitness_sql_duration_seconds_total Time spent executing SQL, by endpoint.",
+            "# TYPE fitness_sql_duration_seconds_total counter",
+        ]
+        lines += [f'fitness_sql_duration_seconds_total{{endpoint="{_escape(e)}"}} {s[3]:.6f}' for e, s in sorted(endpoints.items())]
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# --- Ligação à app (middleware WSGI e eventos do SQLAlchemy) ---
+
+def _install_sql_hooks(registry, engine):
+    """Times each DBAPI cursor execution of `engine`.
+
+    Dialect-level do_execute events rather than before/after_cursor_execute: any Connection
+    event puts every statement on SQLAlchemy's full event dispatch path (several us per
+    statement), while these wrap the same cursor call behind a single flag check.
+    """
+    dialect, record_sql, clock = engine.dialect, registry.record_sql, time.perf_counter
+
+    @event.listens_for(engine, "do_execute")
+    def do_execute(cursor, statement, parameters, context, execute=dialect.do_execute):
+        start = clock()
+        try:
+            execute(cursor, statement, parameters, context)
+        finally:
+            record_sql(clock() - start)
+        return True # Executed here: SQLAlchemy skips its own call
+
+    @event.listens_for(engine, "do_executemany")
+    def do_executemany(cursor, statement, parameters, context, execute=dialect.do_executemany):
+        start = clock()
+        try:
+            execute(cursor, statement, parameters, context)
+        finally:
+            record_sql(clock() - start)
+        return True
+
+    @event.listens_for(engine, "do_execute_no_params")
+    def do_execute_no_params(cursor, statement, context, execute=dialect.do_execute_no_params):
+        start = clock()
+        try:
+            execute(cursor, statement, context)
+        finally:
+            record_sql(clock() - start)
+        return True
+
+class _TimedBody:
+    """The response body as the server sees it: records the request when the server closes it.
+
+    Lighter than werkzeug's ClosingIterator: iteration goes straight to the wrapped body.
+    """
+    __slots__ = ("app_iter", "finish")
+
+    def __init__(self, app_iter, finish):
+        self.app_iter = app_iter
+        self.finish = finish
+
+    def __iter__(self):
+        return iter(self.app_iter)
+
+    def close(self):
+        try:
+            close = getattr(self.app_iter, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self.finish()
+
+class RequestTimer:
+    """WSGI middleware around app.wsgi_app: times each request and records it with its endpoint and status.
+
+    Everything is taken here rather than in before/after/teardown_request hooks, which Flask
+    dispatches at a few us each: the endpoint is read from the Flask request (left in the
+    environ as werkzeug.request) when the response starts. The request is recorded when the
+    server closes the body, so streamed bodies (the gzip stream of src/compression.py) count in full.
+    """
+
+    def __init__(self, registry, wsgi_app):
+        self.registry = registry
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        registry = self.registry
+        seen = [] # [endpoint, status] once the response starts
+
+        def capture_status(status, headers, exc_info=None):
+            request = environ.get("werkzeug.request") # Still set: the request context pops after start_response
+            rule = request.url_rule if request is not None else None
+            seen[:] = (rule.endpoint if rule is not None else UNMATCHED_ENDPOINT, int(status[:3]))
+            return start_response(status, headers, exc_info)
+
+        def finish():
+            endpoint, status = seen or (UNMATCHED_ENDPOINT, 500)
+            registry.finish_request(endpoint, environ.get("REQUEST_METHOD", "GET"), status, time.perf_counter() - start)
+
+        registry.start_request()
+        start = time.perf_counter()
+        try:
+            app_iter = self.wsgi_app(environ, capture_status)
+        except BaseException:
+            finish()
+            raise
+        return _TimedBody(app_iter, finish)
+
+def init_metrics(app) -> MetricsRegistry:
+    """Instruments the app's requests and engines (after db.init_app); METRICS_ENABLED=False turns it off."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return None
+    registry = app.extensions["metrics"] = MetricsRegistry()
+    with app.app_context():
+        for engine in db.engines.values():
+            _install_sql_hooks(registry, engine)
+    app.wsgi_app = RequestTimer(registry, app.wsgi_app)
+    return registry
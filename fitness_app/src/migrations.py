@@ -0,0 +1,107 @@
+# src/migrations.py
+# Versioned schema migrations for databases created before the current models.
+# db.create_all() only creates missing tables; these bring existing tables up to date.
+from datetime import datetime
+from sqlalchemy import inspect, text
+from src.extensions import db
+from src.models.user import RoleVersionStamp
+
+# Secondary indexes on the columns the hot queries filter and sort on.
+# The same indexes are declared on the models, so create_all() builds them on new databases.
+HOT_PATH_INDEXES = [
+    ("ix_diet_plans_user_active", "diet_plans", ["user_id", "is_active"]),
+    ("ix_workout_plans_user_active", "workout_plans", ["user_id", "is_active"]),
+    ("ix_workout_plan_days_plan", "workout_plan_days", ["workout_plan_id"]),
+    ("ix_workout_exercises_day", "workout_exercises", ["workout_plan_day_id"]),
+    ("ix_diet_plan_meals_plan_day", "diet_plan_meals", ["diet_plan_id", "day_of_week"]),
+    ("ix_advertisements_placement_active", "advertisements", ["placement_area", "is_active"]),
+    ("ix_advertisements_created_at_id", "advertisements", ["created_at", "id"]),
+    ("ix_products_active_category_created", "products", ["is_active", "category_id", "created_at"]),
+    ("ix_products_active_created", "products", ["is_active", "created_at", "id"]),
+    ("ix_products_category", "products", ["category_id"]),
+    ("ix_products_created_at_id", "products", ["created_at", "id"]),
+    ("ix_users_created_at_id", "users", ["created_at", "id"]),
+]
+
+# Full-text index of the product catalog (SQLite FTS5). External content: the text is stored only in
+# products and the index maps its words to product ids; the triggers keep it in step with every write.
+# remove_diacritics folds accents, so "omega" finds "Ómega".
+PRODUCT_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "name, description, sku, content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts_terms USING fts5vocab(products_fts, 'row')", # Indexed words, for prefix expansion
+    "CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN "
+    "INSERT INTO products_fts (rowid, name, description, sku) VALUES (new.id, new.name, new.description, new.sku); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, description, sku) VALUES ('delete', old.id, old.name, old.description, old.sku); END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description, sku ON products BEGIN "
+    "INSERT INTO products_fts (products_fts, rowid, name, description, sku) VALUES ('delete', old.id, old.name, old.description, old.sku); "
+    "INSERT INTO products_fts (rowid, name, description, sku) VALUES (new.id, new.name, new.description, new.sku); END",
+]
+
+def _add_missing_columns(connection, table, columns):
+    existing = {column["name"] for column in inspect(connection).get_columns(table)}
+    for name, ddl in columns:
+        if name not in existing:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+def _migration_1(connection):
+    """Meal nutrition columns and shared plan template references."""
+    _add_missing_columns(connection, "diet_plan_meals", [
+        ("calories", "INTEGER"),
+        ("protein_g", "INTEGER"),
+        ("carbs_g", "INTEGER"),
+        ("fat_g", "INTEGER"),
+        ("suggested_time", "VARCHAR(10)"),
+    ])
+    _add_missing_columns(connection, "diet_plans", [("template_id", "INTEGER REFERENCES plan_templates (id)")])
+    _add_missing_columns(connection, "workout_plans", [("template_id", "INTEGER REFERENCES plan_templates (id)")])
+
+def _migration_2(connection):
+    """Hot-path secondary indexes."""
+    for name, table, columns in HOT_PATH_INDEXES:
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+def _migration_3(connection):
+    """Product full-text index, filled from the existing products. SQLite only: elsewhere it is a no-op."""
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in PRODUCT_SEARCH_DDL:
+        connection.execute(text(statement))
+    connection.execute(text("INSERT INTO products_fts (products_fts) VALUES ('rebuild')"))
+
+def _migration_4(connection):
+    """Role version stamp, shared by every process's identity cache."""
+    RoleVersionStamp.__table__.create(connection, checkfirst=True)
+
+# (version, description, function) - append only, never renumber
+MIGRATIONS = [
+    (1, "Add meal nutrition columns and plan template references", _migration_1),
+    (2, "Add hot-path secondary indexes", _migration_2),
+    (3, "Add the product full-text search index", _migration_3),
+    (4, "Add the role version stamp", _migration_4),
+]
+
+def upgrade_schema(logger=None) -> list[int]:
+    """Applies pending migrations in order, one transaction each. Returns the versions applied."""
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR(200) NOT NULL, applied_at DATETIME NOT NULL)"
+        ))
+        applied_versions = set(connection.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+    applied_now = []
+    for version, description, migrate in MIGRATIONS:
+        if version in applied_versions:
+            continue
+        with db.engine.begin() as connection:
+            migrate(connection)
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:version, :description, :applied_at)"),
+                {"version": version, "description": description, "applied_at": datetime.utcnow()}
+            )
+        applied_now.append(version)
+        if logger:
+            logger.info(f"Applied schema migration {version}: {description}")
+    return applied_now
@@ -1,14 +1,19 @@
 # This file makes the 'models' directory a Python package
 # and can be used to conveniently import all models.
 
-from .user import User
+from .user import User, RoleVersionStamp
 from .profile import UserProfile
 from .diet import DietPlan, DietPlanMeal
 from .workout import WorkoutPlan, WorkoutPlanDay, WorkoutExercise
 from .preferences import UserPreference
+from .plan_template import PlanTemplate
+from .advertisement import Advertisement
+from .product_category import ProductCategory
+from .product import Product
 
 __all__ = [
     "User",
+    "RoleVersionStamp",
     "UserProfile",
     "DietPlan",
     "DietPlanMeal",
@@ -16,5 +21,9 @@ __all__ = [
     "WorkoutPlanDay",
     "WorkoutExercise",
     "UserPreference",
+    "PlanTemplate",
+    "Advertisement",
+    "ProductCategory",
+    "Product",
 ]
 
@@ -3,6 +3,10 @@ from sqlalchemy.sql import func
 
 class Advertisement(db.Model):
     __tablename__ = "advertisements"
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index("ix_advertisements_placement_active", "placement_area", "is_active"),
+        db.Index("ix_advertisements_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
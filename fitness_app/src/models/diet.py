@@ -3,6 +3,9 @@ from sqlalchemy.dialects.mysql import BOOLEAN # For MySQL compatibility if switc
 
 class DietPlan(db.Model):
     __tablename__ = "diet_plans"
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index("ix_diet_plans_user_active", "user_id", "is_active"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -14,20 +17,29 @@ class DietPlan(db.Model):
     daily_carbs_g = db.Column(db.Integer)    # Added
     daily_fat_g = db.Column(db.Integer)      # Added
     is_active = db.Column(db.Boolean, default=True)
+    template_id = db.Column(db.Integer, db.ForeignKey("plan_templates.id"), nullable=True) # Shared content; NULL for plans with their own rows
 
-    meals = db.relationship("DietPlanMeal", backref="diet_plan", lazy=True)
+    meals = db.relationship("DietPlanMeal", backref="diet_plan", lazy=True, order_by="[DietPlanMeal.day_of_week, DietPlanMeal.suggested_time]")
+    template = db.relationship("PlanTemplate")
 
     def __repr__(self):
         return f"<DietPlan {self.id} for User {self.user_id}>"
 
 class DietPlanMeal(db.Model):
     __tablename__ = "diet_plan_meals"
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index("ix_diet_plan_meals_plan_day", "diet_plan_id", "day_of_week"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     diet_plan_id = db.Column(db.Integer, db.ForeignKey("diet_plans.id"), nullable=False)
     day_of_week = db.Column(db.Integer)
     meal_name = db.Column(db.String(100))
     description = db.Column(db.Text)
-    # Add other fields later
+    calories = db.Column(db.Integer)
+    protein_g = db.Column(db.Integer)
+    carbs_g = db.Column(db.Integer)
+    fat_g = db.Column(db.Integer)
+    suggested_time = db.Column(db.String(10)) # e.g., "08:00"
 
     def __repr__(self):
         return f"<DietPlanMeal {self.id} for Plan {self.diet_plan_id}>"
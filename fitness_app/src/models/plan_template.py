@@ -0,0 +1,18 @@
+from src.extensions import db
+from sqlalchemy.sql import func
+import json
+
+class PlanTemplate(db.Model):
+    __tablename__ = "plan_templates"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False) # "diet" or "workout"
+    content_hash = db.Column(db.String(64), unique=True, nullable=False) # SHA-256 of kind + canonical JSON content
+    content = db.Column(db.Text, nullable=False) # Canonical JSON: daily meals (diet) or plan days (workout)
+    created_at = db.Column(db.DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<PlanTemplate {self.id} ({self.kind})>"
+
+    def to_content(self):
+        return json.loads(self.content)
@@ -3,6 +3,12 @@ from sqlalchemy.sql import func
 
 class Product(db.Model):
     __tablename__ = "products"
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index("ix_products_active_category_created", "is_active", "category_id", "created_at"),
+        db.Index("ix_products_active_created", "is_active", "created_at", "id"),
+        db.Index("ix_products_category", "category_id"),
+        db.Index("ix_products_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -16,13 +16,16 @@ class ProductCategory(db.Model):
     def __repr__(self):
         return f"<ProductCategory {self.name}>"
 
-    def to_dict(self):
+    def to_dict(self, product_count=None):
+        # Listing routes pass product_count from a single grouped COUNT; otherwise count this category
+        if product_count is None:
+            product_count = self.products.count()
         return {
             "id": self.id,
             "name": self.name,
             "description": self.description,
             "slug": self.slug,
-            "product_count": self.products.count(),
+            "product_count": product_count,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
@@ -4,6 +4,9 @@ from sqlalchemy.sql import func # Import func for server_default
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -37,3 +40,13 @@ class User(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
+
+class RoleVersionStamp(db.Model):
+    """Single row counting role changes (promotions, demotions, deletions) across all processes.
+
+    Each process's identity cache compares it with the value it last saw, see src/services/identity.py.
+    """
+    __tablename__ = 'role_version_stamp'
+
+    id = db.Column(db.Integer, primary_key=True) # Always 1
+    version = db.Column(db.Integer, nullable=False, default=0)
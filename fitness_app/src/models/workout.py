@@ -3,6 +3,9 @@ from sqlalchemy.dialects.mysql import BOOLEAN # For MySQL compatibility if switc
 
 class WorkoutPlan(db.Model):
     __tablename__ = "workout_plans"
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index("ix_workout_plans_user_active", "user_id", "is_active"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -12,27 +15,35 @@ class WorkoutPlan(db.Model):
     days_per_week = db.Column(db.Integer)
     description = db.Column(db.Text)
     is_active = db.Column(db.Boolean, default=True)
+    template_id = db.Column(db.Integer, db.ForeignKey("plan_templates.id"), nullable=True) # Shared content; NULL for plans with their own rows
 
-    days = db.relationship("WorkoutPlanDay", backref="workout_plan", lazy=True)
+    days = db.relationship("WorkoutPlanDay", backref="workout_plan", lazy=True, order_by="WorkoutPlanDay.day_of_week")
+    template = db.relationship("PlanTemplate")
 
     def __repr__(self):
         return f"<WorkoutPlan {self.id} for User {self.user_id}>"
 
 class WorkoutPlanDay(db.Model):
     __tablename__ = "workout_plan_days"
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index("ix_workout_plan_days_plan", "workout_plan_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_plan_id = db.Column(db.Integer, db.ForeignKey("workout_plans.id"), nullable=False)
     day_of_week = db.Column(db.Integer)
     focus = db.Column(db.String(100))
 
-    exercises = db.relationship("WorkoutExercise", backref="workout_plan_day", lazy=True)
+    exercises = db.relationship("WorkoutExercise", backref="workout_plan_day", lazy=True, order_by="WorkoutExercise.id")
 
     def __repr__(self):
         return f"<WorkoutPlanDay {self.id} for Plan {self.workout_plan_id}>"
 
 class WorkoutExercise(db.Model):
     __tablename__ = "workout_exercises"
+    __table_args__ = ( # Kept in sync with src/migrations.py HOT_PATH_INDEXES
+        db.Index("ix_workout_exercises_day", "workout_plan_day_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_plan_day_id = db.Column(db.Integer, db.ForeignKey("workout_plan_days.id"), nullable=False)
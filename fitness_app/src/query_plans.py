@@ -0,0 +1,62 @@
+# src/query_plans.py
+# EXPLAIN QUERY PLAN checks for the queries behind each route: a hot query must not
+# fall back to a full table scan (SQLite reports those as "SCAN <table>" without an index).
+from sqlalchemy import String, func, literal, tuple_, type_coerce
+from src.extensions import db
+from src.models import (User, UserProfile, UserPreference, DietPlan, DietPlanMeal, WorkoutPlan, WorkoutPlanDay,
+                        WorkoutExercise, PlanTemplate, Advertisement, Product, ProductCategory)
+
+def _keyset(name, query, model):
+    """Both runs read by keyset_paginate(): dated rows after a cursor, then the undated ones."""
+    sort_key = type_coerce(model.created_at, String)
+    dated = query.filter(model.created_at.isnot(None), tuple_(sort_key, model.id) < tuple_(literal("2030-01-01 00:00:00", String), literal(1))) \
+        .order_by(sort_key.desc(), model.id.desc()).limit(21)
+    undated = query.filter(model.created_at.is_(None), model.id < 1).order_by(model.id.desc()).limit(21)
+    return [(name, dated, set()), (f"{name} (undated rows)", undated, set())]
+
+def hot_queries():
+    """(name, query, tables allowed to be scanned) for the queries issued by the routes."""
+    return [
+        ("auth.login: user by username", User.query.filter_by(username="x"), set()),
+        ("profile: profile by user", UserProfile.query.filter_by(user_id=1), set()),
+        ("preferences: preferences by user", UserPreference.query.filter_by(user_id=1), set()),
+        ("plan: active diet plan", DietPlan.query.filter_by(user_id=1, is_active=True), set()),
+        ("plan: active workout plan", WorkoutPlan.query.filter_by(user_id=1, is_active=True), set()),
+        ("plan: workout days of plans", WorkoutPlanDay.query.filter(WorkoutPlanDay.workout_plan_id.in_([1, 2])), set()),
+        ("plan: exercises of days", WorkoutExercise.query.filter(WorkoutExercise.workout_plan_day_id.in_([1, 2])), set()),
+        ("plan: meals of diet plans", DietPlanMeal.query.filter(DietPlanMeal.diet_plan_id.in_([1, 2]))
+            .order_by(DietPlanMeal.diet_plan_id, DietPlanMeal.day_of_week), set()),
+        ("plan: template by content hash", PlanTemplate.query.filter_by(content_hash="x"), set()),
+        ("admin: user plan counts", db.session.query(func.count(DietPlan.id)).filter(DietPlan.user_id == 1), set()),
+        *_keyset("admin: users keyset page", User.query, User),
+        ("ads: active ads of a placement", Advertisement.query.filter_by(placement_area="sidebar", is_active=True), set()),
+        *_keyset("ads: advertisements keyset page", Advertisement.query, Advertisement),
+        ("shop: category by slug", ProductCategory.query.filter_by(slug="x"), set()),
+        ("shop: categories with product counts", db.session.query(ProductCategory, func.count(Product.id))
+            .outerjoin(Product, Product.category_id == ProductCategory.id).group_by(ProductCategory.id),
+            {"product_categories"}), # Lists every category by design
+        ("shop: public products of a category", Product.query.filter_by(is_active=True, category_id=1)
+            .order_by(Product.created_at.desc()).limit(12), set()),
+        *_keyset("shop: public products keyset page", Product.query.filter_by(is_active=True), Product),
+        *_keyset("shop: admin products keyset page", Product.query, Product),
+        ("shop: product by slug", Product.query.filter_by(slug="x", is_active=True), set()),
+    ]
+
+def explain(query) -> list[str]:
+    """Returns the EXPLAIN QUERY PLAN detail lines of an ORM query."""
+    statement = query.statement if hasattr(query, "statement") else query
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return [row[-1] for row in rows]
+
+def find_full_scans() -> list[tuple[str, str]]:
+    """Returns (query name, plan line) for every full table scan found in the hot queries."""
+    problems = []
+    for name, query, allowed_tables in hot_queries():
+        for detail in explain(query):
+            if not detail.startswith("SCAN ") or " INDEX " in detail:
+                continue
+            table = detail.split()[1]
+            if table not in allowed_tables:
+                problems.append((name, detail))
+    return problems
@@ -0,0 +1,162 @@
+# src/query_profiler.py
+# Request-scoped statement profiler for development and tests: fingerprints the SQL each
+# request runs and reports a fingerprint that repeats more than QUERY_REPEAT_THRESHOLD
+# times, the signature of an N+1 (one SELECT per item of a list).
+#
+# QUERY_PROFILER=log  -> warning in the app log, with the source line of the repeated query
+# QUERY_PROFILER=raise -> RepeatedStatementError at the end of the request
+# Off by default. For tests, see the query_budget fixture in conftest.py.
+import os
+import re
+import traceback
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from src.extensions import db
+
+DEFAULT_REPEAT_THRESHOLD = 5
+MODES = ("off", "log", "raise")
+THIS_FILE = os.path.abspath(__file__)
+SRC_DIR = os.path.dirname(THIS_FILE)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """Normalized SQL: literals become ?, IN lists of any length become (?...), whitespace collapses."""
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("(?...)", normalized)
+    return _SPACE_RE.sub(" ", normalized).strip()
+
+def _app_frame() -> str:
+    """file:line of the innermost frame in the app's own code (the loop issuing the query)."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(SRC_DIR) and frame.filename != THIS_FILE:
+            return f"{os.path.relpath(frame.filename, os.path.dirname(SRC_DIR))}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+class RepeatedStatementError(RuntimeError):
+    """A request ran one statement fingerprint more often than allowed."""
+
+class StatementProfile:
+    """Statements run by one request (or one endpoint, in tests), grouped by fingerprint."""
+
+    def __init__(self, repeat_threshold=DEFAULT_REPEAT_THRESHOLD):
+        self.repeat_threshold = repeat_threshold
+        self.counts = Counter()
+        self.locations = {} # fingerprint -> where it first went over the threshold
+        self.total = 0
+
+    def add(self, statement):
+        key = fingerprint(statement)
+        self.counts[key] += 1
+        self.total += 1
+        if self.counts[key] == self.repeat_threshold + 1:
+            self.locations[key] = _app_frame()
+
+    def repeated(self, threshold=None) -> list[tuple[str, int]]:
+        """(fingerprint, count) for every fingerprint run more than `threshold` times, most frequent first."""
+        threshold = self.repeat_threshold if threshold is None else threshold
+        return [(key, count) for key, count in self.counts.most_common() if count > threshold]
+
+    def report(self, threshold=None) -> str:
+        lines = [f"{self.total} statements"]
+        for key, count in self.repeated(threshold):
+            lines.append(f"  {count}x at {self.locations.get(key, 'unknown')}: {key}")
+        return "\n".join(lines)
+
+# --- Perfil por pedido (modo de desenvolvimento) ---
+
+def _install_profiler_hooks(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def profile_statement(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            profile = g.get("statement_profile")
+            if profile is not None:
+                profile.add(statement)
+
+def init_query_profiler(app):
+    """Profiles every request when QUERY_PROFILER is "log" or "raise" (config or environment)."""
+    mode = app.config.setdefault("QUERY_PROFILER", os.environ.get("QUERY_PROFILER", "off")).lower()
+    threshold = app.config.setdefault("QUERY_REPEAT_THRESHOLD", int(os.environ.get("QUERY_REPEAT_THRESHOLD", DEFAULT_REPEAT_THRESHOLD)))
+    if mode not in MODES:
+        raise ValueError(f"QUERY_PROFILER must be one of {MODES}, got {mode!r}")
+    if mode == "off":
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            _install_profiler_hooks(engine)
+
+    @app.before_request
+    def start_statement_profile():
+        g.statement_profile = StatementProfile(threshold)
+
+    @app.after_request
+    def check_statement_profile(response):
+        profile = g.pop("statement_profile", None)
+        if profile is None or not profile.repeated():
+            return response
+        message = f"Repeated statements in {request.method} {request.path} ({request.endpoint}): {profile.report()}"
+        if mode == "raise":
+            raise RepeatedStatementError(message)
+        current_app.logger.warning(message)
+        return response
+
+# --- Orçamentos de queries nos testes ---
+
+class QueryBudget:
+    """Records the statements of every request made inside a `with`, grouped by endpoint.
+
+    On exit it fails (AssertionError) when an endpoint ran one fingerprint more than
+    `max_repeats` times in a request, or more statements per request than its entry in
+    `budgets` ({endpoint: max statements}).
+    """
+
+    def __init__(self, app, max_repeats=1, budgets=None):
+        self.app = app
+        self.max_repeats = max_repeats
+        self.budgets = budgets or {}
+        self.requests = [] # (endpoint, StatementProfile) per request, in order
+
+    def _profile_statement(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context():
+            return # Background threads (ad counter flushes) are not part of any request
+        profile = g.get("query_budget_profile")
+        if profile is None:
+            profile = g.query_budget_profile = StatementProfile(self.max_repeats)
+            self.requests.append((request.endpoint, profile))
+        profile.add(statement)
+
+    def __enter__(self):
+        with self.app.app_context():
+            self.engines = list(db.engines.values())
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._profile_statement)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._profile_statement)
+        if exc_type is None:
+            self.check()
+
+    def statements(self, endpoint) -> list[int]:
+        """Statement count of each recorded request to `endpoint`."""
+        return [profile.total for name, profile in self.requests if name == endpoint]
+
+    def failures(self) -> list[str]:
+        failures = []
+        for endpoint, profile in self.requests:
+            budget = self.budgets.get(endpoint)
+            if profile.repeated() or (budget is not None and profile.total > budget):
+                limit = f" (budget {budget})" if budget is not None else ""
+                failures.append(f"{endpoint}{limit}: {profile.report()}")
+        return failures
+
+    def check(self):
+        failures = self.failures()
+        if failures:
+            raise AssertionError("Query budget exceeded:\n" + "\n".join(failures))
@@ -1,8 +1,13 @@
 from functools import wraps
 from flask import Blueprint, jsonify, session, current_app, request
-from src.models import User, UserProfile, DietPlan, WorkoutPlan # Import all necessary models
+from src.models import User, UserProfile # Import all necessary models
 from src.extensions import db
 from src.routes.profile import login_required # Reuse login_required decorator
+from src.serializers import USER_LIST
+from src.services.identity import bump_role_version, current_identity, invalidate_identity
+from src.services.admin_stats import user_plan_counts, get_global_stats
+from src.services.target_recompute import recompute_active_diet_targets
+from src.services.pagination import clamp_per_page, wants_cursor_pagination, include_total_requested, keyset_paginate, cursor_page_response
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
 
@@ -13,8 +18,8 @@ def admin_required(f):
         if "user_id" not in session:
             return jsonify({"error": "Acesso não autorizado. Faça login primeiro."}), 401
         
-        user = User.query.get(session["user_id"])
-        if not user or not user.is_admin:
+        identity = current_identity() # Cached, resolved once per request
+        if not identity or not identity.is_admin:
             return jsonify({"error": "Acesso negado. Esta funcionalidade é restrita a administradores."}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -29,9 +34,15 @@ def list_users():
     try:
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 10, type=int)
-        
-        users_pagination = User.query.order_by(User.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        users_data = [user.to_dict() for user in users_pagination.items]
+
+        if wants_cursor_pagination():
+            per_page = clamp_per_page(per_page)
+            cursor_page = keyset_paginate(USER_LIST.query(), User, per_page, request.args.get("cursor"), include_total_requested(), rows=True)
+            users_data = USER_LIST.dump_all(cursor_page["items"])
+            return jsonify(cursor_page_response(cursor_page, "users", "total_users", users_data, per_page)), 200
+
+        users_pagination = USER_LIST.query().order_by(User.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        users_data = USER_LIST.dump_all(users_pagination.items) # Column-projected rows, no ORM instances
         
         return jsonify({
             "users": users_data,
@@ -39,6 +50,8 @@ def list_users():
             "current_page": users_pagination.page,
             "total_pages": users_pagination.pages
         }), 200
+    except ValueError as ve: # Malformed cursor
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         current_app.logger.error(f"Erro ao listar utilizadores: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao listar os utilizadores."}), 500
@@ -57,7 +70,9 @@ def toggle_admin_status(user_id):
     
     try:
         user_to_modify.is_admin = not user_to_modify.is_admin
+        bump_role_version()
         db.session.commit()
+        invalidate_identity(user_id)
         current_app.logger.info(f"Estado de admin do utilizador {user_id} alterado para {user_to_modify.is_admin} pelo admin {session['user_id']}.")
         return jsonify({"message": f"Estado de administrador do utilizador {user_to_modify.username} atualizado com sucesso.", "user": user_to_modify.to_dict()}), 200
     except Exception as e:
@@ -80,7 +95,9 @@ def delete_user_by_admin(user_id):
     try:
         # Cascading deletes should handle related profile, plans, preferences if configured correctly in models
         db.session.delete(user_to_delete)
+        bump_role_version()
         db.session.commit()
+        invalidate_identity(user_id)
         current_app.logger.info(f"Utilizador {user_id} ({user_to_delete.username}) eliminado pelo admin {session['user_id']}.")
         return jsonify({"message": f"Utilizador {user_to_delete.username} eliminado com sucesso."}), 200
     except Exception as e:
@@ -98,14 +115,46 @@ def get_user_details_by_admin(user_id):
         return jsonify({"error": "Utilizador não encontrado"}), 404
     
     profile = UserProfile.query.filter_by(user_id=user.id).first()
-    diet_plans = DietPlan.query.filter_by(user_id=user.id).order_by(DietPlan.start_date.desc()).all()
-    workout_plans = WorkoutPlan.query.filter_by(user_id=user.id).order_by(WorkoutPlan.start_date.desc()).all()
     
     user_data = user.to_dict()
     user_data["profile"] = profile.to_dict() if profile else None
-    user_data["diet_plans_count"] = len(diet_plans)
-    user_data["workout_plans_count"] = len(workout_plans)
+    user_data.update(user_plan_counts(user.id)) # COUNT(*) in SQL, without loading the plans
     # Add more details as needed
 
     return jsonify(user_data), 200
 
+@admin_bp.route("/stats", methods=["GET"])
+@login_required
+@admin_required
+def get_admin_stats():
+    """Estatísticas globais para o dashboard de administração (rollup em cache; ?refresh=1 força o recálculo)."""
+    try:
+        return jsonify(get_global_stats(refresh=request.args.get("refresh", type=int) == 1)), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro ao calcular as estatísticas globais: {str(e)}", exc_info=True)
+        return jsonify({"error": "Ocorreu um erro ao calcular as estatísticas."}), 500
+
+@admin_bp.route("/metrics", methods=["GET"])
+@login_required
+@admin_required
+def get_metrics():
+    """Métricas de latência e SQL por endpoint, no formato de texto do Prometheus."""
+    registry = current_app.extensions.get("metrics")
+    if registry is None:
+        return jsonify({"error": "Métricas desativadas (METRICS_ENABLED)."}), 404
+    return current_app.response_class(registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@admin_bp.route("/plans/recompute_targets", methods=["POST"])
+@login_required
+@admin_required
+def recompute_plan_targets():
+    """Recalcula as metas diárias de todos os planos de dieta ativos (apenas para administradores)."""
+    try:
+        stats = recompute_active_diet_targets()
+        current_app.logger.info(f"Metas dos planos ativos recalculadas pelo admin {session['user_id']}: {stats}")
+        return jsonify({"message": "Metas recalculadas com sucesso.", **stats}), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erro ao recalcular as metas dos planos: {str(e)}", exc_info=True)
+        return jsonify({"error": "Ocorreu um erro ao recalcular as metas dos planos."}), 500
@@ -2,10 +2,16 @@ from flask import Blueprint, request, jsonify, session, current_app
 from src.models import Advertisement, User # Import Advertisement model
 from src.extensions import db
 from src.routes.admin import admin_required # Reuse admin_required decorator
+from src.services.ad_index import get_ad_index
+from src.services.ad_counters import get_ad_counters
+from src.db_routing import mark_read_only
+from src.serializers import ADVERTISEMENT_LIST
+from src.services.pagination import clamp_per_page, wants_cursor_pagination, include_total_requested, keyset_paginate, cursor_page_response
 from datetime import datetime
 
 ads_bp = Blueprint("advertisements", __name__, url_prefix="/api/admin/advertisements")
 public_ads_bp = Blueprint("public_advertisements", __name__, url_prefix="/api/advertisements")
+public_ads_bp.before_request(mark_read_only) # Public ad reads may be served from the replica
 
 @ads_bp.route("/", methods=["POST"])
 @admin_required
@@ -29,6 +35,7 @@ def create_advertisement():
     try:
         db.session.add(new_ad)
         db.session.commit()
+        get_ad_index().upsert(new_ad)
         current_app.logger.info(f"Advertisement 	{new_ad.id}	 created by admin 	{session['user_id']}	.")
         return jsonify(new_ad.to_dict()), 201
     except Exception as e:
@@ -42,22 +49,36 @@ def list_advertisements():
     try:
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 10, type=int)
-        ads_pagination = Advertisement.query.order_by(Advertisement.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        ads_data = [ad.to_dict() for ad in ads_pagination.items]
+        if wants_cursor_pagination():
+            per_page = clamp_per_page(per_page)
+            cursor_page = keyset_paginate(ADVERTISEMENT_LIST.query(), Advertisement, per_page, request.args.get("cursor"), include_total_requested(), rows=True)
+            advertisements_data = ADVERTISEMENT_LIST.dump_all(cursor_page["items"])
+            return jsonify(cursor_page_response(cursor_page, "advertisements", "total_advertisements", advertisements_data, per_page)), 200
+
+        ads_pagination = ADVERTISEMENT_LIST.query().order_by(Advertisement.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        ads_data = ADVERTISEMENT_LIST.dump_all(ads_pagination.items) # creator_username joined, not lazy-loaded per ad
         return jsonify({
             "advertisements": ads_data,
             "total_advertisements": ads_pagination.total,
             "current_page": ads_pagination.page,
             "total_pages": ads_pagination.pages
         }), 200
+    except ValueError as ve: # Malformed cursor
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         current_app.logger.error(f"Error listing advertisements: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao listar os anúncios."}), 500
 
+@ads_bp.route("/counters", methods=["GET"])
+@admin_required
+def get_ad_counter_stats():
+    """Estado do buffer de contadores: incrementos pendentes, agregados, descartados e atraso do flush."""
+    return jsonify(get_ad_counters().stats()), 200
+
 @ads_bp.route("/<int:ad_id>", methods=["GET"])
 @admin_required
 def get_advertisement(ad_id):
-    ad = Advertisement.query.get(ad_id)
+    ad = db.session.get(Advertisement, ad_id)
     if not ad:
         return jsonify({"error": "Anúncio não encontrado."}), 404
     return jsonify(ad.to_dict()), 200
@@ -65,7 +86,7 @@ def get_advertisement(ad_id):
 @ads_bp.route("/<int:ad_id>", methods=["PUT"])
 @admin_required
 def update_advertisement(ad_id):
-    ad = Advertisement.query.get(ad_id)
+    ad = db.session.get(Advertisement, ad_id)
     if not ad:
         return jsonify({"error": "Anúncio não encontrado."}), 404
     
@@ -81,6 +102,7 @@ def update_advertisement(ad_id):
     
     try:
         db.session.commit()
+        get_ad_index().upsert(ad)
         current_app.logger.info(f"Advertisement 	{ad_id}	 updated by admin 	{session['user_id']}	.")
         return jsonify(ad.to_dict()), 200
     except Exception as e:
@@ -91,13 +113,14 @@ def update_advertisement(ad_id):
 @ads_bp.route("/<int:ad_id>", methods=["DELETE"])
 @admin_required
 def delete_advertisement(ad_id):
-    ad = Advertisement.query.get(ad_id)
+    ad = db.session.get(Advertisement, ad_id)
     if not ad:
         return jsonify({"error": "Anúncio não encontrado."}), 404
     
     try:
         db.session.delete(ad)
         db.session.commit()
+        get_ad_index().remove(ad_id)
         current_app.logger.info(f"Advertisement 	{ad_id}	 deleted by admin 	{session['user_id']}	.")
         return jsonify({"message": "Anúncio eliminado com sucesso."}), 200
     except Exception as e:
@@ -109,19 +132,11 @@ def delete_advertisement(ad_id):
 @public_ads_bp.route("/<string:placement_area>", methods=["GET"])
 def get_active_ads_by_placement(placement_area):
     try:
-        now = datetime.utcnow()
-        ads = Advertisement.query.filter(
-            Advertisement.placement_area == placement_area,
-            Advertisement.is_active == True,
-            (Advertisement.start_date == None) | (Advertisement.start_date <= now),
-            (Advertisement.end_date == None) | (Advertisement.end_date >= now)
-        ).order_by(func.random()).limit(5).all() # Get up to 5 random active ads for the placement
-        
-        ads_data = [ad.to_dict() for ad in ads]
-        # Increment views count (basic implementation)
-        for ad_obj in ads:
-            ad_obj.views = (ad_obj.views or 0) + 1
-        db.session.commit()
+        # Up to 5 random active ads for the placement, served from the in-memory index
+        ads_data = get_ad_index().sample(placement_area)
+
+        # Views are buffered and written in batches by the ad counters flush thread
+        get_ad_counters().add_views([ad["id"] for ad in ads_data])
 
         return jsonify(ads_data), 200
     except Exception as e:
@@ -130,17 +145,15 @@ def get_active_ads_by_placement(placement_area):
 
 @public_ads_bp.route("/<int:ad_id>/click", methods=["POST"])
 def track_ad_click(ad_id):
-    ad = Advertisement.query.get(ad_id)
+    ad = db.session.get(Advertisement, ad_id)
     if not ad:
         return jsonify({"error": "Anúncio não encontrado."}), 404
     
     try:
-        ad.clicks = (ad.clicks or 0) + 1
-        db.session.commit()
+        get_ad_counters().add_click(ad_id) # Written in batches, see ad_counters
         current_app.logger.info(f"Ad 	{ad_id}	 clicked. Target: {ad.target_url}")
         return jsonify({"message": "Click registado.", "target_url": ad.target_url}), 200
     except Exception as e:
-        db.session.rollback()
         current_app.logger.error(f"Error tracking click for ad 	{ad_id}	: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao registar o click."}), 500
 
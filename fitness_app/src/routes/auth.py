@@ -1,9 +1,19 @@
 from flask import Blueprint, request, jsonify, session
 from src.models.user import User
 from src.extensions import db # Changed import
+from src.services.password_hashing import get_password_hasher, HashingBusyError
 
 auth_bp = Blueprint("auth", __name__)
 
+HASHING_RETRY_AFTER_SECONDS = 1
+
+@auth_bp.errorhandler(HashingBusyError)
+def hashing_busy(error):
+    # Fail fast instead of queueing logins behind a saturated hashing pool
+    response = jsonify({"error": "Server busy, please retry shortly"})
+    response.headers["Retry-After"] = str(HASHING_RETRY_AFTER_SECONDS)
+    return response, 503
+
 @auth_bp.route("/register", methods=["POST"])
 def register():
     data = request.get_json()
@@ -21,7 +31,7 @@ def register():
         return jsonify({"error": "Email already exists"}), 409
 
     new_user = User(username=username, email=email)
-    new_user.set_password(password)
+    new_user.password_hash = get_password_hasher().hash(password)
     db.session.add(new_user)
     db.session.commit()
 
@@ -38,9 +48,15 @@ def login():
 
     user = User.query.filter_by(username=username).first()
 
-    if user is None or not user.check_password(password):
+    hasher = get_password_hasher()
+    if user is None or not hasher.verify(user.password_hash, password):
         return jsonify({"error": "Invalid username or password"}), 401
 
+    if hasher.needs_rehash(user.password_hash):
+        # Upgrade hashes made with older parameters while we have the plaintext
+        user.password_hash = hasher.hash(password)
+        db.session.commit()
+
     session["user_id"] = user.id
     session["username"] = user.username
     return jsonify({"message": "Login successful", "user_id": user.id, "username": user.username}), 200
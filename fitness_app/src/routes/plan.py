@@ -1,10 +1,12 @@
 # src/routes/plan.py
 from flask import Blueprint, jsonify, session, current_app
-from src.models import User, UserProfile, DietPlan, DietPlanMeal, WorkoutPlan, WorkoutPlanDay, WorkoutExercise
+from src.models import UserProfile
 from src.extensions import db
-from src.services import plan_service
+from src.services import plan_service, plan_templates
+from src.services.plan_loader import load_active_diet_plan, load_active_workout_plan, diet_meals_by_day, workout_plan_days
+from src.services.plan_persistence import persist_generated_plans
 from src.routes.profile import login_required
-from datetime import date, timedelta
+from src.db_routing import read_only
 
 plan_bp = Blueprint("plan", __name__)
 
@@ -36,83 +38,28 @@ def generate_plan():
         target_calories = plan_service.adjust_calories_for_goal(tdee, profile.goal)
         macros = plan_service.calculate_macronutrients(target_calories, profile.goal)
 
-        # Deactivate existing active plans
-        DietPlan.query.filter_by(user_id=user_id, is_active=True).update({"is_active": False})
-        WorkoutPlan.query.filter_by(user_id=user_id, is_active=True).update({"is_active": False})
-
-        # Create Diet Plan
-        new_diet_plan = DietPlan(
-            user_id=user_id,
-            start_date=date.today(),
-            end_date=date.today() + timedelta(days=30),
-            daily_calories=macros["target_calories"],
-            daily_protein_g=macros["protein_g"],
-            daily_carbs_g=macros["carbs_g"],
-            daily_fat_g=macros["fat_g"],
-            is_active=True
-        )
-        db.session.add(new_diet_plan)
-        db.session.flush() # Flush to get new_diet_plan.id for meal association
-
-        sample_daily_meals = plan_service.generate_sample_daily_meals(macros["target_calories"], macros)
-        # For a 30-day plan, we can repeat the weekly sample or generate more variety.
-        # For now, let's assume a 7-day cycle for meals and save one week's worth.
-        for day_num in range(1, 8): # 1=Monday, 7=Sunday
-            for meal_data in sample_daily_meals:
-                db_meal = DietPlanMeal(
-                    diet_plan_id=new_diet_plan.id,
-                    day_of_week=day_num, # Store for each day of the week
-                    meal_name=meal_data["meal_name"],
-                    description=meal_data["description"],
-                    calories=meal_data["calories"],
-                    protein_g=meal_data["protein_g"],
-                    carbs_g=meal_data["carbs_g"],
-                    fat_g=meal_data["fat_g"],
-                    suggested_time=meal_data["suggested_time"]
-                )
-                db.session.add(db_meal)
-        current_app.logger.info(f"User {user_id} New Diet Plan ID: {new_diet_plan.id} with sample meals created.")
-
-        # Create Workout Plan
+        # Meals and exercises are shared, content-addressed templates rendered from these inputs
         days_per_week_preference = 4 # Could be a user preference later
-        sample_workout_days = plan_service.generate_sample_workout_plan(profile.activity_level, profile.goal, days_per_week_preference)
-        
-        new_workout_plan = WorkoutPlan(
-            user_id=user_id,
-            start_date=date.today(),
-            end_date=date.today() + timedelta(days=30),
-            days_per_week=days_per_week_preference,
-            description=f"Plano de treino para {profile.goal.lower()} com foco em {profile.activity_level.lower()} atividade.",
-            is_active=True
+        diet_template_id = plan_templates.get_diet_template_id(macros)
+        workout_template_id = plan_templates.get_workout_template_id(profile.activity_level, profile.goal, days_per_week_preference)
+
+        # Deactivates old plans and inserts the new ones referencing the templates
+        diet_plan_id, workout_plan_id = persist_generated_plans(
+            user_id,
+            macros,
+            diet_template_id,
+            workout_template_id,
+            days_per_week_preference,
+            f"Plano de treino para {profile.goal.lower()} com foco em {profile.activity_level.lower()} atividade."
         )
-        db.session.add(new_workout_plan)
-        db.session.flush() # Flush to get new_workout_plan.id
-
-        for workout_day_data in sample_workout_days:
-            wp_day = WorkoutPlanDay(
-                workout_plan_id=new_workout_plan.id,
-                day_of_week=workout_day_data["day_of_week"],
-                focus=workout_day_data["focus"]
-            )
-            db.session.add(wp_day)
-            db.session.flush() # Flush to get wp_day.id
-
-            for exercise_data in workout_day_data["exercises"]:
-                wp_exercise = WorkoutExercise(
-                    workout_plan_day_id=wp_day.id,
-                    exercise_name=exercise_data["exercise_name"],
-                    sets=exercise_data["sets"],
-                    reps=exercise_data["reps"]
-                )
-                db.session.add(wp_exercise)
-        current_app.logger.info(f"User {user_id} New Workout Plan ID: {new_workout_plan.id} with sample exercises created.")
+        current_app.logger.info(f"User {user_id} New Diet Plan ID: {diet_plan_id} and Workout Plan ID: {workout_plan_id} created.")
 
         db.session.commit()
 
         return jsonify({
             "message": "Diet and Workout plans generated successfully.",
-            "diet_plan_id": new_diet_plan.id,
-            "workout_plan_id": new_workout_plan.id,
+            "diet_plan_id": diet_plan_id,
+            "workout_plan_id": workout_plan_id,
             "tdee": round(tdee, 2),
             "target_calories": macros["target_calories"],
             "macronutrients": macros
@@ -128,24 +75,14 @@ def generate_plan():
 
 @plan_bp.route("/diet/current", methods=["GET"])
 @login_required
+@read_only
 def get_current_diet_plan():
     user_id = session["user_id"]
-    diet_plan = DietPlan.query.filter_by(user_id=user_id, is_active=True).first()
+    diet_plan = load_active_diet_plan(user_id)
     if not diet_plan:
         return jsonify({"message": "No active diet plan found."}), 404
 
-    meals_query = DietPlanMeal.query.filter_by(diet_plan_id=diet_plan.id).order_by(DietPlanMeal.day_of_week, DietPlanMeal.suggested_time).all()
-    meals_by_day = {day: [] for day in range(1, 8)}
-    for meal in meals_query:
-        meals_by_day[meal.day_of_week].append({
-            "meal_name": meal.meal_name,
-            "description": meal.description,
-            "calories": meal.calories,
-            "protein_g": meal.protein_g,
-            "carbs_g": meal.carbs_g,
-            "fat_g": meal.fat_g,
-            "suggested_time": meal.suggested_time
-        })
+    meals_by_day = diet_meals_by_day(diet_plan)
 
     return jsonify({
         "id": diet_plan.id,
@@ -160,26 +97,14 @@ def get_current_diet_plan():
 
 @plan_bp.route("/workout/current", methods=["GET"])
 @login_required
+@read_only
 def get_current_workout_plan():
     user_id = session["user_id"]
-    workout_plan = WorkoutPlan.query.filter_by(user_id=user_id, is_active=True).first()
+    workout_plan = load_active_workout_plan(user_id)
     if not workout_plan:
         return jsonify({"message": "No active workout plan found."}), 404
 
-    days_query = WorkoutPlanDay.query.filter_by(workout_plan_id=workout_plan.id).order_by(WorkoutPlanDay.day_of_week).all()
-    plan_days_data = []
-    for day in days_query:
-        exercises_query = WorkoutExercise.query.filter_by(workout_plan_day_id=day.id).all()
-        exercises_data = [{
-            "exercise_name": ex.exercise_name,
-            "sets": ex.sets,
-            "reps": ex.reps
-        } for ex in exercises_query]
-        plan_days_data.append({
-            "day_of_week": day.day_of_week,
-            "focus": day.focus,
-            "exercises": exercises_data
-        })
+    plan_days_data = workout_plan_days(workout_plan) # Days and exercises are eager-loaded, no query per day
 
     return jsonify({
         "id": workout_plan.id,
@@ -1,15 +1,104 @@
+from math import ceil
 from flask import Blueprint, request, jsonify, current_app, session
 from src.models import Product, ProductCategory
 from src.extensions import db
 from src.routes.admin import admin_required # For admin-only routes
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from slugify import slugify # Using python-slugify for generating slugs
+from src.services.response_cache import cached_response, get_response_cache
+from src.db_routing import mark_read_only
+from src.serializers import PRODUCT_LIST
+from src.services.pagination import clamp_per_page, wants_cursor_pagination, include_total_requested, keyset_paginate, cursor_page_response
+from src.services.product_search import SearchUnavailable, search_products
 
 # Blueprint for admin-only product and category management
 admin_shop_bp = Blueprint("admin_shop", __name__, url_prefix="/api/admin/shop")
 
 # Blueprint for public-facing product and category listing
 public_shop_bp = Blueprint("public_shop", __name__, url_prefix="/api/shop")
+public_shop_bp.before_request(mark_read_only) # Public catalog reads may be served from the replica
+
+# Public catalog responses are cached until an admin changes the catalog
+CATALOG_CACHE = "catalog"
+MAX_SEARCH_PER_PAGE = 50
+DEFAULT_PER_PAGE = 20 # Flask-SQLAlchemy's fallback for a per_page < 1
+
+@admin_shop_bp.after_request
+def bump_catalog_version(response):
+    if request.method in ("POST", "PUT", "PATCH", "DELETE") and response.status_code < 400:
+        get_response_cache(CATALOG_CACHE).bump()
+    return response
+
+# --- Catalog listing helpers (constant number of queries) ---
+def categories_with_counts_statement():
+    """SELECT of all categories ordered by name with their product counts (one grouped aggregate); shared with src/asgi.py."""
+    return select(ProductCategory, func.count(Product.id)) \
+        .outerjoin(Product, Product.category_id == ProductCategory.id) \
+        .group_by(ProductCategory.id) \
+        .order_by(ProductCategory.name)
+
+def categories_with_product_counts():
+    """All categories ordered by name with their product counts, computed by one grouped aggregate."""
+    rows = db.session.execute(categories_with_counts_statement()).all()
+    return [category.to_dict(product_count=product_count) for category, product_count in rows]
+
+def public_products_criteria(category_id=None, featured=None) -> list:
+    """WHERE criteria of the public product listing, for a Query's filter() or a select's where()."""
+    criteria = [Product.is_active == True]
+    if category_id is not None:
+        criteria.append(Product.category_id == category_id)
+    if featured is not None:
+        criteria.append(Product.is_featured == featured)
+    return criteria
+
+def category_id_statement(category_slug):
+    return select(ProductCategory.id).where(ProductCategory.slug == category_slug)
+
+CATEGORY_NOT_FOUND = {"products": [], "total_products": 0, "message": "Categoria não encontrada."}
+
+def public_products_listing(args):
+    """Offset page of GET /api/shop/products, shared by the sync view and the async one in src/asgi.py.
+
+    A generator: it yields each statement to run, is sent back its Result, and returns
+    (data, status). run_statements() drives it on the Flask-SQLAlchemy session; the ASGI
+    server drives it on an AsyncSession.
+    """
+    page = max(args.get("page", 1, type=int), 1)
+    per_page = args.get("per_page", 12, type=int)
+    per_page = per_page if per_page >= 1 else DEFAULT_PER_PAGE
+    category_slug = args.get("category", None, type=str)
+    featured = args.get("featured", None, type=bool)
+
+    category_id = None
+    if category_slug:
+        category_id = (yield category_id_statement(category_slug)).scalar()
+        if category_id is None:
+            return CATEGORY_NOT_FOUND, 200 # Or 404
+
+    statement = PRODUCT_LIST.select().where(*public_products_criteria(category_id, featured))
+    total = (yield select(func.count()).select_from(statement.order_by(None).subquery())).scalar()
+    rows = (yield statement.order_by(Product.created_at.desc()).limit(per_page).offset((page - 1) * per_page)).all()
+    return {
+        "products": PRODUCT_LIST.dump_all(rows),
+        "total_products": total,
+        "current_page": page,
+        "total_pages": ceil(total / per_page) if total else 0
+    }, 200
+
+def run_statements(builder):
+    """Runs a statement-yielding builder (such as public_products_listing) on db.session; returns its result."""
+    try:
+        statement = next(builder)
+        while True:
+            statement = builder.send(db.session.execute(statement))
+    except StopIteration as done:
+        return done.value
+
+def products_with_category():
+    """Product query that loads each product's category in the same SELECT (for category_name)."""
+    return Product.query.options(joinedload(Product.category))
 
 # --- Product Category Management (Admin) ---
 @admin_shop_bp.route("/categories", methods=["POST"])
@@ -32,7 +121,7 @@ def create_product_category():
     try:
         db.session.add(new_category)
         db.session.commit()
-        current_app.logger.info(f"Product category 	{new_category.id}	 (	{new_category.name}	) created by admin 	{session["user_id"]}	.")
+        current_app.logger.info(f"Product category 	{new_category.id}	 (	{new_category.name}	) created by admin 	{session['user_id']}	.")
         return jsonify(new_category.to_dict()), 201
     except IntegrityError as e:
         db.session.rollback()
@@ -51,8 +140,7 @@ def create_product_category():
 @admin_required
 def list_product_categories_admin():
     try:
-        categories = ProductCategory.query.order_by(ProductCategory.name).all()
-        return jsonify([category.to_dict() for category in categories]), 200
+        return jsonify(categories_with_product_counts()), 200
     except Exception as e:
         current_app.logger.error(f"Error listing product categories for admin: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao listar as categorias."}), 500
@@ -82,7 +170,7 @@ def update_product_category(category_id):
 
     try:
         db.session.commit()
-        current_app.logger.info(f"Product category 	{category_id}	 updated by admin 	{session["user_id"]}	.")
+        current_app.logger.info(f"Product category 	{category_id}	 updated by admin 	{session['user_id']}	.")
         return jsonify(category.to_dict()), 200
     except IntegrityError as e:
         db.session.rollback()
@@ -106,13 +194,18 @@ def delete_product_category(category_id):
     try:
         db.session.delete(category)
         db.session.commit()
-        current_app.logger.info(f"Product category 	{category_id}	 (	{category.name}	) deleted by admin 	{session["user_id"]}	.")
+        current_app.logger.info(f"Product category 	{category_id}	 (	{category.name}	) deleted by admin 	{session['user_id']}	.")
         return jsonify({"message": "Categoria eliminada com sucesso."}), 200
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error deleting product category 	{category_id}	: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao eliminar a categoria."}), 500
 
+@admin_shop_bp.route("/cache", methods=["GET"])
+@admin_required
+def get_catalog_cache_stats():
+    return jsonify(get_response_cache(CATALOG_CACHE).stats()), 200
+
 # --- Product Management (Admin) ---
 @admin_shop_bp.route("/products", methods=["POST"])
 @admin_required
@@ -145,7 +238,7 @@ def create_product():
     try:
         db.session.add(new_product)
         db.session.commit()
-        current_app.logger.info(f"Product 	{new_product.id}	 (	{new_product.name}	) created by admin 	{session["user_id"]}	.")
+        current_app.logger.info(f"Product 	{new_product.id}	 (	{new_product.name}	) created by admin 	{session['user_id']}	.")
         return jsonify(new_product.to_dict()), 201
     except IntegrityError as e:
         db.session.rollback()
@@ -166,14 +259,22 @@ def list_products_admin():
     try:
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 10, type=int)
-        products_pagination = Product.query.order_by(Product.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        products_data = [product.to_dict() for product in products_pagination.items]
+        if wants_cursor_pagination():
+            per_page = clamp_per_page(per_page)
+            cursor_page = keyset_paginate(PRODUCT_LIST.query(), Product, per_page, request.args.get("cursor"), include_total_requested(), rows=True)
+            products_data = PRODUCT_LIST.dump_all(cursor_page["items"])
+            return jsonify(cursor_page_response(cursor_page, "products", "total_products", products_data, per_page)), 200
+
+        products_pagination = PRODUCT_LIST.query().order_by(Product.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+        products_data = PRODUCT_LIST.dump_all(products_pagination.items)
         return jsonify({
             "products": products_data,
             "total_products": products_pagination.total,
             "current_page": products_pagination.page,
             "total_pages": products_pagination.pages
         }), 200
+    except ValueError as ve: # Malformed cursor
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         current_app.logger.error(f"Error listing products for admin: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao listar os produtos."}), 500
@@ -217,7 +318,7 @@ def update_product(product_id):
 
     try:
         db.session.commit()
-        current_app.logger.info(f"Product 	{product_id}	 updated by admin 	{session["user_id"]}	.")
+        current_app.logger.info(f"Product 	{product_id}	 updated by admin 	{session['user_id']}	.")
         return jsonify(product.to_dict()), 200
     except IntegrityError as e:
         db.session.rollback()
@@ -238,7 +339,7 @@ def delete_product(product_id):
     try:
         db.session.delete(product)
         db.session.commit()
-        current_app.logger.info(f"Product 	{product_id}	 (	{product.name}	) deleted by admin 	{session["user_id"]}	.")
+        current_app.logger.info(f"Product 	{product_id}	 (	{product.name}	) deleted by admin 	{session['user_id']}	.")
         return jsonify({"message": "Produto eliminado com sucesso."}), 200
     except Exception as e:
         db.session.rollback()
@@ -247,52 +348,67 @@ def delete_product(product_id):
 
 # --- Public Shop Routes ---
 @public_shop_bp.route("/categories", methods=["GET"])
+@cached_response(CATALOG_CACHE)
 def list_public_product_categories():
     try:
-        categories = ProductCategory.query.order_by(ProductCategory.name).all()
         # Only return categories that have active products, or all categories if desired
         # For now, returning all categories. Could be filtered.
-        return jsonify([category.to_dict() for category in categories]), 200
+        return jsonify(categories_with_product_counts()), 200
     except Exception as e:
         current_app.logger.error(f"Error listing public categories: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao carregar as categorias."}), 500
 
 @public_shop_bp.route("/products", methods=["GET"])
+@cached_response(CATALOG_CACHE)
 def list_public_products():
     try:
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 12, type=int)
-        category_slug = request.args.get("category", None, type=str)
-        featured = request.args.get("featured", None, type=bool)
-
-        query = Product.query.filter_by(is_active=True)
+        if not wants_cursor_pagination():
+            data, status = run_statements(public_products_listing(request.args))
+            return jsonify(data), status
 
+        per_page = clamp_per_page(request.args.get("per_page", 12, type=int))
+        category_slug = request.args.get("category", None, type=str)
+        category_id = None
         if category_slug:
-            category = ProductCategory.query.filter_by(slug=category_slug).first()
-            if category:
-                query = query.filter_by(category_id=category.id)
-            else:
-                return jsonify({"products": [], "total_products": 0, "message": "Categoria não encontrada."}), 200 # Or 404
-        
-        if featured is not None:
-            query = query.filter_by(is_featured=featured)
-
-        products_pagination = query.order_by(Product.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        products_data = [product.to_dict() for product in products_pagination.items]
-        
-        return jsonify({
-            "products": products_data,
-            "total_products": products_pagination.total,
-            "current_page": products_pagination.page,
-            "total_pages": products_pagination.pages
-        }), 200
+            category_id = db.session.execute(category_id_statement(category_slug)).scalar()
+            if category_id is None:
+                return jsonify(CATEGORY_NOT_FOUND), 200
+        # Explicit criteria: on a projected query filter_by() would target the joined category
+        query = PRODUCT_LIST.query().filter(*public_products_criteria(category_id, request.args.get("featured", None, type=bool)))
+        cursor_page = keyset_paginate(query, Product, per_page, request.args.get("cursor"), include_total_requested(), rows=True)
+        products_data = PRODUCT_LIST.dump_all(cursor_page["items"])
+        return jsonify(cursor_page_response(cursor_page, "products", "total_products", products_data, per_page)), 200
+    except ValueError as ve: # Malformed cursor
+        return jsonify({"error": str(ve)}), 400
     except Exception as e:
         current_app.logger.error(f"Error listing public products: {str(e)}", exc_info=True)
         return jsonify({"error": "Ocorreu um erro ao carregar os produtos."}), 500
 
+@public_shop_bp.route("/search", methods=["GET"])
+@cached_response(CATALOG_CACHE)
+def search_public_products():
+    """Full-text search: ?q=words, best matches first, with <mark> highlights; paged with ?cursor=."""
+    query_text = request.args.get("q", "", type=str).strip()
+    if not query_text:
+        return jsonify({"error": "Indique o texto a pesquisar (parâmetro q)."}), 400
+    per_page = min(max(request.args.get("per_page", 12, type=int), 1), MAX_SEARCH_PER_PAGE)
+    try:
+        page = search_products(query_text, per_page, request.args.get("cursor"), include_total_requested())
+        data = cursor_page_response(page, "products", "total_products", page["items"], per_page)
+        data["query"] = query_text
+        return jsonify(data), 200
+    except ValueError as ve: # Malformed cursor
+        return jsonify({"error": str(ve)}), 400
+    except SearchUnavailable:
+        return jsonify({"error": "A pesquisa não está disponível."}), 503
+    except Exception as e:
+        current_app.logger.error(f"Error searching products: {str(e)}", exc_info=True)
+        return jsonify({"error": "Ocorreu um erro ao pesquisar os produtos."}), 500
+
 @public_shop_bp.route("/products/<string:slug>", methods=["GET"])
+@cached_response(CATALOG_CACHE)
 def get_public_product_by_slug(slug):
-    product = Product.query.filter_by(slug=slug, is_active=True).first()
+    product = products_with_category().filter_by(slug=slug, is_active=True).first()
     if not product:
         return jsonify({"error": "Produto não encontrado ou indisponível."}), 404
     return jsonify(product.to_dict()), 200
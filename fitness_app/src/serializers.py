@@ -0,0 +1,97 @@
+# src/serializers.py
+# Column-projected serializers for the listing endpoints: each one declares its output fields once and
+# compiles them into a single SELECT of just those columns, so rows go straight to dicts without ORM
+# instances, identity map or per-row lazy loads. The payloads are the same as the models' to_dict().
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from src.extensions import db
+from src.models import Advertisement, Product, ProductCategory, User
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+class Serializer:
+    """Output fields of one listing, as (key, column, converter or None) tuples in output order.
+
+    outerjoins are (target, onclause) pairs for fields that come from related tables.
+    Rows may carry extra trailing columns (e.g. pagination cursors); they are ignored.
+    """
+
+    def __init__(self, model, fields, outerjoins=()):
+        self.model = model
+        self.fields = tuple(fields)
+        self.outerjoins = tuple(outerjoins)
+        self.columns = [column.label(key) for key, column, _ in self.fields]
+        self._plain = [(index, key) for index, (key, _, converter) in enumerate(self.fields) if converter is None]
+        self._converted = [(index, key, converter) for index, (key, _, converter) in enumerate(self.fields) if converter is not None]
+
+    def query(self):
+        """Legacy Query over the projected columns, for paginate() and keyset_paginate(rows=True)."""
+        query = db.session.query(*self.columns).select_from(self.model)
+        for target, onclause in self.outerjoins:
+            query = query.outerjoin(target, onclause)
+        return query
+
+    def select(self):
+        """The same projection as a 2.0-style select() (e.g. for AsyncSession)."""
+        statement = select(*self.columns).select_from(self.model)
+        for target, onclause in self.outerjoins:
+            statement = statement.outerjoin(target, onclause)
+        return statement
+
+    def dump(self, row) -> dict:
+        data = {key: row[index] for index, key in self._plain}
+        for index, key, converter in self._converted:
+            data[key] = converter(row[index])
+        return data
+
+    def dump_all(self, rows) -> list:
+        dump = self.dump
+        return [dump(row) for row in rows]
+
+# --- Serializers dos endpoints de listagem ---
+
+USER_LIST = Serializer(User, [
+    ("id", User.id, None),
+    ("username", User.username, None),
+    ("email", User.email, None),
+    ("is_admin", User.is_admin, None),
+    ("created_at", User.created_at, isoformat),
+])
+
+PRODUCT_LIST = Serializer(Product, [
+    ("id", Product.id, None),
+    ("name", Product.name, None),
+    ("slug", Product.slug, None),
+    ("description", Product.description, None),
+    ("price", Product.price, str), # Decimal as string, as in Product.to_dict
+    ("stock_quantity", Product.stock_quantity, None),
+    ("sku", Product.sku, None),
+    ("image_url", Product.image_url, None),
+    ("is_active", Product.is_active, None),
+    ("is_featured", Product.is_featured, None),
+    ("category_id", Product.category_id, None),
+    ("category_name", ProductCategory.name, None),
+    ("created_at", Product.created_at, isoformat),
+    ("updated_at", Product.updated_at, isoformat),
+], outerjoins=[(ProductCategory, Product.category_id == ProductCategory.id)])
+
+_creator = aliased(User, name="creator")
+
+ADVERTISEMENT_LIST = Serializer(Advertisement, [
+    ("id", Advertisement.id, None),
+    ("title", Advertisement.title, None),
+    ("content", Advertisement.content, None),
+    ("image_url", Advertisement.image_url, None),
+    ("target_url", Advertisement.target_url, None),
+    ("placement_area", Advertisement.placement_area, None),
+    ("is_active", Advertisement.is_active, None),
+    ("start_date", Advertisement.start_date, isoformat),
+    ("end_date", Advertisement.end_date, isoformat),
+    ("clicks", Advertisement.clicks, None),
+    ("views", Advertisement.views, None),
+    ("created_by_id", Advertisement.created_by_id, None),
+    ("creator_username", _creator.username, None), # Joined instead of lazy-loading creator per row
+    ("created_at", Advertisement.created_at, isoformat),
+    ("updated_at", Advertisement.updated_at, isoformat),
+], outerjoins=[(_creator, Advertisement.created_by_id == _creator.id)])
@@ -0,0 +1,184 @@
+# src/services/ad_counters.py
+import atexit
+import threading
+import time
+import weakref
+from flask import current_app
+from sqlalchemy import bindparam, func, update
+from src.extensions import db
+
+DEFAULT_FLUSH_SECONDS = 5.0
+DEFAULT_MAX_PENDING_ADS = 10000
+
+# Buffers not yet shut down, flushed by the single atexit hook below. Held weakly so a
+# discarded app (one per create_app in the tests) is not kept alive until exit.
+_live_buffers = weakref.WeakSet()
+
+# --- Contadores de visualizações/cliques com escrita diferida (write-behind) ---
+
+class AdCounterBuffer:
+    """Buffers ad view/click increments in memory and flushes them in batches.
+
+    Increments for the same ad are coalesced, then written by a background thread
+    every `flush_seconds` as one executemany of atomic
+    `UPDATE advertisements SET views = views + :views, clicks = clicks + :clicks`.
+    Pending increments are also flushed by shutdown(), which runs at interpreter exit
+    for every buffer still alive. The flush thread only holds a weak reference, so it
+    ends on its own once the app and its buffer are gone. When more than
+    `max_pending_ads` distinct ads are waiting, increments for new ads are dropped
+    and counted in the stats.
+    """
+
+    def __init__(self, flush_seconds=DEFAULT_FLUSH_SECONDS, max_pending_ads=DEFAULT_MAX_PENDING_ADS):
+        self.flush_seconds = flush_seconds
+        self.max_pending_ads = max_pending_ads
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {} # ad_id -> [views, clicks]
+        self._oldest_pending_at = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._app = None
+        self._stats = {
+            "increments": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "flushed_rows": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "last_flush_at": None,
+            "last_flush_duration_ms": None,
+        }
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions["ad_counters"] = self
+        if self.flush_seconds > 0:
+            self._thread = threading.Thread(target=_flush_loop, args=(weakref.ref(self), self._stop, self.flush_seconds),
+                                            name="ad-counter-flush", daemon=True)
+            self._thread.start()
+            weakref.finalize(self, self._stop.set) # Wakes the thread up to exit when the buffer is collected
+        _live_buffers.add(self)
+
+    def _add(self, ad_id, views, clicks):
+        with self._lock:
+            self._stats["increments"] += 1
+            counts = self._pending.get(ad_id)
+            if counts is None:
+                if len(self._pending) >= self.max_pending_ads:
+                    self._stats["dropped"] += 1
+                    return
+                self._pending[ad_id] = [views, clicks]
+                if self._oldest_pending_at is None:
+                    self._oldest_pending_at = time.monotonic()
+            else:
+                counts[0] += views
+                counts[1] += clicks
+                self._stats["coalesced"] += 1
+
+    def add_views(self, ad_ids):
+        for ad_id in ad_ids:
+            self._add(ad_id, 1, 0)
+
+    def add_click(self, ad_id):
+        self._add(ad_id, 0, 1)
+
+    def flush(self):
+        """Writes all pending increments. Must run inside an app context."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                oldest_pending_at, self._oldest_pending_at = self._oldest_pending_at, None
+            if not pending:
+                return 0
+
+            from src.models import Advertisement # Here so that app startup does not load the models
+            started = time.monotonic()
+            table = Advertisement.__table__
+            stmt = update(table).where(table.c.id == bindparam("ad_id")).values(
+                views=func.coalesce(table.c.views, 0) + bindparam("add_views"),
+                clicks=func.coalesce(table.c.clicks, 0) + bindparam("add_clicks")
+            )
+            rows = [{"ad_id": ad_id, "add_views": views, "add_clicks": clicks} for ad_id, (views, clicks) in pending.items()]
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(stmt, rows)
+            except Exception:
+                self._requeue(pending, oldest_pending_at)
+                with self._lock:
+                    self._stats["failed_flushes"] += 1
+                raise
+
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["flushed_rows"] += len(rows)
+                self._stats["last_flush_at"] = time.time()
+                self._stats["last_flush_duration_ms"] = round((time.monotonic() - started) * 1000, 3)
+            return len(rows)
+
+    def _requeue(self, pending, oldest_pending_at):
+        """Puts increments from a failed flush back in the buffer so the next flush retries them."""
+        with self._lock:
+            for ad_id, (views, clicks) in pending.items():
+                counts = self._pending.get(ad_id)
+                if counts is not None:
+                    counts[0] += views
+                    counts[1] += clicks
+                elif len(self._pending) < self.max_pending_ads:
+                    self._pending[ad_id] = [views, clicks]
+                else:
+                    self._stats["dropped"] += views + clicks
+            if oldest_pending_at is not None and (self._oldest_pending_at is None or oldest_pending_at < self._oldest_pending_at):
+                self._oldest_pending_at = oldest_pending_at
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending_ads"] = len(self._pending)
+            # Flush lag: how long the oldest unflushed increment has been waiting
+            stats["flush_lag_seconds"] = round(time.monotonic() - self._oldest_pending_at, 3) if self._oldest_pending_at else 0.0
+        return stats
+
+    def _background_flush(self):
+        try:
+            with self._app.app_context():
+                self.flush()
+        except Exception:
+            self._app.logger.error("Error flushing ad counters", exc_info=True)
+
+    def shutdown(self):
+        """Stops the flush thread and writes what is still pending."""
+        _live_buffers.discard(self)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_seconds + 1)
+        if self._app is not None:
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception:
+                self._app.logger.error("Error flushing ad counters at shutdown", exc_info=True)
+
+def _flush_loop(buffer_ref, stop, flush_seconds):
+    while not stop.wait(flush_seconds):
+        buffer = buffer_ref()
+        if buffer is None:
+            return
+        buffer._background_flush()
+        del buffer # Not held while waiting, or the app could never be collected
+
+@atexit.register
+def _shutdown_live_buffers():
+    for buffer in list(_live_buffers):
+        buffer.shutdown()
+
+def init_ad_counters(app) -> AdCounterBuffer:
+    buffer = AdCounterBuffer(
+        flush_seconds=app.config.get("AD_COUNTER_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS),
+        max_pending_ads=app.config.get("AD_COUNTER_MAX_PENDING_ADS", DEFAULT_MAX_PENDING_ADS)
+    )
+    buffer.init_app(app)
+    return buffer
+
+def get_ad_counters() -> AdCounterBuffer:
+    return current_app.extensions["ad_counters"]
@@ -0,0 +1,153 @@
+# src/services/ad_index.py
+import random
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from src.models import Advertisement
+
+DEFAULT_RELOAD_SECONDS = 300 # Full reload from the DB, catches changes made by other worker processes
+MAX_ADS_PER_REQUEST = 5
+COUNTER_FIELDS = ("views", "clicks") # Written behind by src/services/ad_counters.py: a cached copy would be stale
+
+def public_payload(ad) -> dict:
+    """The ad as served on public placements: to_dict() without the view/click counters."""
+    payload = ad.to_dict()
+    for field in COUNTER_FIELDS:
+        del payload[field]
+    return payload
+
+# --- Índice em memória dos anúncios ativos por placement_area ---
+
+class _PlacementIndex:
+    """Scheduled ads of one placement, kept sorted by start date, plus the live set for the current window."""
+
+    def __init__(self):
+        self.entries = [] # (start_date, end_date, ad_id, payload)
+        self.live = [] # payloads live between the last two schedule boundaries
+        self.next_start = None # earliest start_date still in the future
+        self.next_end = None # earliest end_date of a live ad
+
+    def add(self, start_date, end_date, ad_id, payload):
+        self.entries.append((start_date, end_date, ad_id, payload))
+        self.entries.sort(key=lambda entry: (entry[0] or datetime.min, entry[2]))
+        self.next_start = self.next_end = datetime.min # Force a refresh on the next read
+
+    def remove(self, ad_id):
+        self.entries = [entry for entry in self.entries if entry[2] != ad_id]
+        self.next_start = self.next_end = datetime.min
+
+    def live_at(self, now):
+        """Returns the ads live at `now`, recomputing the live set only when a schedule boundary has passed."""
+        boundary_passed = (self.next_start is not None and now >= self.next_start) or \
+                          (self.next_end is not None and now > self.next_end)
+        if boundary_passed:
+            live, next_start, next_end = [], None, None
+            for start_date, end_date, _, payload in self.entries:
+                if start_date is not None and start_date > now:
+                    # Entries are sorted by start date: every remaining ad starts later
+                    next_start = start_date
+                    break
+                if end_date is None or end_date >= now:
+                    live.append(payload)
+                    if end_date is not None and (next_end is None or end_date < next_end):
+                        next_end = end_date
+            self.live, self.next_start, self.next_end = live, next_start, next_end
+        return self.live
+
+class AdIndex:
+    """In-process index of active advertisements, serving public placements without touching the DB.
+
+    Loaded lazily on first use, updated incrementally by the admin routes through
+    upsert()/remove() and fully reloaded every `reload_seconds` to pick up changes
+    made by other processes. A reload queries the DB without holding the index lock:
+    requests keep being served from the previous placements until the new ones are
+    swapped in.
+    """
+
+    def __init__(self, reload_seconds=DEFAULT_RELOAD_SECONDS):
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock() # One reload at a time
+        self._placements = {} # placement_area -> _PlacementIndex
+        self._placement_of = {} # ad_id -> placement_area
+        self._loaded_at = None
+        self._changes = None # (ad_id, entry) applied during a reload, replayed on the reloaded data
+
+    def is_fresh(self):
+        """True when sample() can answer from memory, without a (re)load from the DB."""
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.reload_seconds
+
+    def _ensure_loaded(self):
+        if self.is_fresh():
+            return
+        # The first load is waited for; later ones run in one thread while the others serve the old data
+        if not self._reload_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self.is_fresh():
+                return # Reloaded by another thread while this one waited
+            with self._lock:
+                self._changes = []
+            ads = Advertisement.query.options(joinedload(Advertisement.creator)).filter(Advertisement.is_active == True).all()
+            placements, placement_of = {}, {}
+            for ad in ads:
+                _apply(placements, placement_of, ad.id, (ad.placement_area, ad.start_date, ad.end_date, public_payload(ad)))
+            with self._lock:
+                for ad_id, entry in self._changes: # Committed while the query ran: it may or may not have seen them
+                    _apply(placements, placement_of, ad_id, entry)
+                self._placements, self._placement_of = placements, placement_of
+                self._loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._changes = None
+            self._reload_lock.release()
+
+    def sample(self, placement_area, k=MAX_ADS_PER_REQUEST, now=None):
+        """Returns up to `k` random serialized ads live now for a placement."""
+        now = now or datetime.utcnow()
+        self._ensure_loaded()
+        with self._lock:
+            placement = self._placements.get(placement_area)
+            live = placement.live_at(now) if placement else []
+            return random.sample(live, min(k, len(live)))
+
+    def upsert(self, ad):
+        """Reflects a created or updated ad in the index (call after the commit)."""
+        entry = (ad.placement_area, ad.start_date, ad.end_date, public_payload(ad)) if ad.is_active else None
+        self._change(ad.id, entry)
+
+    def remove(self, ad_id):
+        """Drops a deleted ad from the index (call after the commit)."""
+        self._change(ad_id, None)
+
+    def _change(self, ad_id, entry):
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((ad_id, entry))
+            if self._loaded_at is not None: # Not loaded yet: the first load reads the ad from the DB
+                _apply(self._placements, self._placement_of, ad_id, entry)
+
+    def clear(self):
+        with self._lock:
+            self._placements, self._placement_of, self._loaded_at = {}, {}, None
+
+def _apply(placements, placement_of, ad_id, entry):
+    """Removes the ad from the maps, then adds `entry` (placement_area, start, end, payload) unless None."""
+    placement_area = placement_of.pop(ad_id, None)
+    if placement_area is not None:
+        placements[placement_area].remove(ad_id)
+    if entry is not None:
+        placement_area, start_date, end_date, payload = entry
+        placements.setdefault(placement_area, _PlacementIndex()).add(start_date, end_date, ad_id, payload)
+        placement_of[ad_id] = placement_area
+
+def get_ad_index() -> AdIndex:
+    """Returns the ad index of the current app, creating it on first use."""
+    index = current_app.extensions.get("ad_index")
+    if index is None:
+        index = current_app.extensions.setdefault(
+            "ad_index", AdIndex(current_app.config.get("AD_INDEX_RELOAD_SECONDS", DEFAULT_RELOAD_SECONDS))
+        )
+    return index
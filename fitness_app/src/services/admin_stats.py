@@ -0,0 +1,93 @@
+# src/services/admin_stats.py
+import threading
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import case, func, select
+from src.extensions import db
+from src.models import Advertisement, DietPlan, Product, ProductCategory, User, UserProfile, WorkoutPlan
+
+DEFAULT_TTL_SECONDS = 60
+
+# --- Estatísticas por utilizador ---
+
+def user_plan_counts(user_id):
+    """Diet/workout plan counts of one user, as a single SELECT of two COUNT subqueries."""
+    row = db.session.execute(select(
+        select(func.count(DietPlan.id)).where(DietPlan.user_id == user_id).scalar_subquery().label("diet_plans_count"),
+        select(func.count(WorkoutPlan.id)).where(WorkoutPlan.user_id == user_id).scalar_subquery().label("workout_plans_count")
+    )).one()
+    return {"diet_plans_count": row.diet_plans_count, "workout_plans_count": row.workout_plans_count}
+
+# --- Estatísticas globais (rollup com TTL) ---
+
+def _distribution(column):
+    rows = db.session.execute(select(column, func.count()).group_by(column).order_by(column)).all()
+    return {(value if value is not None else "unknown"): count for value, count in rows}
+
+def compute_global_stats():
+    """Computes the dashboard rollup with a fixed number of aggregate queries, whatever the data size."""
+    totals = db.session.execute(select(
+        select(func.count(User.id)).scalar_subquery().label("users"),
+        select(func.count(User.id)).where(User.is_admin.is_(True)).scalar_subquery().label("admins"),
+        select(func.count(UserProfile.id)).scalar_subquery().label("profiles"),
+        select(func.count(DietPlan.id)).where(DietPlan.is_active.is_(True)).scalar_subquery().label("active_diet_plans"),
+        select(func.count(WorkoutPlan.id)).where(WorkoutPlan.is_active.is_(True)).scalar_subquery().label("active_workout_plans")
+    )).one()
+
+    category_rows = db.session.execute(
+        select(ProductCategory.id, ProductCategory.name, func.count(Product.id))
+        .outerjoin(Product, Product.category_id == ProductCategory.id)
+        .group_by(ProductCategory.id)
+        .order_by(ProductCategory.name)
+    ).all()
+
+    # Ad counters are written behind (see ad_counters), so these lag by at most one flush interval
+    ads = db.session.execute(select(
+        func.count(Advertisement.id),
+        func.coalesce(func.sum(case((Advertisement.is_active.is_(True), 1), else_=0)), 0),
+        func.coalesce(func.sum(Advertisement.views), 0),
+        func.coalesce(func.sum(Advertisement.clicks), 0)
+    )).one()
+    ads_total, ads_active, views, clicks = ads
+
+    return {
+        "users": {"total": totals.users, "admins": totals.admins, "with_profile": totals.profiles},
+        "active_plans": {"diet": totals.active_diet_plans, "workout": totals.active_workout_plans},
+        "goal_distribution": _distribution(UserProfile.goal),
+        "activity_level_distribution": _distribution(UserProfile.activity_level),
+        "products_per_category": [
+            {"category_id": category_id, "category_name": name, "product_count": count}
+            for category_id, name, count in category_rows
+        ],
+        "advertisements": {
+            "total": ads_total, "active": ads_active, "views": views, "clicks": clicks,
+            "ctr": round(clicks / views, 4) if views else 0.0
+        },
+        "generated_at": datetime.now(timezone.utc).isoformat()
+    }
+
+class StatsRollup:
+    """Keeps the last global stats for ttl_seconds; concurrent misses recompute only once."""
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._value = None
+        self._computed_at = 0.0
+
+    def get(self, refresh=False):
+        with self._lock:
+            if refresh or self._value is None or time.monotonic() - self._computed_at > self.ttl_seconds:
+                self._value = compute_global_stats()
+                self._computed_at = time.monotonic()
+            return self._value
+
+def get_global_stats(refresh=False):
+    """Returns the cached global stats rollup of the current app (recomputed after ADMIN_STATS_TTL_SECONDS)."""
+    rollup = current_app.extensions.get("admin_stats")
+    if rollup is None:
+        rollup = current_app.extensions.setdefault("admin_stats", StatsRollup(
+            ttl_seconds=current_app.config.get("ADMIN_STATS_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+        ))
+    return rollup.get(refresh=refresh)
@@ -0,0 +1,151 @@
+# src/services/identity.py
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import current_app, g, session
+from sqlalchemy import select, update
+from src.extensions import db
+from src.models.user import User, RoleVersionStamp
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_STAMP_CHECK_SECONDS = 2 # Longest a role change committed by another process can go unseen
+STAMP_ID = 1
+
+Identity = namedtuple("Identity", ["user_id", "username", "is_admin"])
+
+# --- Cache de identidade/papel, invalidado pelo carimbo de versão partilhado (role_version_stamp) ---
+
+class IdentityCache:
+    """Bounded LRU of user_id -> Identity with a TTL.
+
+    A hit costs no query. Role changes are picked up through the shared role version stamp:
+    the process that makes the change drops its own entry at once, and every process re-reads
+    the stamp at most every `stamp_check_seconds`, clearing the whole cache when it moved.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 stamp_check_seconds=DEFAULT_STAMP_CHECK_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stamp_check_seconds = stamp_check_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # user_id -> (identity, stored_at)
+        self._generation = 0 # Bumped by clear(), so a load that raced it is not stored
+        self._stamp = None
+        self._stamp_checked_at = None
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "clears": 0}
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+                del self._entries[user_id]
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def put(self, identity, generation):
+        """Stores `identity`, loaded when the cache was at `generation`; dropped if the cache was cleared since."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[identity.user_id] = (identity, time.monotonic())
+            self._entries.move_to_end(identity.user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drops the user's entry from this process (the stamp check covers the others)."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._stats["clears"] += 1
+
+    def check_stamp(self, read_stamp):
+        """Clears the cache if the shared stamp moved. `read_stamp()` runs at most every stamp_check_seconds."""
+        now = time.monotonic()
+        with self._lock:
+            if self._stamp_checked_at is not None and now - self._stamp_checked_at < self.stamp_check_seconds:
+                return
+            self._stamp_checked_at = now # Claimed: concurrent requests keep using the cache meanwhile
+            last_stamp = self._stamp
+        stamp = read_stamp()
+        if stamp != last_stamp:
+            if last_stamp is not None:
+                self.clear()
+            with self._lock:
+                self._stamp = stamp
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(entries=len(self._entries), max_entries=self.max_entries, ttl_seconds=self.ttl_seconds,
+                         stamp_check_seconds=self.stamp_check_seconds)
+        return stats
+
+def get_identity_cache() -> IdentityCache:
+    """Returns the identity cache of the current app, creating it on first use."""
+    cache = current_app.extensions.get("identity_cache")
+    if cache is None:
+        config = current_app.config
+        cache = current_app.extensions.setdefault("identity_cache", IdentityCache(
+            max_entries=config.get("IDENTITY_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+            ttl_seconds=config.get("IDENTITY_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+            stamp_check_seconds=config.get("IDENTITY_STAMP_CHECK_SECONDS", DEFAULT_STAMP_CHECK_SECONDS)
+        ))
+    return cache
+
+# Always from the primary: a lagging replica could hand back a role that was just revoked
+def _role_stamp():
+    return db.session.execute(
+        select(RoleVersionStamp.version).where(RoleVersionStamp.id == STAMP_ID), bind_arguments={"bind": db.engine}
+    ).scalar() or 0
+
+def _load_identity(user_id):
+    row = db.session.execute(
+        select(User.id, User.username, User.is_admin).where(User.id == user_id), bind_arguments={"bind": db.engine}
+    ).first()
+    return Identity(row.id, row.username, bool(row.is_admin)) if row else None
+
+def current_identity():
+    """Resolves the logged-in user once per request; None when not logged in or the user no longer exists."""
+    if "identity" in g:
+        return g.identity
+    identity = None
+    user_id = session.get("user_id")
+    if user_id is not None:
+        cache = get_identity_cache()
+        cache.check_stamp(_role_stamp)
+        identity = cache.get(user_id)
+        if identity is None:
+            generation = cache.generation
+            identity = _load_identity(user_id)
+            if identity is not None:
+                cache.put(identity, generation)
+    g.identity = identity
+    return identity
+
+def bump_role_version():
+    """Moves the shared stamp so every process drops its cached identities; commit it with the role change."""
+    stamped = db.session.execute(
+        update(RoleVersionStamp).where(RoleVersionStamp.id == STAMP_ID).values(version=RoleVersionStamp.version + 1)
+    ).rowcount
+    if not stamped:
+        db.session.add(RoleVersionStamp(id=STAMP_ID, version=1))
+
+def invalidate_identity(user_id):
+    get_identity_cache().invalidate(user_id)
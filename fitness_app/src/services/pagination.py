@@ -0,0 +1,116 @@
+# src/services/pagination.py
+import base64
+import json
+from flask import request
+from sqlalchemy import String, literal, tuple_, type_coerce
+
+MAX_PER_PAGE = 100
+
+# --- Paginação por cursor (keyset) sobre (created_at, id), do mais recente para o mais antigo ---
+
+def wants_cursor_pagination() -> bool:
+    """Cursor mode is opt-in: ?pagination=cursor, or any request that carries a cursor."""
+    return request.args.get("pagination") == "cursor" or "cursor" in request.args
+
+def include_total_requested() -> bool:
+    """The total count costs an extra COUNT(*): cursor mode only runs it on ?include_total=1."""
+    return request.args.get("include_total", "").lower() in ("1", "true")
+
+def clamp_per_page(per_page: int, maximum: int = MAX_PER_PAGE) -> int:
+    """?per_page bounded to 1..maximum: SQLite reads a negative LIMIT as no limit at all."""
+    return min(max(per_page, 1), maximum)
+
+def encode_cursor(direction: str, created_at, item_id: int) -> str:
+    payload = json.dumps([direction, None if created_at is None else str(created_at), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Returns (direction, created_at, id). Raises ValueError for a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if direction not in ("n", "p") or not isinstance(item_id, int) or not isinstance(created_at, (str, type(None))):
+        raise ValueError("Invalid cursor.")
+    return direction, created_at, item_id
+
+def _read_run(paged, model, sort_key, undated: bool, boundary, descending: bool, limit: int) -> list:
+    """Up to `limit` rows of one run of the order, after `boundary` (created_at, id) if given:
+    the rows with a created_at, or the undated ones (created_at NULL), which come last.
+    Each run is a plain range over the (created_at, id) indexes."""
+    if undated:
+        run = paged.filter(model.created_at.is_(None))
+        if boundary:
+            run = run.filter(model.id < boundary[1] if descending else model.id > boundary[1])
+        order = [model.id.desc() if descending else model.id.asc()]
+    else:
+        run = paged.filter(model.created_at.isnot(None))
+        if boundary:
+            key = tuple_(literal(boundary[0], String), literal(boundary[1]))
+            run = run.filter(tuple_(sort_key, model.id) < key if descending else tuple_(sort_key, model.id) > key)
+        order = [sort_key.desc(), model.id.desc()] if descending else [sort_key.asc(), model.id.asc()]
+    return run.order_by(*order).limit(limit).all()
+
+def keyset_paginate(query, model, per_page: int, cursor: str = None, include_total: bool = False, rows: bool = False) -> dict:
+    """Returns one page of `query` ordered by created_at DESC, id DESC, without OFFSET.
+
+    The result holds "items", opaque "next_cursor"/"prev_cursor" (None at either end)
+    and, only when include_total is set, "total" (an extra COUNT). The created_at
+    value is compared as stored, so cursors round-trip exactly whatever the stored
+    timestamp format. Rows without a created_at come last, as in ORDER BY created_at
+    DESC. With rows=True "items" are the result rows themselves, for column-projected
+    queries (see src/serializers.py).
+    """
+    if per_page < 1:
+        raise ValueError("per_page must be at least 1.")
+    sort_key = type_coerce(model.created_at, String)
+    direction, boundary = "n", None
+    if cursor:
+        direction, created_at, item_id = decode_cursor(cursor)
+        boundary = (created_at, item_id)
+
+    total = query.order_by(None).count() if include_total else None
+
+    # Dated rows then undated ones going forward, the reverse going back; the run of the
+    # cursor's own row resumes after it and the next run (if reached) starts at its beginning.
+    paged = query.add_columns(sort_key.label("cursor_created_at"), model.id.label("cursor_id"))
+    runs = [False, True] if direction == "n" else [True, False]
+    if boundary:
+        runs = runs[runs.index(boundary[0] is None):]
+    page_rows = []
+    for undated in runs:
+        run_boundary = boundary if boundary and (boundary[0] is None) == undated else None
+        page_rows += _read_run(paged, model, sort_key, undated, run_boundary, direction == "n", per_page + 1 - len(page_rows))
+        if len(page_rows) > per_page:
+            break
+
+    has_more = len(page_rows) > per_page
+    page_rows = page_rows[:per_page]
+    if direction == "p":
+        page_rows.reverse()
+
+    items = page_rows if rows else [row[0] for row in page_rows]
+    first, last = (page_rows[0], page_rows[-1]) if page_rows else (None, None)
+    if direction == "n":
+        has_next, has_prev = has_more, cursor is not None
+    else:
+        has_next, has_prev = True, has_more
+    return {
+        "items": items,
+        "next_cursor": encode_cursor("n", last.cursor_created_at, last.cursor_id) if has_next and last else None,
+        "prev_cursor": encode_cursor("p", first.cursor_created_at, first.cursor_id) if has_prev and first else None,
+        "total": total,
+    }
+
+def cursor_page_response(page: dict, items_key: str, total_key: str, items_data: list, per_page: int) -> dict:
+    """Builds the JSON body of a cursor-paginated listing."""
+    data = {
+        items_key: items_data,
+        "per_page": per_page,
+        "next_cursor": page["next_cursor"],
+        "prev_cursor": page["prev_cursor"],
+    }
+    if page["total"] is not None:
+        data[total_key] = page["total"]
+    return data
@@ -0,0 +1,96 @@
+# src/services/password_hashing.py
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_HASH_METHOD = "scrypt"
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32 # Hash/verify jobs queued or running before new ones are refused
+DEFAULT_TIMEOUT_SECONDS = 10
+
+class HashingBusyError(Exception):
+    """Raised when the hashing pool queue is full or a job times out; the route answers 503."""
+
+# --- Hashing de passwords num pool de processos dedicado e limitado ---
+
+class PasswordHasher:
+    """Runs password hash/verify in a bounded process pool so they don't pin request workers.
+
+    With workers=0 the work runs inline (useful in development and tests).
+    """
+
+    def __init__(self, method=DEFAULT_HASH_METHOD, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # Not fork: the server process has request and flush threads running, and a forked
+                # worker would inherit whatever locks they held at that moment.
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(start_method))
+            return self._pool
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusyError("Password hashing queue is full.")
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the job finishes, not until the caller stops waiting: a timed-out
+        # job keeps its worker busy, and must keep counting against max_pending.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel() # Still queued: drop it
+            raise HashingBusyError("Password hashing timed out.")
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """True when the hash was made with parameters other than the configured ones."""
+        return pwhash.split("$", 1)[0] != method_parameters(self.method)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+@lru_cache(maxsize=8)
+def method_parameters(method: str) -> str:
+    """Expands a method such as "scrypt" to the full parameter string stored in hashes ("scrypt:32768:8:1")."""
+    return generate_password_hash("", method).split("$", 1)[0]
+
+def get_password_hasher() -> PasswordHasher:
+    """Returns the password hasher of the current app, creating it on first use."""
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        config = current_app.config
+        hasher = current_app.extensions.setdefault("password_hasher", PasswordHasher(
+            method=config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD),
+            workers=config.get("PASSWORD_HASH_WORKERS", DEFAULT_WORKERS),
+            max_pending=config.get("PASSWORD_HASH_MAX_PENDING", DEFAULT_MAX_PENDING),
+            timeout=config.get("PASSWORD_HASH_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)
+        ))
+        atexit.register(hasher.shutdown)
+    return hasher
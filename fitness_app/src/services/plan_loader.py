@@ -0,0 +1,56 @@
+# src/services/plan_loader.py
+from sqlalchemy.orm import joinedload, selectinload
+from src.models import DietPlan, WorkoutPlan, WorkoutPlanDay
+from src.services.plan_templates import template_content
+
+# --- Carregamento do grafo completo de um plano com um número fixo de queries ---
+
+def load_active_workout_plan(user_id: int):
+    """Loads the active workout plan with its template, days and exercises.
+
+    Issues at most three SELECTs (plan + template, days, exercises), regardless of
+    how many days the plan has.
+    """
+    return WorkoutPlan.query.filter_by(user_id=user_id, is_active=True).options(
+        joinedload(WorkoutPlan.template),
+        selectinload(WorkoutPlan.days).selectinload(WorkoutPlanDay.exercises)
+    ).first()
+
+def load_active_diet_plan(user_id: int):
+    """Loads the active diet plan with its template and meals in two SELECTs (plan + template, meals)."""
+    return DietPlan.query.filter_by(user_id=user_id, is_active=True).options(
+        joinedload(DietPlan.template),
+        selectinload(DietPlan.meals)
+    ).first()
+
+# --- Conteúdo do plano: template partilhado ou linhas próprias (planos antigos) ---
+
+def workout_plan_days(workout_plan: WorkoutPlan) -> list[dict]:
+    if workout_plan.template is not None:
+        return template_content(workout_plan.template)
+    return [{
+        "day_of_week": day.day_of_week,
+        "focus": day.focus,
+        "exercises": [{
+            "exercise_name": ex.exercise_name,
+            "sets": ex.sets,
+            "reps": ex.reps
+        } for ex in day.exercises]
+    } for day in workout_plan.days]
+
+def diet_meals_by_day(diet_plan: DietPlan) -> dict:
+    if diet_plan.template is not None:
+        daily_meals = template_content(diet_plan.template)
+        return {day: daily_meals for day in range(1, 8)} # Same meals every day of the week
+    meals_by_day = {day: [] for day in range(1, 8)}
+    for meal in diet_plan.meals: # Already ordered by day_of_week, suggested_time
+        meals_by_day[meal.day_of_week].append({
+            "meal_name": meal.meal_name,
+            "description": meal.description,
+            "calories": meal.calories,
+            "protein_g": meal.protein_g,
+            "carbs_g": meal.carbs_g,
+            "fat_g": meal.fat_g,
+            "suggested_time": meal.suggested_time
+        })
+    return meals_by_day
@@ -0,0 +1,53 @@
+# src/services/plan_persistence.py
+from datetime import date, timedelta
+from sqlalchemy import insert
+from src.models import DietPlan, WorkoutPlan
+from src.extensions import db
+
+PLAN_DURATION_DAYS = 30
+
+# --- Escrita de um plano completo com um número constante de statements ---
+
+def persist_generated_plans(user_id: int, macros: dict, diet_template_id: int, workout_template_id: int,
+                            days_per_week: int, workout_description: str) -> tuple[int, int]:
+    """Writes a full diet and workout plan for a user and returns (diet_plan_id, workout_plan_id).
+
+    Meals, days and exercises live in shared plan templates (see plan_templates), so a
+    plan costs 4 statements: 2 UPDATEs to deactivate the old plans and 2 single-row
+    INSERTs. The caller is responsible for committing.
+    """
+    start_date = date.today()
+    end_date = start_date + timedelta(days=PLAN_DURATION_DAYS)
+    session = db.session
+
+    # Deactivate existing active plans
+    DietPlan.query.filter_by(user_id=user_id, is_active=True).update({"is_active": False}, synchronize_session=False)
+    WorkoutPlan.query.filter_by(user_id=user_id, is_active=True).update({"is_active": False}, synchronize_session=False)
+
+    diet_plan_id = session.execute(
+        insert(DietPlan).values(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            daily_calories=macros["target_calories"],
+            daily_protein_g=macros["protein_g"],
+            daily_carbs_g=macros["carbs_g"],
+            daily_fat_g=macros["fat_g"],
+            template_id=diet_template_id,
+            is_active=True
+        ).returning(DietPlan.id)
+    ).scalar_one()
+
+    workout_plan_id = session.execute(
+        insert(WorkoutPlan).values(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            days_per_week=days_per_week,
+            description=workout_description,
+            template_id=workout_template_id,
+            is_active=True
+        ).returning(WorkoutPlan.id)
+    ).scalar_one()
+
+    return diet_plan_id, workout_plan_id
@@ -1,5 +1,30 @@
 # src/services/plan_service.py
 import random
+import numpy as np
+
+# --- Tabelas partilhadas pelas funções escalares e pelo motor em lote ---
+
+BMR_GENDER_OFFSETS = {
+    "masculino": 5,
+    "feminino": -161,
+}
+ACTIVITY_MULTIPLIERS = {
+    "sedentario": 1.2,
+    "leve": 1.375,
+    "moderado": 1.55,
+    "intenso": 1.725,
+}
+GOAL_CALORIE_ADJUSTMENTS = {
+    "emagrecer": -500,
+    "manter": 0,
+    "ganhar_massa": 300,
+}
+GOAL_MACRO_SPLITS = { # (protein, carbs, fat) as a fraction of total calories
+    "emagrecer": (0.40, 0.30, 0.30),
+    "manter": (0.30, 0.40, 0.30),
+    "ganhar_massa": (0.30, 0.50, 0.20),
+}
+MIN_DAILY_CALORIES = 1200
 
 # --- Funções de Cálculo de BMR, TDEE, Calorias e Macros (sem alterações) ---
 
@@ -10,13 +35,10 @@ def calculate_bmr(gender: str, weight_kg: float, height_cm: float, age: int) ->
     if weight_kg <= 0 or height_cm <= 0 or age <= 0:
         raise ValueError("Weight, height, and age must be positive values for BMR calculation.")
 
-    if gender.lower() == "masculino":
-        bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) + 5
-    elif gender.lower() == "feminino":
-        bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age) - 161
-    else:
+    gender_offset = BMR_GENDER_OFFSETS.get(gender.lower())
+    if gender_offset is None:
         raise ValueError("Gender must be 'masculino' or 'feminino' for BMR calculation.")
-    return bmr
+    return (10 * weight_kg) + (6.25 * height_cm) - (5 * age) + gender_offset
 
 def get_activity_multiplier(activity_level: str) -> float:
     """Returns activity multiplier based on activity level."""
@@ -24,15 +46,9 @@ def get_activity_multiplier(activity_level: str) -> float:
         raise ValueError("Activity level must be provided.")
     
     activity_level = activity_level.lower()
-    multipliers = {
-        "sedentario": 1.2,
-        "leve": 1.375,
-        "moderado": 1.55,
-        "intenso": 1.725,
-    }
-    if activity_level not in multipliers:
-        raise ValueError(f"Invalid activity level: {activity_level}. Choose from {list(multipliers.keys())}")
-    return multipliers[activity_level]
+    if activity_level not in ACTIVITY_MULTIPLIERS:
+        raise ValueError(f"Invalid activity level: {activity_level}. Choose from {list(ACTIVITY_MULTIPLIERS.keys())}")
+    return ACTIVITY_MULTIPLIERS[activity_level]
 
 def calculate_tdee(bmr: float, activity_multiplier: float) -> float:
     """Calculates Total Daily Energy Expenditure (TDEE)."""
@@ -48,18 +64,11 @@ def adjust_calories_for_goal(tdee: float, goal: str) -> float:
         raise ValueError("Goal must be provided.")
 
     goal = goal.lower()
-    calorie_adjustment = 0
-    if goal == "emagrecer":
-        calorie_adjustment = -500
-    elif goal == "ganhar_massa":
-        calorie_adjustment = 300
-    elif goal == "manter":
-        calorie_adjustment = 0
-    else:
+    if goal not in GOAL_CALORIE_ADJUSTMENTS:
         raise ValueError(f"Invalid goal: {goal}. Choose from 'emagrecer', 'manter', 'ganhar_massa'.")
     
-    adjusted_calories = tdee + calorie_adjustment
-    return max(adjusted_calories, 1200)
+    adjusted_calories = tdee + GOAL_CALORIE_ADJUSTMENTS[goal]
+    return max(adjusted_calories, MIN_DAILY_CALORIES)
 
 def calculate_macronutrients(total_calories: float, goal: str) -> dict:
     """Calculates macronutrient split (protein, carbs, fat) in grams."""
@@ -69,20 +78,9 @@ def calculate_macronutrients(total_calories: float, goal: str) -> dict:
         raise ValueError("Goal must be provided for macronutrient calculation.")
 
     goal = goal.lower()
-    if goal == "emagrecer":
-        protein_percentage = 0.40
-        carb_percentage = 0.30
-        fat_percentage = 0.30
-    elif goal == "ganhar_massa":
-        protein_percentage = 0.30
-        carb_percentage = 0.50
-        fat_percentage = 0.20
-    elif goal == "manter":
-        protein_percentage = 0.30
-        carb_percentage = 0.40
-        fat_percentage = 0.30
-    else:
+    if goal not in GOAL_MACRO_SPLITS:
         raise ValueError(f"Invalid goal for macronutrient calculation: {goal}")
+    protein_percentage, carb_percentage, fat_percentage = GOAL_MACRO_SPLITS[goal]
 
     protein_calories = total_calories * protein_percentage
     carb_calories = total_calories * carb_percentage
@@ -99,6 +97,58 @@ def calculate_macronutrients(total_calories: float, goal: str) -> dict:
         "target_calories": round(total_calories)
     }
 
+# --- Motor em lote: os mesmos cálculos para uma população inteira numa só passagem ---
+
+def _lookup_column(values, table: dict) -> np.ndarray:
+    """Maps a column of strings through `table` (case-insensitive); unknown or missing values become NaN.
+
+    Only the distinct values are lowered and looked up, not every row.
+    """
+    values = np.asarray([value or "" for value in values], dtype=str)
+    if values.size == 0:
+        return np.empty(0, dtype=float)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    mapped = np.array([table.get(value.lower(), np.nan) for value in uniques], dtype=float)
+    return mapped[inverse]
+
+def calculate_targets_batch(genders, weights_kg, heights_cm, ages, activity_levels, goals) -> dict:
+    """Computes BMR, TDEE, target calories and macros for columns of profiles in one vectorized pass.
+
+    Takes equal-length sequences or arrays (one entry per profile) and returns a dict of
+    NumPy arrays: "valid", "bmr", "tdee", "target_calories", "protein_g", "carbs_g" and
+    "fat_g". For rows where "valid" is True the values are identical to the scalar
+    functions above; rows the scalar functions would reject are marked invalid.
+    """
+    weights = np.asarray([np.nan if value is None else value for value in weights_kg], dtype=float)
+    heights = np.asarray([np.nan if value is None else value for value in heights_cm], dtype=float)
+    ages = np.asarray([np.nan if value is None else value for value in ages], dtype=float)
+    gender_offsets = _lookup_column(genders, BMR_GENDER_OFFSETS)
+    multipliers = _lookup_column(activity_levels, ACTIVITY_MULTIPLIERS)
+    adjustments = _lookup_column(goals, GOAL_CALORIE_ADJUSTMENTS)
+    protein_split = _lookup_column(goals, {goal: split[0] for goal, split in GOAL_MACRO_SPLITS.items()})
+    carb_split = _lookup_column(goals, {goal: split[1] for goal, split in GOAL_MACRO_SPLITS.items()})
+    fat_split = _lookup_column(goals, {goal: split[2] for goal, split in GOAL_MACRO_SPLITS.items()})
+
+    with np.errstate(invalid="ignore"):
+        bmr = (10 * weights) + (6.25 * heights) - (5 * ages) + gender_offsets
+        tdee = bmr * multipliers
+        total_calories = np.maximum(tdee + adjustments, MIN_DAILY_CALORIES)
+        valid = (
+            (weights > 0) & (heights > 0) & (ages > 0) & (ages == np.floor(ages))
+            & ~np.isnan(gender_offsets) & ~np.isnan(multipliers) & ~np.isnan(adjustments)
+            & (bmr > 0) & (tdee > 0)
+        )
+        # np.rint rounds half to even, like the built-in round() used by the scalar functions
+        return {
+            "valid": valid,
+            "bmr": bmr,
+            "tdee": tdee,
+            "target_calories": np.rint(total_calories),
+            "protein_g": np.rint(total_calories * protein_split / 4),
+            "carbs_g": np.rint(total_calories * carb_split / 4),
+            "fat_g": np.rint(total_calories * fat_split / 9),
+        }
+
 # --- Funções de Geração de Planos de Exemplo (sem alterações) ---
 
 def generate_sample_daily_meals(target_calories: int, macros: dict) -> list[dict]:
@@ -126,12 +176,13 @@ def generate_sample_daily_meals(target_calories: int, macros: dict) -> list[dict
         })
     return daily_meals_data
 
-def generate_sample_workout_plan(activity_level: str, goal: str, days_per_week: int = 4) -> list[dict]:
+def generate_sample_workout_plan(activity_level: str, goal: str, days_per_week: int = 4, rng: random.Random = None) -> list[dict]:
     if days_per_week not in [4, 5]: days_per_week = 4
+    rng = rng or random # A seeded Random makes the plan reproducible (used by the plan templates)
     workout_days = []
     focus_options_strength = ["Peito e Tríceps", "Costas e Bíceps", "Pernas e Ombros", "Corpo Inteiro", "Descanso Ativo/Cardio"]
     focus_options_general = ["Treino de Força A", "Treino de Força B", "Treino de Força C", "Cardio e Core", "Descanso Ativo"]
-    selected_focus_options = random.sample(focus_options_strength if goal == "ganhar_massa" else focus_options_general, days_per_week)
+    selected_focus_options = rng.sample(focus_options_strength if goal == "ganhar_massa" else focus_options_general, days_per_week)
     training_schedule = [1, 2, 4, 5] if days_per_week == 4 else [1, 2, 3, 5, 6]
     for i in range(days_per_week):
         day_focus = selected_focus_options[i]
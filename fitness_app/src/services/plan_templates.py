@@ -0,0 +1,126 @@
+# src/services/plan_templates.py
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from src.models import PlanTemplate
+from src.extensions import db
+from src.services import plan_service
+
+# Distinct workout layouts per (activity_level, goal, days_per_week); a user gets one at random,
+# so plans keep some variety while the number of stored templates stays bounded.
+WORKOUT_TEMPLATE_VARIANTS = 5
+RENDER_CACHE_SIZE = 2048
+
+# --- Renderização (pura, em cache) ---
+
+def _canonical(kind: str, content) -> tuple[str, str]:
+    """Returns (content_hash, canonical_json) for a template's content."""
+    content_json = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    content_hash = hashlib.sha256(f"{kind}:{content_json}".encode("utf-8")).hexdigest()
+    return content_hash, content_json
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render_diet_template(target_calories: int, protein_g: int, carbs_g: int, fat_g: int) -> tuple[str, str]:
+    """Renders the daily meals for the given (already rounded) targets. Returns (content_hash, content_json)."""
+    macros = {"protein_g": protein_g, "carbs_g": carbs_g, "fat_g": fat_g, "target_calories": target_calories}
+    return _canonical("diet", plan_service.generate_sample_daily_meals(target_calories, macros))
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def render_workout_template(activity_level: str, goal: str, days_per_week: int, variant: int) -> tuple[str, str]:
+    """Renders the workout days for the given inputs. Returns (content_hash, content_json)."""
+    rng = random.Random(f"{activity_level}|{goal}|{days_per_week}|{variant}")
+    return _canonical("workout", plan_service.generate_sample_workout_plan(activity_level, goal, days_per_week, rng=rng))
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def load_template_content(content_hash: str, content_json: str):
+    """Parses a stored template once per process. The result is shared: callers must not mutate it."""
+    return json.loads(content_json)
+
+# --- Armazenamento endereçado por conteúdo ---
+
+class TemplateIdCache:
+    """Bounded LRU of content_hash -> id of templates already known to be committed.
+
+    Kept per app (app.extensions), so each database gets its own ids. Templates deleted through
+    the ORM are dropped on flush (see below); a bulk DELETE or another process is not seen.
+    """
+
+    def __init__(self, max_entries=RENDER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, content_hash):
+        with self._lock:
+            template_id = self._entries.get(content_hash)
+            if template_id is not None:
+                self._entries.move_to_end(content_hash)
+            return template_id
+
+    def put(self, content_hash, template_id):
+        with self._lock:
+            self._entries[content_hash] = template_id
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, content_hash):
+        with self._lock:
+            self._entries.pop(content_hash, None)
+
+def get_template_id_cache() -> TemplateIdCache:
+    """Returns the template id cache of the current app, creating it on first use."""
+    cache = current_app.extensions.get("template_id_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault("template_id_cache", TemplateIdCache(
+            max_entries=current_app.config.get("TEMPLATE_ID_CACHE_SIZE", RENDER_CACHE_SIZE)
+        ))
+    return cache
+
+@event.listens_for(PlanTemplate, "after_delete")
+def _forget_deleted_template(mapper, connection, template):
+    # Dropped even if the transaction later rolls back: the next call just looks the id up again
+    get_template_id_cache().discard(template.content_hash)
+
+def get_or_create_template(kind: str, content_hash: str, content_json: str) -> int:
+    """Returns the id of the template with this content, inserting it if it does not exist yet."""
+    cache = get_template_id_cache()
+    template_id = cache.get(content_hash)
+    if template_id is not None:
+        return template_id
+
+    template = PlanTemplate.query.filter_by(content_hash=content_hash).first()
+    if template:
+        cache.put(content_hash, template.id)
+        return template.id
+
+    try:
+        with db.session.begin_nested():
+            template = PlanTemplate(kind=kind, content_hash=content_hash, content=content_json)
+            db.session.add(template)
+    except IntegrityError:
+        # Another request inserted the same content concurrently
+        template = PlanTemplate.query.filter_by(content_hash=content_hash).one()
+        cache.put(content_hash, template.id)
+    # A template inserted by this transaction is not cached until it is seen committed
+    return template.id
+
+def get_diet_template_id(macros: dict) -> int:
+    content_hash, content_json = render_diet_template(
+        macros["target_calories"], macros["protein_g"], macros["carbs_g"], macros["fat_g"]
+    )
+    return get_or_create_template("diet", content_hash, content_json)
+
+def get_workout_template_id(activity_level: str, goal: str, days_per_week: int) -> int:
+    variant = random.randrange(WORKOUT_TEMPLATE_VARIANTS)
+    content_hash, content_json = render_workout_template(activity_level, goal, days_per_week, variant)
+    return get_or_create_template("workout", content_hash, content_json)
+
+def template_content(template: PlanTemplate):
+    return load_template_content(template.content_hash, template.content)
@@ -0,0 +1,156 @@
+# src/services/product_search.py
+# Full-text product search over the products_fts index (SQLite FTS5, created by migration 3 in
+# src/migrations.py and kept in sync with products by triggers).
+import html
+import re
+import unicodedata
+from sqlalchemy import bindparam, text
+from src.extensions import db
+from src.models import Product
+from src.serializers import PRODUCT_LIST
+from src.services.pagination import decode_cursor, encode_cursor
+
+COLUMN_WEIGHTS = "10.0, 1.0, 5.0" # bm25() weights of name, description and sku: a hit in the name counts most
+SNIPPET_TOKENS = 16
+MAX_QUERY_TERMS = 8
+MAX_PREFIX_WORDS = 32 # A prefix covering more words is highlighted with the prefix query itself
+RANK_BATCH_FACTOR = 2 # Rows ranked per query, as a multiple of the page: room for inactive products
+_TERM_RE = re.compile(r"\w+")
+_MARK_START, _MARK_END = "\x02", "\x03" # Placeholders: the text is HTML-escaped before they become <mark> tags
+
+class SearchUnavailable(RuntimeError):
+    """The database has no full-text index (not SQLite)."""
+
+def query_terms(query: str) -> list[str]:
+    return _TERM_RE.findall(query)[:MAX_QUERY_TERMS]
+
+def match_expression(terms, last_words=None) -> str:
+    """FTS5 MATCH expression: every term must match and the last one as a prefix, so results follow
+    the user while typing ("whe" finds "whey"). Terms are quoted: FTS5 operators and punctuation in
+    the input are never interpreted. With `last_words` the prefix is spelled out as those words.
+    """
+    phrases = [f'"{term}"' for term in terms[:-1]]
+    if last_words:
+        phrases.append("(" + " OR ".join(f'"{word}"' for word in last_words) + ")")
+    else:
+        phrases.append(f'"{terms[-1]}"*')
+    return " AND ".join(phrases)
+
+def _fold(term: str) -> str:
+    """Lowercase without diacritics, as the index's unicode61 tokenizer stores words."""
+    return "".join(char for char in unicodedata.normalize("NFKD", term.lower()) if not unicodedata.combining(char))
+
+def _prefix_words(prefix: str):
+    """Indexed words starting with `prefix`, or None when there are more than MAX_PREFIX_WORDS."""
+    prefix = _fold(prefix)
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    words = db.session.execute(_PREFIX_WORDS_SQL, {"low": prefix, "high": upper, "limit": MAX_PREFIX_WORDS + 1}).scalars().all()
+    return words if 0 < len(words) <= MAX_PREFIX_WORDS else None
+
+def _marked(value):
+    """HTML-escapes FTS5 highlight output and turns its placeholders into <mark> tags."""
+    if value is None:
+        return None
+    return html.escape(value, quote=False).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+# (id, score) of matching products by rank, then id. bm25() is lower for better matches; the keyset
+# condition resumes after the last (score, id) returned, without OFFSET. Ranking runs on the index
+# alone: inactive products are dropped when the page's rows are loaded (see _active_products).
+_RANK_SQL = f"""
+    SELECT rowid AS id, bm25(products_fts, {COLUMN_WEIGHTS}) AS score
+    FROM products_fts WHERE products_fts MATCH :match {{after}}
+    ORDER BY score, rowid
+    LIMIT :limit
+"""
+_AFTER_SQL = f"AND (bm25(products_fts, {COLUMN_WEIGHTS}) > :score OR (bm25(products_fts, {COLUMN_WEIGHTS}) = :score AND rowid > :id))"
+# CROSS JOIN fixes the join order in SQLite: the MATCH drives the loop and each match looks up its
+# product by primary key. Left to itself the planner scans the active products instead and runs the
+# full-text query once per product (seconds on a large catalog).
+_COUNT_SQL = """
+    SELECT count(*) FROM products_fts CROSS JOIN products ON products.id = products_fts.rowid
+    WHERE products_fts MATCH :match AND products.is_active = 1
+"""
+# Highlights only for the ids of the page: computing them inside the ranking query would build one
+# snippet per match (tens of thousands for a common word) before the LIMIT. highlight() re-runs the
+# match, and a prefix term reads the whole doclist of every word it covers, so the prefix is first
+# spelled out as the indexed words it covers: exact words seek straight to the page's rows.
+_PREFIX_WORDS_SQL = text("SELECT term FROM products_fts_terms WHERE term >= :low AND term < :high ORDER BY term LIMIT :limit")
+_HIGHLIGHT_SQL = text(f"""
+    SELECT rowid, highlight(products_fts, 0, char(2), char(3)), snippet(products_fts, 1, char(2), char(3), '…', {SNIPPET_TOKENS})
+    FROM products_fts WHERE products_fts MATCH :match AND rowid IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+def _active_products(ids) -> dict:
+    """{id: PRODUCT_LIST dict} of the active products among `ids`.
+
+    is_active is checked here rather than in the WHERE: with it, SQLite prefers the
+    (is_active, ...) listing indexes and walks every active product instead of the ids.
+    """
+    products = (PRODUCT_LIST.dump(row) for row in PRODUCT_LIST.query().filter(Product.id.in_(ids)))
+    return {product["id"]: product for product in products if product["is_active"]}
+
+def search_products(query: str, per_page: int, cursor: str = None, include_total: bool = False) -> dict:
+    """One page of active products matching `query`, best match first.
+
+    Returns {"items": product dicts with "score", "name_highlight" and "description_snippet",
+    "next_cursor", "prev_cursor" (always None: paging is forward only), "total"}. Raises
+    ValueError for a malformed cursor and SearchUnavailable when the database is not SQLite.
+    """
+    if db.session.get_bind().dialect.name != "sqlite":
+        raise SearchUnavailable("Full-text search needs the SQLite FTS5 index.")
+    terms = query_terms(query)
+    if not terms:
+        return {"items": [], "next_cursor": None, "prev_cursor": None, "total": 0 if include_total else None}
+    match = match_expression(terms)
+
+    after = None
+    if cursor:
+        direction, score, item_id = decode_cursor(cursor) # The score travels in the created_at slot
+        try:
+            after = (float(score), item_id)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor.")
+        if direction != "n":
+            raise ValueError("Invalid cursor.")
+
+    # One more row than the page tells whether there is a next page. The batch is larger than that:
+    # scoring every match costs the same whatever the LIMIT, so headroom for inactive products is
+    # cheaper than a second ranking query. A batch that still comes up short is topped up from the
+    # next one, after the last row ranked.
+    limit = per_page + 1
+    ranked, products = [], {}
+    while len(ranked) < limit:
+        params = {"match": match, "limit": limit * RANK_BATCH_FACTOR}
+        if after:
+            params["score"], params["id"] = after
+        batch = db.session.execute(text(_RANK_SQL.format(after=_AFTER_SQL if after else "")), params).all()
+        if not batch:
+            break
+        products.update(_active_products([row.id for row in batch]))
+        ranked.extend(row for row in batch if row.id in products)
+        if len(batch) < params["limit"]:
+            break
+        after = (batch[-1].score, batch[-1].id)
+    has_next = len(ranked) > per_page
+    ranked = ranked[:per_page]
+    total = db.session.execute(text(_COUNT_SQL), {"match": match}).scalar() if include_total else None
+
+    items = []
+    if ranked:
+        highlight_match = match_expression(terms, _prefix_words(terms[-1]))
+        highlights = {row[0]: row[1:] for row in db.session.execute(_HIGHLIGHT_SQL, {"match": highlight_match, "ids": [row.id for row in ranked]})}
+        for row in ranked:
+            name_highlight, description_snippet = highlights.get(row.id, (None, None))
+            product = products[row.id]
+            product["score"] = row.score
+            product["name_highlight"] = _marked(name_highlight)
+            product["description_snippet"] = _marked(description_snippet)
+            items.append(product)
+
+    last = ranked[-1] if ranked else None
+    return {
+        "items": items,
+        "next_cursor": encode_cursor("n", repr(last.score), last.id) if has_next else None,
+        "prev_cursor": None,
+        "total": total,
+    }
@@ -0,0 +1,122 @@
+# src/services/response_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 60 # Bounds staleness across worker processes, which do not share the version counter
+
+# --- Cache de respostas versionado, com ETag forte e 304 Not Modified ---
+
+class ResponseCache:
+    """Bounded LRU of serialized responses, invalidated by bumping a version counter.
+
+    Entries are keyed on (version, endpoint, view args, query args), so a bump makes
+    every older entry unreachable; bump() also drops them to free memory at once.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> (body, status, mimetype, etag, stored_at)
+        self._bytes = 0
+        self.version = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "not_modified": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[4] > self.ttl_seconds:
+                self._pop_locked(key)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key, body, status, mimetype):
+        if len(body) > self.max_bytes:
+            return None
+        entry = (body, status, mimetype, hashlib.sha1(body).hexdigest(), time.monotonic())
+        with self._lock:
+            if key[0] != self.version:
+                return entry # Computed against data that changed meanwhile: serve it, don't keep it
+            if key in self._entries:
+                self._pop_locked(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+                self._stats["evictions"] += 1
+        return entry
+
+    def _pop_locked(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry[0])
+        return entry
+
+    def bump(self):
+        """Invalidates every cached response (call after any change to the cached data)."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def record_not_modified(self):
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(entries=len(self._entries), bytes=self._bytes, version=self.version,
+                         max_entries=self.max_entries, max_bytes=self.max_bytes)
+        return stats
+
+def get_response_cache(name: str) -> ResponseCache:
+    """Returns the named response cache of the current app, creating it on first use."""
+    caches = current_app.extensions.setdefault("response_caches", {})
+    cache = caches.get(name)
+    if cache is None:
+        config = current_app.config
+        cache = caches.setdefault(name, ResponseCache(
+            max_entries=config.get("RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+            max_bytes=config.get("RESPONSE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+            ttl_seconds=config.get("RESPONSE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+        ))
+    return cache
+
+def cached_response(cache_name: str):
+    """Caches successful GET responses of a view in the named cache and answers If-None-Match with 304."""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache = get_response_cache(cache_name)
+            key = (cache.version, request.endpoint, tuple(sorted(kwargs.items())), tuple(sorted(request.args.items(multi=True))))
+            entry = cache.get(key)
+            if entry is None:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                entry = cache.put(key, response.get_data(), response.status_code, response.mimetype)
+                if entry is None:
+                    return response
+            body, status, mimetype, etag, _ = entry
+            response = current_app.response_class(body, status=status, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache" # Clients may store it but must revalidate with the ETag
+            response.make_conditional(request)
+            if response.status_code == 304:
+                cache.record_not_modified()
+            return response
+        return decorated_function
+    return decorator
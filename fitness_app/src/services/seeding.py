@@ -0,0 +1,366 @@
+# src/services/seeding.py
+import random
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import chain, combinations
+from operator import itemgetter
+import numpy as np
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash
+from src.models import (User, UserProfile, UserPreference, DietPlan, DietPlanMeal, WorkoutPlan, WorkoutPlanDay,
+                        WorkoutExercise, PlanTemplate, Product, ProductCategory, Advertisement)
+from src.extensions import db
+from src.services import plan_service, plan_templates
+
+SEEDER_VERSION = 1 # Bump whenever the generated rows change (benchmark datasets are keyed by it)
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_PASSWORD = "fitness-seed"
+PLAN_DURATION_DAYS = 30
+WORKOUT_DAYS_PER_WEEK = 4
+MAX_STATEMENT_PARAMETERS = 999 # SQLite's bound-parameter limit before 3.32, the lowest still in use
+TEMPLATE_LOOKUP_CHUNK = 500 # content_hash values per IN (...) lookup
+
+# --- Vocabulário dos dados sintéticos ---
+
+FIRST_NAMES = ("Ana", "João", "Maria", "Pedro", "Inês", "Rui", "Sofia", "Tiago", "Beatriz", "Miguel", "Carla", "Nuno",
+               "Marta", "Diogo", "Rita", "André", "Joana", "Bruno", "Catarina", "Luís")
+LAST_NAMES = ("Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Rodrigues", "Martins", "Jesus", "Sousa",
+              "Fernandes", "Gonçalves", "Gomes", "Lopes", "Marques", "Alves", "Almeida", "Ribeiro", "Pinto", "Carvalho")
+GENDERS = tuple(plan_service.BMR_GENDER_OFFSETS)
+ACTIVITY_LEVELS = tuple(plan_service.ACTIVITY_MULTIPLIERS)
+GOALS = tuple(plan_service.GOAL_CALORIE_ADJUSTMENTS)
+FOODS = ("frango", "arroz", "brócolos", "salmão", "aveia", "ovos", "feijão", "batata-doce", "iogurte", "amêndoas", "atum", "banana")
+RESTRICTIONS = ("", "", "", "vegetariano", "vegan", "sem glúten", "sem lactose")
+WORKOUT_TYPES = ("força", "cardio", "HIIT", "yoga", "natação", "ciclismo")
+WORKOUT_TIMES = ("morning", "afternoon", "evening")
+FITNESS_LEVELS = ("Beginner", "Intermediate", "Advanced")
+PRODUCT_ADJECTIVES = ("Premium", "Natural", "Pro", "Ultra", "Essential", "Vegan", "Isolate", "Advanced", "Daily", "Max")
+PRODUCT_NOUNS = ("Whey Protein", "Creatina", "BCAA", "Barra Proteica", "Multivitamínico", "Ómega 3", "Pré-Treino",
+                 "Garrafa Shaker", "Luvas de Treino", "Elástico de Resistência", "Tapete de Yoga", "Halteres")
+CATEGORY_NAMES = ("Proteína", "Creatina", "Aminoácidos", "Vitaminas", "Pré-Treino", "Barras e Snacks", "Acessórios",
+                  "Equipamento", "Vestuário", "Hidratação")
+PLACEMENTS = ("sidebar", "banner_top", "footer_ad")
+LIKED_FOODS = tuple(",".join(foods) for foods in combinations(FOODS, 3))
+PREFERRED_WORKOUTS = tuple(",".join(types) for types in combinations(WORKOUT_TYPES, 2))
+
+# --- Geração e inserção em massa ---
+
+@lru_cache(maxsize=256)
+def _multi_row(sql: str, rows: int) -> str:
+    """The single-row INSERT `sql` with its VALUES group repeated `rows` times."""
+    head, group = sql.rsplit(" VALUES ", 1)
+    return f"{head} VALUES {', '.join([group] * rows)}"
+
+class Seeder:
+    """Generates reproducible synthetic rows and inserts them with chunked executemany.
+
+    Every user gets the same password hash, computed once. Ids are assigned here, after
+    the current maximum of each table, so child rows can reference their parents without
+    reading anything back. Each chunk of `chunk_size` rows is one executemany on the
+    driver cursor, in its own transaction; plan templates are looked up and created in
+    bulk per batch of users. Plan and ad dates are relative to `reference_date` (default: today).
+    """
+
+    def __init__(self, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, password: str = DEFAULT_PASSWORD,
+                 progress=None, reference_date: date = None):
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed) # Whole columns at once (see _pick)
+        self.chunk_size = chunk_size
+        self.password_hash = generate_password_hash(password)
+        self.progress = progress # Optional callback(table_name, rows_inserted_so_far)
+        self.today = reference_date or date.today()
+        self.now = datetime.combine(reference_date, datetime.min.time()) if reference_date else datetime.now().replace(microsecond=0)
+        self.counts = {}
+        self._statements = {} # (table, row keys) -> compiled INSERT, see _insert_statement
+        self._diet_template_ids = {} # (calories, protein, carbs, fat) -> template id
+        self._workout_template_ids = {} # (activity_level, goal, variant) -> template id
+        self._sample_meals = {} # diet template key -> meals of one day, for plans with their own rows
+
+    def _next_id(self, model) -> int:
+        return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def insert(self, model, rows):
+        """Inserts an iterable of row dicts (all with the same keys, updated in place) in chunks; returns the number of rows."""
+        table, inserted, chunk = model.__table__, 0, []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                inserted += self._flush(table, chunk)
+                chunk = []
+        if chunk:
+            inserted += self._flush(table, chunk)
+        return inserted
+
+    def _flush(self, table, chunk):
+        connection = db.session.connection()
+        sql, parameters, processors, defaults = self._insert_statement(table, tuple(chunk[0]), connection.dialect)
+        if defaults:
+            # Python-side column defaults (utcnow, True, 0) are evaluated once per chunk, not per row
+            fixed = {key: default.arg(None) if default.is_callable else default.arg for key, default in defaults}
+            for row in chunk:
+                row.update(fixed)
+        for key, processor in processors: # In place, column by column
+            for row in chunk:
+                row[key] = processor(row[key])
+        if connection.dialect.positional:
+            # Several rows per INSERT ... VALUES (...), (...): per statement costs (FTS5 triggers
+            # flush their pending index at each statement) are paid once per group, not per row
+            values = list(map(itemgetter(*parameters), chunk))
+            per_statement = max(1, MAX_STATEMENT_PARAMETERS // len(parameters))
+            full = len(values) - len(values) % per_statement
+            if full:
+                connection.exec_driver_sql(_multi_row(sql, per_statement), [
+                    tuple(chain.from_iterable(values[start:start + per_statement])) for start in range(0, full, per_statement)
+                ])
+            if full < len(values):
+                connection.exec_driver_sql(_multi_row(sql, len(values) - full), tuple(chain.from_iterable(values[full:])))
+        else:
+            connection.exec_driver_sql(sql, [{key: row[key] for key in parameters} for row in chunk])
+        db.session.commit()
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(chunk)
+        if self.progress:
+            self.progress(table.name, self.counts[table.name])
+        return len(chunk)
+
+    def _insert_statement(self, table, keys, dialect):
+        """Compiled INSERT for rows with `keys`, cached per (table, keys).
+
+        Returns (sql, parameter names in order, [(column, bind processor)], [(column, Python-side default)]).
+        Rows go to the driver's executemany as plain tuples: Core's executemany builds a
+        parameter dict per row (construct_params), which cost more than the insert itself.
+        Bind processors are applied here instead, so dates and booleans are stored as Core would.
+        """
+        cached = self._statements.get((table.name, keys))
+        if cached is None:
+            defaults = [(column.key, column.default) for column in table.columns if column.key not in keys
+                        and column.default is not None and (column.default.is_scalar or column.default.is_callable)]
+            compiled = table.insert().compile(dialect=dialect, column_keys=list(keys) + [key for key, _ in defaults])
+            parameters = tuple(compiled.positiontup if dialect.positional else compiled.binds)
+            processors = [(key, processor) for key in parameters
+                          if (processor := table.c[key].type.dialect_impl(dialect).bind_processor(dialect)) is not None]
+            cached = self._statements[(table.name, keys)] = (compiled.string, parameters, processors, defaults)
+        return cached
+
+    # --- Utilizadores, perfis, preferências e planos ---
+
+    def seed_users(self, count: int, admins: int = 1, legacy_plan_ratio: float = 0.0):
+        """Users (the first `admins` are administrators) with a complete profile, preferences and active plans.
+
+        A `legacy_plan_ratio` share of the plans is written the pre-template way, with their
+        own DietPlanMeal / WorkoutPlanDay / WorkoutExercise rows.
+        """
+        first_id = self._next_id(User)
+        remaining = count
+        while remaining > 0:
+            batch = min(remaining, self.chunk_size)
+            self._seed_user_batch(first_id, batch, admins, legacy_plan_ratio)
+            first_id += batch
+            admins = max(admins - batch, 0)
+            remaining -= batch
+
+    def _seed_user_batch(self, first_id, count, admins, legacy_plan_ratio):
+        pick, integers = self._pick, self.np_rng.integers
+        user_ids = range(first_id, first_id + count)
+        profiles = [{
+            "user_id": user_id, "full_name": f"{first_name} {last_name}", "age": age, "gender": gender,
+            "height_cm": height_cm, "weight_kg": weight_kg, "activity_level": activity_level, "goal": goal,
+        } for user_id, first_name, last_name, age, gender, height_cm, weight_kg, activity_level, goal in zip(
+            user_ids, pick(FIRST_NAMES, count), pick(LAST_NAMES, count), integers(18, 71, count).tolist(),
+            pick(GENDERS, count), integers(150, 201, count).tolist(), self.np_rng.uniform(45, 130, count).round(1).tolist(),
+            pick(ACTIVITY_LEVELS, count), pick(GOALS, count),
+        )]
+
+        self.insert(User, ({
+            "id": user_id,
+            "username": f"admin{user_id}" if i < admins else f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+            "password_hash": self.password_hash,
+            "is_admin": i < admins,
+        } for i, user_id in enumerate(user_ids)))
+        self.insert(UserProfile, profiles)
+        self.insert(UserPreference, ({
+            "user_id": user_id,
+            "liked_foods": liked,
+            "disliked_foods": disliked,
+            "dietary_restrictions": restriction,
+            "allergies": "",
+            "preferred_workout_types": workout_types,
+            "workout_frequency_preference": frequency,
+            "workout_time_preference": workout_time,
+            "fitness_level_self_assessed": fitness_level,
+            "specific_goals_text": None,
+        } for user_id, liked, disliked, restriction, workout_types, frequency, workout_time, fitness_level in zip(
+            user_ids, pick(LIKED_FOODS, count), pick(FOODS, count), pick(RESTRICTIONS, count), pick(PREFERRED_WORKOUTS, count),
+            integers(2, 7, count).tolist(), pick(WORKOUT_TIMES, count), pick(FITNESS_LEVELS, count),
+        )))
+        self._seed_plans(profiles, legacy_plan_ratio)
+
+    def _pick(self, values, count) -> list:
+        """`count` random entries of `values`, drawn in one NumPy call rather than one rng.choice per row."""
+        return [values[i] for i in self.np_rng.integers(len(values), size=count).tolist()]
+
+    def _seed_plans(self, profiles, legacy_plan_ratio):
+        targets = plan_service.calculate_targets_batch(*zip(*(
+            (p["gender"], p["weight_kg"], p["height_cm"], p["age"], p["activity_level"], p["goal"]) for p in profiles
+        )))
+        keys = list(zip(*(targets[key].astype(int).tolist() for key in ("target_calories", "protein_g", "carbs_g", "fat_g"))))
+        variants = self.np_rng.integers(plan_templates.WORKOUT_TEMPLATE_VARIANTS, size=len(profiles)).tolist()
+        own_rows = (self.np_rng.random(len(profiles)) < legacy_plan_ratio).tolist()
+        self._resolve_diet_templates(keys)
+        self._resolve_workout_templates({(p["activity_level"], p["goal"], v) for p, v in zip(profiles, variants)})
+
+        start_date = self.today - timedelta(days=self.rng.randint(0, PLAN_DURATION_DAYS))
+        end_date = start_date + timedelta(days=PLAN_DURATION_DAYS)
+        diet_id, workout_id = self._next_id(DietPlan), self._next_id(WorkoutPlan)
+        diet_plans, workout_plans, legacy = [], [], []
+        for i, (profile, key, variant, legacy_plan) in enumerate(zip(profiles, keys, variants, own_rows)):
+            diet_plans.append({
+                "id": diet_id + i, "user_id": profile["user_id"], "start_date": start_date, "end_date": end_date,
+                "daily_calories": key[0], "daily_protein_g": key[1], "daily_carbs_g": key[2], "daily_fat_g": key[3],
+                "is_active": True, "template_id": None if legacy_plan else self._diet_template_ids[key],
+            })
+            workout_plans.append({
+                "id": workout_id + i, "user_id": profile["user_id"], "start_date": start_date, "end_date": end_date,
+                "days_per_week": WORKOUT_DAYS_PER_WEEK, "is_active": True,
+                "description": f"Plano de treino para {profile['goal']} com foco em {profile['activity_level']} atividade.",
+                "template_id": None if legacy_plan else self._workout_template_ids[(profile["activity_level"], profile["goal"], variant)],
+            })
+            if legacy_plan:
+                legacy.append((diet_id + i, workout_id + i, key, profile))
+        self.insert(DietPlan, diet_plans)
+        self.insert(WorkoutPlan, workout_plans)
+        if legacy:
+            self._seed_plan_rows(legacy)
+
+    def _resolve_diet_templates(self, keys):
+        missing = {key for key in keys if key not in self._diet_template_ids}
+        rendered = {key: plan_templates.render_diet_template(*key) for key in missing}
+        self._diet_template_ids.update(self._template_ids("diet", rendered))
+
+    def _resolve_workout_templates(self, keys):
+        missing = {key for key in keys if key not in self._workout_template_ids}
+        rendered = {key: plan_templates.render_workout_template(key[0], key[1], WORKOUT_DAYS_PER_WEEK, key[2]) for key in missing}
+        self._workout_template_ids.update(self._template_ids("workout", rendered))
+
+    def _template_ids(self, kind, rendered) -> dict:
+        """{key: template id} for {key: (content_hash, content_json)}, inserting the missing templates in bulk.
+
+        One IN lookup and one executemany per chunk instead of get_or_create_template per key:
+        random profiles produce thousands of distinct diet targets per batch.
+        """
+        hashes = {content_hash for content_hash, _ in rendered.values()}
+        existing = self._template_ids_by_hash(hashes)
+        new_rows = {content_hash: content_json for content_hash, content_json in rendered.values() if content_hash not in existing}
+        if new_rows:
+            self.insert(PlanTemplate, ({"kind": kind, "content_hash": h, "content": c} for h, c in new_rows.items()))
+            existing.update(self._template_ids_by_hash(new_rows))
+        return {key: existing[content_hash] for key, (content_hash, _) in rendered.items()}
+
+    def _template_ids_by_hash(self, hashes) -> dict:
+        hashes, ids = list(hashes), {}
+        for start in range(0, len(hashes), TEMPLATE_LOOKUP_CHUNK):
+            ids.update(db.session.execute(
+                select(PlanTemplate.content_hash, PlanTemplate.id).where(PlanTemplate.content_hash.in_(hashes[start:start + TEMPLATE_LOOKUP_CHUNK]))
+            ).all())
+        return ids
+
+    def _seed_plan_rows(self, legacy):
+        """Meals, days and exercises of plans that do not use a template."""
+        meals, days, exercises = [], [], []
+        day_id = self._next_id(WorkoutPlanDay)
+        for diet_plan_id, workout_plan_id, key, profile in legacy:
+            daily_meals = self._sample_meals.get(key)
+            if daily_meals is None:
+                macros = dict(zip(("target_calories", "protein_g", "carbs_g", "fat_g"), key))
+                daily_meals = self._sample_meals[key] = plan_service.generate_sample_daily_meals(key[0], macros)
+            meals.extend({"diet_plan_id": diet_plan_id, "day_of_week": day, **meal} for day in range(1, 8) for meal in daily_meals)
+            for day in plan_service.generate_sample_workout_plan(profile["activity_level"], profile["goal"], WORKOUT_DAYS_PER_WEEK, self.rng):
+                days.append({"id": day_id, "workout_plan_id": workout_plan_id, "day_of_week": day["day_of_week"], "focus": day["focus"]})
+                exercises.extend({"workout_plan_day_id": day_id, **exercise} for exercise in day["exercises"])
+                day_id += 1
+        self.insert(DietPlanMeal, meals)
+        self.insert(WorkoutPlanDay, days)
+        self.insert(WorkoutExercise, exercises)
+
+    # --- Loja e anúncios ---
+
+    def seed_categories(self, count: int) -> list[int]:
+        """Product categories; returns the ids of every category in the database."""
+        first_id = self._next_id(ProductCategory)
+        self.insert(ProductCategory, ({
+            "id": category_id,
+            "name": f"{CATEGORY_NAMES[(category_id - 1) % len(CATEGORY_NAMES)]} {category_id}",
+            "slug": f"category-{category_id}",
+            "description": f"Produtos de {CATEGORY_NAMES[(category_id - 1) % len(CATEGORY_NAMES)].lower()}.",
+        } for category_id in range(first_id, first_id + count)))
+        return list(db.session.execute(select(ProductCategory.id)).scalars())
+
+    def seed_products(self, count: int, category_ids: list[int]):
+        first_id = self._next_id(Product)
+        for start in range(first_id, first_id + count, self.chunk_size):
+            self._seed_product_batch(start, min(self.chunk_size, first_id + count - start), category_ids)
+
+    def _seed_product_batch(self, first_id, count, category_ids):
+        pick, random_column = self._pick, self.np_rng.random
+        self.insert(Product, ({
+            "id": product_id,
+            "name": f"{adjective} {noun} {product_id}",
+            "slug": f"product-{product_id}",
+            "description": f"{other_noun} de qualidade {other_adjective.lower()}, ideal para quem treina {workout_type}.",
+            "price": f"{euros}.{cents}",
+            "stock_quantity": stock,
+            "sku": f"SKU-{product_id:08d}",
+            "image_url": f"https://cdn.example.com/products/{product_id}.jpg",
+            "is_active": active,
+            "is_featured": featured,
+            "category_id": category_id,
+        } for product_id, adjective, noun, other_noun, other_adjective, workout_type, euros, cents, stock, active, featured, category_id in zip(
+            range(first_id, first_id + count), pick(PRODUCT_ADJECTIVES, count), pick(PRODUCT_NOUNS, count),
+            pick(PRODUCT_NOUNS, count), pick(PRODUCT_ADJECTIVES, count), pick(WORKOUT_TYPES, count),
+            self.np_rng.integers(3, 151, count).tolist(), pick(("00", "49", "90", "99"), count),
+            self.np_rng.integers(0, 501, count).tolist(), (random_column(count) < 0.95).tolist(),
+            (random_column(count) < 0.03).tolist(), pick(category_ids, count),
+        )))
+
+    def seed_advertisements(self, count: int, created_by_id: int = None):
+        rng, now = self.rng, self.now
+        self.insert(Advertisement, ({
+            "title": f"{rng.choice(PRODUCT_ADJECTIVES)} {rng.choice(PRODUCT_NOUNS)} -{rng.choice((10, 15, 20, 30))}%",
+            "content": "Promoção por tempo limitado.",
+            "image_url": f"https://cdn.example.com/ads/{i}.jpg",
+            "target_url": f"https://example.com/promo/{i}",
+            "placement_area": PLACEMENTS[i % len(PLACEMENTS)],
+            "is_active": rng.random() < 0.9,
+            "start_date": now - timedelta(days=rng.randint(0, 30)),
+            "end_date": now + timedelta(days=rng.randint(1, 60)),
+            "clicks": 0,
+            "views": 0,
+            "created_by_id": created_by_id,
+        } for i in range(count)))
+
+def seed_database(users: int = 0, products: int = 0, advertisements: int = 0, categories: int = 10, admins: int = 1,
+                  legacy_plan_ratio: float = 0.0, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  password: str = DEFAULT_PASSWORD, progress=None, reference_date: date = None) -> dict:
+    """Adds synthetic rows to the database of the current app context.
+
+    Returns {"rows": {table: inserted rows}, "seconds": elapsed, "rows_per_second": rate}.
+    Running it again appends more rows (ids continue after the existing ones). The same seed and
+    reference_date on an empty database give the same rows, apart from the created_at/updated_at
+    column defaults.
+    """
+    start = time.perf_counter()
+    seeder = Seeder(seed=seed, chunk_size=chunk_size, password=password, progress=progress, reference_date=reference_date)
+    if users:
+        seeder.seed_users(users, admins=admins, legacy_plan_ratio=legacy_plan_ratio)
+    if products:
+        category_ids = seeder.seed_categories(categories) if categories else list(db.session.execute(select(ProductCategory.id)).scalars())
+        if not category_ids:
+            raise ValueError("Products need at least one category (use categories > 0).")
+        seeder.seed_products(products, category_ids)
+    if advertisements:
+        admin_id = db.session.execute(select(func.min(User.id)).where(User.is_admin == True)).scalar()
+        seeder.seed_advertisements(advertisements, created_by_id=admin_id)
+    seconds = time.perf_counter() - start
+    total = sum(seeder.counts.values())
+    return {"rows": seeder.counts, "seconds": seconds, "rows_per_second": total / seconds if seconds else None}
@@ -0,0 +1,74 @@
+# src/services/target_recompute.py
+from sqlalchemy import select, update
+from src.models import UserProfile, DietPlan
+from src.extensions import db
+from src.services import plan_service, plan_templates
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# --- Recálculo das metas diárias de todos os planos ativos (após mudanças nas fórmulas) ---
+
+def recompute_active_diet_targets(chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Recomputes calories/macros of every active diet plan from its user's profile.
+
+    Streams (profile, plan) rows in keyset-ordered chunks, computes each chunk with
+    plan_service.calculate_targets_batch and writes only the plans whose targets
+    changed with one executemany UPDATE per chunk. Each chunk is committed on its own
+    so the write lock is never held for the whole pass.
+    """
+    stats = {"processed": 0, "updated": 0, "skipped_invalid": 0}
+    template_ids = {} # (calories, protein, carbs, fat) -> diet template id, for this pass
+    last_plan_id = 0
+
+    while True:
+        rows = db.session.execute(
+            select(
+                DietPlan.id, DietPlan.daily_calories, DietPlan.daily_protein_g, DietPlan.daily_carbs_g, DietPlan.daily_fat_g,
+                UserProfile.gender, UserProfile.weight_kg, UserProfile.height_cm, UserProfile.age,
+                UserProfile.activity_level, UserProfile.goal
+            )
+            .join(UserProfile, UserProfile.user_id == DietPlan.user_id)
+            .where(DietPlan.is_active == True, DietPlan.id > last_plan_id)
+            .order_by(DietPlan.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        last_plan_id = rows[-1].id
+
+        (plan_ids, calories, proteins, carbs, fats,
+         genders, weights, heights, ages, activity_levels, goals) = zip(*rows)
+        targets = plan_service.calculate_targets_batch(genders, weights, heights, ages, activity_levels, goals)
+
+        updates = []
+        for i, plan_id in enumerate(plan_ids):
+            if not targets["valid"][i]:
+                stats["skipped_invalid"] += 1
+                continue
+            new_targets = (
+                int(targets["target_calories"][i]), int(targets["protein_g"][i]),
+                int(targets["carbs_g"][i]), int(targets["fat_g"][i])
+            )
+            if new_targets == (calories[i], proteins[i], carbs[i], fats[i]):
+                continue
+            if new_targets not in template_ids:
+                template_ids[new_targets] = plan_templates.get_diet_template_id({
+                    "target_calories": new_targets[0], "protein_g": new_targets[1],
+                    "carbs_g": new_targets[2], "fat_g": new_targets[3]
+                })
+            updates.append({
+                "id": plan_id,
+                "daily_calories": new_targets[0],
+                "daily_protein_g": new_targets[1],
+                "daily_carbs_g": new_targets[2],
+                "daily_fat_g": new_targets[3],
+                "template_id": template_ids[new_targets]
+            })
+
+        if updates:
+            db.session.execute(update(DietPlan), updates) # ORM bulk UPDATE by primary key (executemany)
+        db.session.commit()
+        stats["processed"] += len(rows)
+        stats["updated"] += len(updates)
+
+    return stats
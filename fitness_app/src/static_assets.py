@@ -0,0 +1,156 @@
+# src/static_assets.py
+# Static/SPA serving from an in-memory manifest built at startup: no filesystem access per request,
+# precompressed gzip/brotli variants, strong ETags and immutable caching for content-hashed assets.
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from flask import current_app, request, send_file
+
+try:
+    import brotli # Optional: without it only prebuilt .br files are offered
+except ImportError:
+    brotli = None
+
+INDEX_FILE = "index.html"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache" # index.html and unhashed files: stored, but revalidated with the ETag
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024 # Bytes of asset bodies kept in memory; bigger trees fall back to send_file
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml", "application/wasm")
+
+DEFAULT_BUILD_DIR = "assets" # Vite's output folder for hashed files (build.assetsDir)
+
+# Content-hashed build output, served as immutable. Anywhere: a hex hash of 8+ characters, as webpack
+# and create-react-app name files (main.3f9a1c2e.css, 2.8e1f0b3c.chunk.js). Under the build folder
+# only: Vite's 8-character base64url hash (assets/index-B7x2kQ9a.js), which ordinary names such as
+# apple-touch-icon.png could be mistaken for; it must hold a digit or a capital, as real hashes do.
+HEX_HASHED_NAME_RE = re.compile(r"[.-][0-9a-f]{8,}(?:\.[A-Za-z0-9]+)+$")
+BUILD_HASHED_NAME_RE = re.compile(r"-(?=[A-Za-z0-9_-]{0,7}[0-9A-Z])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+
+def is_hashed(url_path, build_dir=DEFAULT_BUILD_DIR):
+    """True when `url_path` names a content-hashed file, safe to cache forever."""
+    name = url_path.rsplit("/", 1)[-1]
+    if HEX_HASHED_NAME_RE.search(name):
+        return True
+    return bool(build_dir) and url_path.startswith(build_dir.strip("/") + "/") and bool(BUILD_HASHED_NAME_RE.search(name))
+
+class StaticAsset:
+    """One file of the static folder: its encodings (identity/gzip/br) with their ETags."""
+
+    def __init__(self, path, mimetype, hashed):
+        self.path = path
+        self.mimetype = mimetype
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if hashed else REVALIDATE_CACHE_CONTROL
+        self.variants = {} # encoding -> (body or None when served from disk, etag)
+
+    def add_variant(self, encoding, body, etag):
+        self.variants[encoding] = (body, etag)
+
+def _compressible(mimetype):
+    return any(mimetype.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def tree_signature(static_folder):
+    """(relative path, mtime, size) of every file under the static folder: changes when any file does."""
+    if not static_folder or not os.path.isdir(static_folder):
+        return ()
+    signature = []
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            signature.append((os.path.relpath(os.path.join(root, name), static_folder), stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(signature))
+
+def build_manifest(static_folder, memory_limit=DEFAULT_MEMORY_LIMIT, build_dir=DEFAULT_BUILD_DIR, compress=True):
+    """Maps each URL path under the static folder to a StaticAsset.
+
+    Prebuilt foo.js.gz/foo.js.br next to foo.js are used as they are; otherwise, with
+    `compress`, compressible files are compressed once here.
+    """
+    manifest = {}
+    if not static_folder or not os.path.isdir(static_folder):
+        return manifest
+    budget = memory_limit
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if name.endswith((".gz", ".br")) and name[:-3] in files:
+                continue # Picked up as a variant of the original file
+            path = os.path.join(root, name)
+            url_path = os.path.relpath(path, static_folder).replace(os.sep, "/")
+            mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            asset = StaticAsset(path, mimetype, is_hashed(url_path, build_dir))
+            body = _read(path)
+            etag = hashlib.sha1(body).hexdigest()
+            in_memory = len(body) <= budget
+            if in_memory:
+                budget -= len(body)
+            asset.add_variant("identity", body if in_memory else None, etag)
+
+            if in_memory and _compressible(mimetype) and len(body) >= MIN_COMPRESS_SIZE:
+                prebuilt = {enc: path + suffix for enc, suffix in (("gzip", ".gz"), ("br", ".br")) if name + suffix in files}
+                encoded = {encoding: _read(prebuilt_path) for encoding, prebuilt_path in prebuilt.items()}
+                if compress and "gzip" not in encoded:
+                    encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+                if compress and "br" not in encoded and brotli is not None:
+                    encoded["br"] = brotli.compress(body, quality=11)
+                for encoding, encoded_body in encoded.items():
+                    if len(encoded_body) < len(body) and len(encoded_body) <= budget:
+                        budget -= len(encoded_body)
+                        asset.add_variant(encoding, encoded_body, f"{etag}-{encoding}")
+            manifest[url_path] = asset
+    return manifest
+
+def init_static_assets(app):
+    """Builds the manifest of app.static_folder (STATIC_MEMORY_LIMIT bytes kept in memory; Vite-style
+    hashed names are recognized under STATIC_BUILD_DIR). In debug mode only prebuilt .gz/.br are
+    offered, so rebuilding after each frontend change stays fast."""
+    if app.debug:
+        app.extensions["static_signature"] = tree_signature(app.static_folder)
+    manifest = build_manifest(app.static_folder, app.config.get("STATIC_MEMORY_LIMIT", DEFAULT_MEMORY_LIMIT),
+                              app.config.get("STATIC_BUILD_DIR", DEFAULT_BUILD_DIR), compress=not app.debug)
+    app.extensions["static_manifest"] = manifest
+    return manifest
+
+def get_static_manifest():
+    app = current_app
+    if app.debug and app.extensions.get("static_signature") != tree_signature(app.static_folder):
+        # Development: pick up rebuilt frontend files without restarting, rebuilding only when one changed
+        return init_static_assets(app)
+    return app.extensions["static_manifest"]
+
+# --- Respostas ---
+
+def _best_encoding(asset):
+    offered = [encoding for encoding in ("br", "gzip") if encoding in asset.variants]
+    if not offered:
+        return "identity"
+    return request.accept_encodings.best_match(offered) or "identity"
+
+def asset_response(asset):
+    """Response for an asset in the client's best encoding, answering If-None-Match with 304."""
+    encoding = _best_encoding(asset)
+    body, etag = asset.variants[encoding]
+    if body is None:
+        response = send_file(asset.path, mimetype=asset.mimetype, etag=False, conditional=False)
+    else:
+        response = current_app.response_class(body, mimetype=asset.mimetype)
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    if len(asset.variants) > 1:
+        response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = asset.cache_control
+    return response.make_conditional(request)
+
+def static_or_index(path):
+    """Asset at `path`, or index.html for client-side routes; None when there is no index.html."""
+    manifest = get_static_manifest()
+    asset = manifest.get(path) if path else None
+    if asset is None:
+        asset = manifest.get(INDEX_FILE)
+    return asset_response(asset) if asset is not None else None
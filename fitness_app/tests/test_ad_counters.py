@@ -0,0 +1,47 @@
+# tests/test_ad_counters.py
+# Write-behind ad counters (src/services/ad_counters.py): clicks are buffered and flushed in batches,
+# and a discarded app does not leave its buffer or flush thread behind.
+import gc
+import weakref
+import pytest
+from flask import Flask
+
+@pytest.mark.filterwarnings("error::sqlalchemy.exc.LegacyAPIWarning")
+def test_click_is_buffered_and_flushed(app, client):
+    from src.extensions import db
+    from src.models import Advertisement
+    from src.services.ad_counters import get_ad_counters
+
+    with app.app_context():
+        ad = Advertisement(title="Promo", placement_area="sidebar", is_active=True, target_url="https://example.com", clicks=0)
+        db.session.add(ad)
+        db.session.commit()
+        ad_id = ad.id
+    assert client.post(f"/api/advertisements/{ad_id}/click").get_json()["target_url"] == "https://example.com"
+    assert client.post(f"/api/advertisements/{ad_id + 1}/click").status_code == 404
+    with app.app_context():
+        assert get_ad_counters().flush() == 1
+        assert db.session.get(Advertisement, ad_id).clicks == 1
+
+def test_discarded_app_releases_its_buffer_and_thread():
+    from src.services.ad_counters import AdCounterBuffer, _live_buffers
+
+    app = Flask(__name__)
+    buffer = AdCounterBuffer(flush_seconds=0.01)
+    buffer.init_app(app)
+    thread, buffer_ref = buffer._thread, weakref.ref(buffer)
+    assert buffer in _live_buffers
+    del app, buffer
+    gc.collect()
+    assert buffer_ref() is None
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+
+def test_shutdown_stops_tracking_the_buffer():
+    from src.services.ad_counters import AdCounterBuffer, _live_buffers
+
+    buffer = AdCounterBuffer(flush_seconds=0.01)
+    buffer.init_app(Flask(__name__))
+    buffer.shutdown()
+    assert buffer not in _live_buffers
+    assert not buffer._thread.is_alive()
@@ -0,0 +1,15 @@
+# tests/test_ad_index.py
+def test_public_ads_leave_out_the_buffered_counters(app, client, make_user, login):
+    from src.extensions import db
+    from src.models import Advertisement
+
+    with app.app_context():
+        db.session.add(Advertisement(title="Promo", placement_area="sidebar", is_active=True, views=10, clicks=2))
+        db.session.commit()
+    ads = client.get("/api/advertisements/sidebar").get_json()
+    assert [ad["title"] for ad in ads] == ["Promo"]
+    assert "views" not in ads[0] and "clicks" not in ads[0]
+
+    login(make_user("admin", is_admin=True))
+    assert client.put(f"/api/admin/advertisements/{ads[0]['id']}", json={"is_active": False}).status_code == 200
+    assert client.get("/api/advertisements/sidebar").get_json() == []
@@ -0,0 +1,58 @@
+# tests/test_identity.py
+# Cached identity/role resolution (src/services/identity.py): a cache hit runs no query, and a role
+# change reaches every process through the shared role version stamp.
+import pytest
+
+def client_of(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+    return client
+
+@pytest.fixture
+def other_worker(app):
+    """A second app on the same database, standing in for another worker process."""
+    import src.main as main
+    return main.create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"],
+        "AD_COUNTER_FLUSH_SECONDS": 0,
+        "PASSWORD_HASH_WORKERS": 0,
+        "IDENTITY_STAMP_CHECK_SECONDS": 0,
+    })
+
+def test_cache_hit_runs_no_identity_query(app, query_budget, make_user):
+    admin_id = make_user("admin", is_admin=True)
+    client = client_of(app, admin_id)
+    with query_budget(max_repeats=1) as budget:
+        for _ in range(2):
+            assert client.get(f"/api/admin/users/{admin_id}/details").status_code == 200
+    (_, miss), (_, hit) = budget.requests
+    assert miss.total - hit.total == 2 # Stamp + users row, only on the first request
+    assert not any("role_version_stamp" in statement for statement in hit.counts)
+
+def test_login_required_only_checks_the_session(app, query_budget, make_user):
+    client = client_of(app, make_user("atleta"))
+    with query_budget(max_repeats=1, budgets={"profile.get_profile": 1}):
+        assert client.get("/api/profile/").status_code == 404 # No profile yet; the lookup is the only query
+
+def test_demotion_revokes_admin_access(app, make_user):
+    admin_id, other_id = make_user("admin", is_admin=True), make_user("outro", is_admin=True)
+    admin, other = client_of(app, admin_id), client_of(app, other_id)
+    assert other.get("/api/admin/stats").status_code == 200 # Cached as admin
+    assert admin.post(f"/api/admin/users/{other_id}/toggle_admin").status_code == 200
+    assert other.get("/api/admin/stats").status_code == 403
+
+def test_role_change_reaches_other_workers(app, other_worker, make_user):
+    admin_id, other_id = make_user("admin", is_admin=True), make_user("outro", is_admin=True)
+    admin, other = client_of(app, admin_id), client_of(other_worker, other_id)
+    assert other.get("/api/admin/stats").status_code == 200 # Cached as admin in the other worker
+    assert admin.post(f"/api/admin/users/{other_id}/toggle_admin").status_code == 200
+    assert other.get("/api/admin/stats").status_code == 403
+
+def test_deleted_admin_loses_access_in_other_workers(app, other_worker, make_user):
+    admin_id, other_id = make_user("admin", is_admin=True), make_user("outro", is_admin=True)
+    admin, other = client_of(app, admin_id), client_of(other_worker, other_id)
+    assert other.get("/api/admin/stats").status_code == 200
+    assert admin.delete(f"/api/admin/users/{other_id}").status_code == 200
+    assert other.get("/api/admin/stats").status_code == 403
@@ -0,0 +1,103 @@
+# tests/test_pagination.py
+# Keyset (cursor) pagination (src/services/pagination.py): the pages walk the same order as
+# ORDER BY created_at DESC, id DESC with OFFSET, in both directions, rows without a created_at included.
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import text
+
+PRODUCTS = 23
+UNDATED = 4 # The last ones inserted get created_at NULL
+PER_PAGE = 5
+
+@pytest.fixture
+def products(app):
+    """PRODUCTS products, several sharing a created_at (ties broken by id), the last UNDATED without one."""
+    from src.extensions import db
+    from src.models import Product, ProductCategory
+
+    with app.app_context():
+        category = ProductCategory(name="Suplementos", slug="suplementos")
+        db.session.add(category)
+        db.session.flush()
+        start = datetime(2026, 1, 1)
+        for n in range(PRODUCTS):
+            db.session.add(Product(name=f"Produto {n}", slug=f"produto-{n}", price=Decimal("9.90"), category_id=category.id,
+                                   created_at=start + timedelta(hours=n // 3)))
+        db.session.commit()
+        # Set afterwards: an explicit None on insert falls back to the column's server default
+        db.session.execute(text("UPDATE products SET created_at = NULL WHERE id > :dated"), {"dated": PRODUCTS - UNDATED})
+        db.session.commit()
+
+def offset_order(db):
+    return list(db.session.execute(text("SELECT id FROM products ORDER BY created_at DESC, id DESC")).scalars())
+
+def walk(cursor=None, direction="next_cursor"):
+    """Follows `direction` from `cursor` to the end; returns the pages of ids and the cursors of each page."""
+    from src.models import Product
+    from src.services.pagination import keyset_paginate
+    pages = []
+    while True:
+        page = keyset_paginate(Product.query, Product, PER_PAGE, cursor)
+        pages.append(([product.id for product in page["items"]], page))
+        cursor = page[direction]
+        if cursor is None:
+            return pages
+
+def test_forward_walk_matches_offset_order(app, products):
+    from src.extensions import db
+    with app.app_context():
+        pages = walk()
+        expected = offset_order(db)
+    assert [item_id for ids, _ in pages for item_id in ids] == expected
+    assert all(len(ids) == PER_PAGE for ids, _ in pages[:-1])
+    assert pages[0][1]["prev_cursor"] is None
+
+def test_undated_rows_come_last(app, products):
+    with app.app_context():
+        ids = [item_id for ids, _ in walk() for item_id in ids]
+    assert ids[-UNDATED:] == list(range(PRODUCTS, PRODUCTS - UNDATED, -1))
+
+def test_prev_round_trip(app, products):
+    with app.app_context():
+        forward = walk()
+        # Back from the last page (which starts inside the undated run) to the first one
+        backward = walk(forward[-1][1]["prev_cursor"], direction="prev_cursor")
+    assert [ids for ids, _ in backward] == [ids for ids, _ in reversed(forward[:-1])]
+    assert backward[-1][1]["next_cursor"] is not None
+
+def test_prev_then_next_returns_the_same_page(app, products):
+    from src.models import Product
+    from src.services.pagination import keyset_paginate
+    with app.app_context():
+        second = keyset_paginate(Product.query, Product, PER_PAGE, keyset_paginate(Product.query, Product, PER_PAGE)["next_cursor"])
+        first = keyset_paginate(Product.query, Product, PER_PAGE, second["prev_cursor"])
+        again = keyset_paginate(Product.query, Product, PER_PAGE, first["next_cursor"])
+    assert [p.id for p in again["items"]] == [p.id for p in second["items"]]
+
+def test_include_total(app, products):
+    from src.models import Product
+    from src.services.pagination import keyset_paginate
+    with app.app_context():
+        assert keyset_paginate(Product.query, Product, PER_PAGE)["total"] is None
+        assert keyset_paginate(Product.query, Product, PER_PAGE, include_total=True)["total"] == PRODUCTS
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "W10", "WyJ4IiwiMjAyNiIsMV0"]) # Garbage, [], ["x","2026",1]
+def test_malformed_cursor_is_a_bad_request(client, products, cursor):
+    response = client.get(f"/api/shop/products?cursor={cursor}")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor."}
+
+@pytest.mark.parametrize("per_page, clamped", [(-1, 1), (0, 1), (3, 3), (1000, 100)])
+def test_per_page_is_clamped(client, products, per_page, clamped):
+    response = client.get(f"/api/shop/products?pagination=cursor&per_page={per_page}")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["per_page"] == clamped
+    assert len(data["products"]) == min(clamped, PRODUCTS)
+
+def test_per_page_below_one_is_rejected(app):
+    from src.models import Product
+    from src.services.pagination import keyset_paginate
+    with app.app_context(), pytest.raises(ValueError):
+        keyset_paginate(Product.query, Product, 0)
@@ -0,0 +1,64 @@
+# tests/test_plan_loader.py
+# The current plan endpoints load the whole plan graph with a fixed number of statements
+# (src/services/plan_loader.py): a 7-day plan costs the same as a 1-day plan.
+from datetime import date, timedelta
+import pytest
+
+MEALS_PER_DAY = 4
+
+@pytest.fixture
+def make_diet_plan(app):
+    """make_diet_plan(user_id, days) -> id of a new active diet plan with its own meal rows (no template)."""
+    from src.extensions import db
+    from src.models import DietPlan, DietPlanMeal
+
+    def create(user_id, days):
+        with app.app_context():
+            plan = DietPlan(user_id=user_id, start_date=date.today(), end_date=date.today() + timedelta(days=28),
+                            daily_calories=2200, daily_protein_g=150, daily_carbs_g=250, daily_fat_g=70, is_active=True)
+            plan.meals = [
+                DietPlanMeal(day_of_week=day, meal_name=f"Refeição {n}", description="Teste", calories=550,
+                             protein_g=38, carbs_g=62, fat_g=18, suggested_time=f"{8 + 3 * n:02d}:00")
+                for day in range(1, days + 1) for n in range(MEALS_PER_DAY)
+            ]
+            db.session.add(plan)
+            db.session.commit()
+            return plan.id
+    return create
+
+def statements_per_plan_size(client, query_budget, login, users, path, endpoint):
+    """Statement count of GET `path` for each {days: user_id} in `users`."""
+    counts = {}
+    with query_budget(max_repeats=1) as budget:
+        for days, user_id in users.items():
+            login(user_id)
+            response = client.get(path)
+            assert response.status_code == 200
+            counts[days] = budget.statements(endpoint)[-1]
+    return counts
+
+def test_workout_plan_statements_do_not_grow_with_days(client, query_budget, make_user, login, make_workout_plan):
+    users = {}
+    for days in (1, 7):
+        users[days] = make_user(f"treino{days}")
+        make_workout_plan(users[days], days=days)
+    counts = statements_per_plan_size(client, query_budget, login, users, "/api/plan/workout/current",
+                                      "plan.get_current_workout_plan")
+    assert counts[1] == counts[7]
+
+def test_diet_plan_statements_do_not_grow_with_days(client, query_budget, make_user, login, make_diet_plan):
+    users = {}
+    for days in (1, 7):
+        users[days] = make_user(f"dieta{days}")
+        make_diet_plan(users[days], days=days)
+    counts = statements_per_plan_size(client, query_budget, login, users, "/api/plan/diet/current",
+                                      "plan.get_current_diet_plan")
+    assert counts[1] == counts[7]
+
+def test_workout_plan_graph_is_complete(client, make_user, login, make_workout_plan):
+    user_id = make_user("completo")
+    make_workout_plan(user_id, days=3, exercises_per_day=2)
+    login(user_id)
+    plan_days = client.get("/api/plan/workout/current").get_json()["plan_days"]
+    assert [day["day_of_week"] for day in plan_days] == [1, 2, 3]
+    assert all(len(day["exercises"]) == 2 for day in plan_days)
@@ -0,0 +1,42 @@
+# tests/test_plan_templates.py
+# Template id cache (src/services/plan_templates.py): a bounded LRU per app, and a deleted template's
+# id is not handed out again.
+
+def test_template_id_cache_evicts_least_recently_used():
+    from src.services.plan_templates import TemplateIdCache
+
+    cache = TemplateIdCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1 # "b" becomes the least recently used
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+def test_cache_size_comes_from_config(app):
+    from src.services.plan_templates import get_template_id_cache
+
+    app.config["TEMPLATE_ID_CACHE_SIZE"] = 1
+    with app.app_context():
+        cache = get_template_id_cache()
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") is None and cache.get("b") == 2
+
+def test_deleted_template_is_dropped_from_the_cache(app):
+    from src.extensions import db
+    from src.models import PlanTemplate
+    from src.services.plan_templates import get_or_create_template, get_template_id_cache, _canonical
+
+    content_hash, content_json = _canonical("diet", [{"meal": "Teste"}])
+    with app.app_context():
+        template_id = get_or_create_template("diet", content_hash, content_json)
+        db.session.commit()
+        assert get_or_create_template("diet", content_hash, content_json) == template_id # Cached once seen committed
+        assert get_template_id_cache().get(content_hash) == template_id
+
+        db.session.delete(db.session.get(PlanTemplate, template_id))
+        db.session.commit()
+        assert get_template_id_cache().get(content_hash) is None
+        new_id = get_or_create_template("diet", content_hash, content_json)
+        db.session.commit()
+        assert db.session.get(PlanTemplate, new_id).content_hash == content_hash
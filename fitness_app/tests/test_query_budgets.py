@@ -0,0 +1,74 @@
+# tests/test_query_budgets.py
+# Statement budgets of the hot endpoints: no N+1 (no statement repeated within a request) and a fixed
+# number of statements per request, whatever the size of the plan or catalog behind it.
+from decimal import Decimal
+import pytest
+
+CATEGORIES = 5
+PRODUCTS_PER_CATEGORY = 8
+
+@pytest.fixture
+def catalog(app):
+    """A few categories with several active products each."""
+    from src.extensions import db
+    from src.models import Product, ProductCategory
+
+    with app.app_context():
+        for c in range(1, CATEGORIES + 1):
+            category = ProductCategory(name=f"Categoria {c}", slug=f"categoria-{c}")
+            db.session.add(category)
+            db.session.flush()
+            for p in range(1, PRODUCTS_PER_CATEGORY + 1):
+                db.session.add(Product(name=f"Produto {c}.{p}", slug=f"produto-{c}-{p}", sku=f"SKU-{c}-{p}",
+                                       price=Decimal("9.90"), stock_quantity=10, category_id=category.id, is_active=True))
+        db.session.commit()
+
+def test_current_workout_plan_budget(client, query_budget, make_user, login, make_workout_plan):
+    user_id = make_user("atleta")
+    make_workout_plan(user_id, days=7)
+    login(user_id)
+    # Plan with template, days, exercises; login_required only checks the session
+    with query_budget(max_repeats=1, budgets={"plan.get_current_workout_plan": 3}):
+        response = client.get("/api/plan/workout/current")
+    assert response.status_code == 200
+    assert len(response.get_json()["plan_days"]) == 7
+
+def test_public_product_categories_budget(client, query_budget, catalog):
+    with query_budget(max_repeats=1, budgets={"public_shop.list_public_product_categories": 1}):
+        response = client.get("/api/shop/categories")
+    assert response.status_code == 200
+    assert len(response.get_json()) == CATEGORIES
+
+def test_public_products_budget(client, query_budget, catalog):
+    budgets = {"public_shop.list_public_products": 2} # Page + COUNT; the category filter adds its lookup
+    with query_budget(max_repeats=1, budgets=budgets) as budget:
+        response = client.get("/api/shop/products?per_page=20")
+        assert response.status_code == 200
+        assert len(response.get_json()["products"]) == 20
+        response = client.get("/api/shop/products?pagination=cursor&per_page=20")
+        assert response.status_code == 200
+        assert len(response.get_json()["products"]) == 20
+    assert len(budget.statements("public_shop.list_public_products")) == 2
+
+def test_public_products_of_a_category_budget(client, query_budget, catalog):
+    with query_budget(max_repeats=1, budgets={"public_shop.list_public_products": 3}):
+        response = client.get("/api/shop/products?category=categoria-2")
+    assert response.status_code == 200
+    assert len(response.get_json()["products"]) == PRODUCTS_PER_CATEGORY
+
+def test_query_budget_reports_repeated_statements(app, client, query_budget, make_user, login):
+    """The fixture itself: a request that runs one SELECT per item fails its budget."""
+    from src.extensions import db
+    from src.models import User
+
+    @app.route("/n-plus-one")
+    def n_plus_one():
+        for user_id in range(1, 4):
+            db.session.get(User, user_id)
+        return "ok"
+
+    for name in ("a", "b", "c"):
+        make_user(name)
+    with pytest.raises(AssertionError, match="Query budget exceeded"):
+        with query_budget(max_repeats=1):
+            client.get("/n-plus-one")
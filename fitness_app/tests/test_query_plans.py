@@ -0,0 +1,18 @@
+# tests/test_query_plans.py
+# EXPLAIN QUERY PLAN over the queries behind each route (src/query_plans.py): none may fall back
+# to a full table scan on the schema that create_app() and the migrations build.
+from sqlalchemy import text
+
+def test_hot_queries_use_indexes(app):
+    from src.query_plans import find_full_scans
+    with app.app_context():
+        problems = find_full_scans()
+    assert problems == [], "\n".join(f"FULL SCAN in {name}: {detail}" for name, detail in problems)
+
+def test_missing_index_is_reported(app):
+    from src.extensions import db
+    from src.query_plans import find_full_scans
+    with app.app_context():
+        db.session.execute(text("DROP INDEX ix_advertisements_placement_active"))
+        problems = find_full_scans()
+    assert ("ads: active ads of a placement", "SCAN advertisements") in problems
@@ -0,0 +1,47 @@
+# tests/test_static_assets.py
+import pytest
+from src.static_assets import is_hashed
+
+@pytest.mark.parametrize("url_path, hashed", [
+    ("assets/index-B7x2kQ9a.js", True), # Vite
+    ("main.3f9a1c2e.css", True), # webpack / create-react-app
+    ("static/js/2.8e1f0b3c.chunk.js", True),
+    ("apple-touch-icon.png", False),
+    ("assets/apple-touch-icon.png", False),
+    ("-something-long.js", False),
+    ("assets/index-fallback.js", False), # Eight letters, but no digit or capital: a word, not a hash
+    ("js/app-B7x2kQ9a.js", False), # Base64 hashes count only under the build folder
+    ("index.html", False),
+])
+def test_only_content_hashed_names_are_immutable(url_path, hashed):
+    assert is_hashed(url_path) is hashed
+
+@pytest.fixture
+def debug_static(app, tmp_path):
+    """The app in debug mode, serving a temporary static folder with one compressible file."""
+    (tmp_path / "app.js").write_text("console.log('v1');\n" * 100)
+    app.static_folder = str(tmp_path)
+    app.debug = True
+    return tmp_path
+
+def test_debug_manifest_is_rebuilt_only_when_a_file_changes(app, debug_static):
+    import os
+    from src.static_assets import get_static_manifest
+    with app.app_context():
+        manifest = get_static_manifest()
+        assert get_static_manifest() is manifest
+        changed = debug_static / "app.js"
+        changed.write_text("console.log('v2');\n" * 100)
+        os.utime(changed, ns=(0, changed.stat().st_mtime_ns + 1)) # Changed even on coarse mtime clocks
+        rebuilt = get_static_manifest()
+    assert rebuilt is not manifest
+    assert rebuilt["app.js"].variants["identity"][0].startswith(b"console.log('v2')")
+
+def test_debug_manifest_is_not_precompressed(app, debug_static):
+    from src.static_assets import get_static_manifest
+    (debug_static / "prebuilt.js").write_text("x = 1;\n" * 500)
+    (debug_static / "prebuilt.js.gz").write_bytes(b"gz")
+    with app.app_context():
+        manifest = get_static_manifest()
+    assert set(manifest["app.js"].variants) == {"identity"}
+    assert set(manifest["prebuilt.js"].variants) == {"identity", "gzip"}